@@ -0,0 +1,62 @@
+# Сравнение точечного обновления по дельтам каталога с полной перестройкой страниц.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_catalog_updates.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from launcher import Launcher
+
+SECTIONS = 5
+PROGRAMS_PER_SECTION = 1000
+ROUNDS = 200
+
+
+def make_data():
+    return {"sections": {
+        f"Раздел {s}": {"icon_path": "", "programs": [
+            {"name": f"tool{s}_{i}", "path": f"C:/Tools/tool{s}_{i}.exe", "run_as_admin": False}
+            for i in range(PROGRAMS_PER_SECTION)
+        ]} for s in range(SECTIONS)
+    }}
+
+
+def timed(fn, rounds):
+    start = time.perf_counter()
+    for i in range(rounds):
+        fn(i)
+    return (time.perf_counter() - start) * 1e6 / rounds
+
+
+def main():
+    app = QApplication(sys.argv)
+    launcher = Launcher()
+    launcher.save_settings = lambda: None
+    launcher.catalog.reset(make_data())
+    launcher.show()
+    app.processEvents()
+
+    catalog = launcher.catalog
+    section = catalog.section_names()[2]
+    programs = catalog.programs(section)
+
+    rename_us = timed(lambda i: catalog.rename_program(section, programs[i], f"renamed{i}"), ROUNDS)
+    toggle_us = timed(lambda i: catalog.set_run_as_admin(section, programs[i], True), ROUNDS)
+    move_us = timed(lambda i: catalog.move_program(catalog.by_name(f"tool0_{i}")[0].id, section), ROUNDS)
+    rebuild_us = timed(lambda i: (launcher.update_ui(), app.processEvents()), 5)
+
+    total = SECTIONS * PROGRAMS_PER_SECTION
+    print(f"Каталог: {total} записей в {SECTIONS} разделах")
+    print(f"  переименование:          {rename_us:10.1f} мкс")
+    print(f"  флаг администратора:     {toggle_us:10.1f} мкс")
+    print(f"  перенос между разделами: {move_us:10.1f} мкс")
+    print(f"  полная перестройка:      {rebuild_us:10.1f} мкс")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Время обхода дерева файлов сканером импорта: первый проход,
+# повторный проход по кэшу и проход после изменения одного каталога.
+#
+#   python benchmarks/bench_discovery.py [число файлов]
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discovery import DiscoveryScanner, ScanCache, ScanRoot
+
+FILES_PER_DIR = 1000
+EXECUTABLE_EVERY = 100
+
+
+def make_tree(root, files):
+    for i in range(max(1, files // FILES_PER_DIR)):
+        directory = os.path.join(root, f"group{i // 20}", f"dir{i}")
+        os.makedirs(directory)
+        for j in range(FILES_PER_DIR):
+            path = os.path.join(directory, f"file{j}" + ("" if j % EXECUTABLE_EVERY == 0 else ".dat"))
+            open(path, "w").close()
+            if j % EXECUTABLE_EVERY == 0:
+                os.chmod(path, 0o755)
+
+
+def scan(root, cache_path):
+    found = []
+    scanner = DiscoveryScanner([ScanRoot(root, True)], ScanCache(cache_path).load(), on_found=found.extend)
+    scanner.start()
+    scanner.wait()
+    return scanner.stats, len(found)
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    root = tempfile.mkdtemp()
+    cache_dir = tempfile.mkdtemp()
+    cache_path = os.path.join(cache_dir, "scan_cache.json")
+    try:
+        make_tree(root, files)
+        print(f"{'проход':>20} {'каталогов':>10} {'из кэша':>8} {'найдено':>8} {'время, мс':>10}")
+        for label in ("первый", "повторный"):
+            stats, found = scan(root, cache_path)
+            print(f"{label:>20} {stats.dirs:>10} {stats.cached_dirs:>8} {found:>8} {stats.elapsed_ms:>10.1f}")
+        os.chmod(os.path.join(root, "group0", "dir0", "file1.dat"), 0o755)
+        os.rename(os.path.join(root, "group0", "dir0", "file1.dat"), os.path.join(root, "group0", "dir0", "file1"))
+        stats, found = scan(root, cache_path)
+        print(f"{'изменён 1 каталог':>20} {stats.dirs:>10} {stats.cached_dirs:>8} {found:>8} {stats.elapsed_ms:>10.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# Холодный и тёплый запуск списка из 2000 программ со значками:
+# первая отрисовка не должна ждать декодирования, повторный запуск берёт значки с диска.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_icons.py
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtWidgets import QApplication
+
+from catalog import Catalog
+from icons import IconProvider
+from program_list import ProgramListModel, ProgramListView
+
+ENTRIES = 2000
+
+
+def make_catalog(directory):
+    programs = []
+    for i in range(ENTRIES):
+        icon_file = os.path.join(directory, f"icon{i}.png")
+        image = QImage(256, 256, QImage.Format_ARGB32)
+        image.fill(QColor.fromHsv(i % 360, 200, 200))
+        image.save(icon_file)
+        programs.append({"name": f"Программа {i}", "path": f"/opt/tool{i}", "icon_path": icon_file,
+                         "run_as_admin": False})
+    return Catalog({"sections": {"bench": {"icon_path": "", "programs": programs}}})
+
+
+def run(app, catalog, cache_dir, label):
+    provider = IconProvider(cache_dir)
+    view = ProgramListView(icon_provider=provider)
+    view.setModel(ProgramListModel(catalog, "bench", view))
+    view.resize(800, 600)
+
+    start = time.perf_counter()
+    view.show()
+    app.processEvents()
+    view.viewport().repaint()
+    first_paint_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for i in range(0, ENTRIES, 40):
+        view.scrollTo(view.model().index(i))
+        view.viewport().repaint()
+        app.processEvents()
+    provider.wait()
+    app.processEvents()
+    scroll_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{label:>10}: первый кадр {first_paint_ms:7.2f} мс, прокрутка и загрузка {scroll_ms:8.1f} мс, "
+          f"{provider.stats}")
+    view.close()
+
+
+def main():
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = make_catalog(directory)
+        cache_dir = os.path.join(directory, "icon_cache")
+        run(app, catalog, cache_dir, "холодный")
+        run(app, catalog, cache_dir, "тёплый")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Цена поиска уже запущенных программ каталога: первый проход по всем процессам,
+# повторный полный проход и досмотр только новых PID, при заданном числе процессов в системе.
+# Совпадают с каталогом MATCHING из них, остальные - посторонние.
+#
+#   python benchmarks/bench_process_scan.py
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from catalog import Catalog, CatalogReset
+from process_monitor import ProcessMonitor
+from process_scan import ProcessScanner
+
+PROCESSES = 2000
+MATCHING = 20
+CATALOG_SIZE = 10000
+ROUNDS = 5
+
+
+def sleeper(python):
+    return [python, "-c", "import time; time.sleep(120)"]
+
+
+def make_catalog(path):
+    programs = [{"name": f"Program {i}", "path": f"C:/Apps/Program{i}/app{i}.exe"} for i in range(CATALOG_SIZE)]
+    programs.append({"name": "Python", "path": path})
+    return Catalog({"sections": {"Программы": {"icon_path": "", "programs": programs}}})
+
+
+def measure(scanner, monitor, full):
+    reports = []
+    for _ in range(ROUNDS):
+        if full:
+            # Как после изменения путей каталога
+            scanner.apply(CatalogReset())
+        scanner.start(monitor, reports.append)
+        scanner.wait()
+    return min(report.total_ms for report in reports), reports[-1]
+
+
+def main():
+    path = os.path.realpath(sys.executable)
+    # Посторонние процессы - sleep: он легче интерпретатора
+    other = [shutil.which("sleep"), "120"] if shutil.which("sleep") else sleeper(path)
+    existing = len(psutil.pids())
+    children = [subprocess.Popen(sleeper(path)) for _ in range(MATCHING)]
+    children += [subprocess.Popen(other) for _ in range(max(0, PROCESSES - existing - MATCHING))]
+    monitor = ProcessMonitor()
+    monitor.start()
+    try:
+        scanner = ProcessScanner(make_catalog(path))
+        reports = []
+        start = time.perf_counter()
+        scanner.start(monitor, reports.append)
+        scanner.wait()
+        first_ms = (time.perf_counter() - start) * 1000
+        full_ms, _ = measure(scanner, monitor, full=True)
+        new_ms, _ = measure(scanner, monitor, full=False)
+
+        print(f"процессов в системе: {len(psutil.pids())}, взято под наблюдение: {reports[0].adopted}")
+        print(f"{'первый проход, мс':>22} {first_ms:>8.1f}")
+        print(f"{'полный повторный, мс':>22} {full_ms:>8.1f}")
+        print(f"{'только новые PID, мс':>22} {new_ms:>8.1f}")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+        monitor.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Замер списка программ на модели/представлении: память и стоимость отрисовки
+# должны оставаться плоскими от 100 до 50 000 записей.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_program_list.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import psutil
+from PyQt5.QtWidgets import QApplication
+
+from catalog import Catalog
+from program_list import ProgramListModel, ProgramListView
+
+SIZES = [100, 1000, 10000, 50000]
+PAINT_ROUNDS = 20
+
+
+def make_programs(count):
+    return [{"name": f"Программа {i}", "path": f"C:/Tools/tool{i}/tool{i}.exe", "run_as_admin": False}
+            for i in range(count)]
+
+
+def bench(app, count):
+    catalog = Catalog({"sections": {"bench": {"icon_path": "", "programs": make_programs(count)}}})
+    process = psutil.Process()
+    widgets_before = len(QApplication.allWidgets())
+    rss_before = process.memory_info().rss
+
+    start = time.perf_counter()
+    view = ProgramListView()
+    view.setModel(ProgramListModel(catalog, "bench", view))
+    view.resize(800, 600)
+    view.show()
+    app.processEvents()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for i in range(PAINT_ROUNDS):
+        view.verticalScrollBar().setValue(view.verticalScrollBar().maximum() * i // PAINT_ROUNDS)
+        view.viewport().repaint()
+    paint_ms = (time.perf_counter() - start) * 1000 / PAINT_ROUNDS
+
+    rss_kb = (process.memory_info().rss - rss_before) // 1024
+    widgets = len(QApplication.allWidgets()) - widgets_before
+
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return build_ms, paint_ms, rss_kb, widgets
+
+
+def main():
+    app = QApplication(sys.argv)
+    print(f"{'записей':>8} {'создание, мс':>13} {'кадр, мс':>9} {'RSS, КБ':>8} {'виджетов':>9}")
+    for count in SIZES:
+        build_ms, paint_ms, rss_kb, widgets = bench(app, count)
+        print(f"{count:>8} {build_ms:>13.2f} {paint_ms:>9.3f} {rss_kb:>8} {widgets:>9}")
+
+
+if __name__ == '__main__':
+    main()
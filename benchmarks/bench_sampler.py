@@ -0,0 +1,50 @@
+# Цена одного прохода сэмплера телеметрии в зависимости от числа процессов
+# и проверка, что история не растёт дольше заданной длины.
+#
+#   python benchmarks/bench_sampler.py
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from process_monitor import ProcessMonitor
+from telemetry import ProcessSampler
+
+COUNTS = [10, 50, 200]
+ROUNDS = 20
+HISTORY = 16
+
+
+def sleeper():
+    return [sys.executable, "-c", "import time; time.sleep(60)"]
+
+
+def main():
+    print(f"{'процессов':>10} {'проход, мс':>11} {'на процесс, мкс':>16} {'длина истории':>14}")
+    for count in COUNTS:
+        monitor = ProcessMonitor()
+        monitor.start()
+        children = [subprocess.Popen(sleeper()) for _ in range(count)]
+        for child in children:
+            monitor.track(child, sys.executable)
+
+        sampler = ProcessSampler(monitor, history=HISTORY)
+        sampler.sample_once()
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            sampler.sample_once()
+        round_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+
+        history = sampler.history(monitor.processes()[0].key)
+        print(f"{count:>10} {round_ms:>11.2f} {round_ms * 1000 / count:>16.1f} {len(history.cpu):>14}")
+
+        for child in children:
+            child.kill()
+            child.wait()
+        monitor.stop()
+
+
+if __name__ == '__main__':
+    main()
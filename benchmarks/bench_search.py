@@ -0,0 +1,61 @@
+# Замер поискового индекса: построение, запросы и инкрементальные обновления
+# на каталоге из 100 000 записей. Запрос должен укладываться в 5 мс.
+#
+#   python benchmarks/bench_search.py
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import Catalog
+from search import SearchIndex
+
+ENTRIES = 100000
+SECTIONS = 20
+QUERIES = ["c", "ch", "chr", "chrome", "visual studio", "tool4711", "fotoshop", "exe", "zzzz"]
+ROUNDS = 20
+
+WORDS = ["Chrome", "Firefox", "Visual", "Studio", "Code", "Photoshop", "Steam", "Tool",
+         "Editor", "Player", "Manager", "Client", "Server", "Monitor", "Viewer", "Git"]
+
+
+def make_catalog(count):
+    rnd = random.Random(42)
+    sections = {f"Раздел {s}": {"icon_path": "", "programs": []} for s in range(SECTIONS)}
+    names = list(sections)
+    for i in range(count):
+        name = f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i}"
+        path = f"C:/Program Files/{rnd.choice(WORDS)}/{name.replace(' ', '')}.exe"
+        sections[names[i % SECTIONS]]["programs"].append({"name": name, "path": path, "run_as_admin": False})
+    return Catalog({"sections": sections})
+
+
+def main():
+    catalog = make_catalog(ENTRIES)
+    index = SearchIndex()
+
+    start = time.perf_counter()
+    index.build(catalog)
+    print(f"Построение индекса на {ENTRIES} записей: {(time.perf_counter() - start) * 1000:.1f} мс")
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - start) * 1000 / ROUNDS
+        top = results[0].program["name"] if results else "-"
+        print(f"  {query!r:18} {elapsed:7.3f} мс  результатов: {len(results):4}  первый: {top}")
+
+    catalog.add_listener(lambda delta: index.apply(delta, catalog))
+    section = catalog.section_names()[3]
+    programs = catalog.programs(section)
+    start = time.perf_counter()
+    for i in range(1000):
+        catalog.rename_program(section, programs[i], f"Renamed {i}")
+    print(f"Переименование с обновлением индекса: {(time.perf_counter() - start) * 1000:.1f} мкс на операцию")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+# Сводный замер горячих путей окна на синтетических каталогах от 10 до 100 000 записей:
+# загрузка и сохранение настроек, перестройка страниц, поиск по нажатию клавиши,
+# сортировка, перенос перетаскиванием и список запущенных программ.
+# Результат пишется в JSON и сравнивается с сохранённым эталоном.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_suite.py --output latest.json
+#   python benchmarks/bench_suite.py --baseline baseline.json --threshold 0.25
+#
+# Код выхода 1, если хоть одна метрика хуже эталона больше чем на порог.
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEvent, QMimeData, QT_VERSION_STR
+from PyQt5.QtWidgets import QApplication
+
+from launcher import Launcher
+from program_list import PROGRAM_MIME_TYPE
+
+SIZES = [10, 100, 1000, 10000, 100000]
+PROGRAMS_PER_SECTION = 1000
+MAX_SECTIONS = 100
+TRACKED_PIDS = 100
+DROP_MOVES = 50
+QUERY = "tool12_3"
+REPEAT = 5
+THRESHOLD = 0.2
+# Разница меньше этой считается шумом и регрессией не бывает, мс
+NOISE_FLOOR_MS = 0.5
+
+
+# Окно с настройками во временном каталоге, чтобы замер не трогал рабочий settings.json
+class BenchLauncher(Launcher):
+    settings_path = None
+
+    def get_settings_file_path(self):
+        return self.settings_path
+
+
+# Минимальное событие сброса для Launcher.dropEvent
+class _Drop:
+    def __init__(self, program):
+        self._mime = QMimeData()
+        self._mime.setData(PROGRAM_MIME_TYPE, str(program.id).encode("ascii"))
+
+    def mimeData(self):
+        return self._mime
+
+
+def make_data(size):
+    sections = max(1, min(MAX_SECTIONS, -(-size // PROGRAMS_PER_SECTION)))
+    data = {"sections": {f"Раздел {s}": {"icon_path": "", "programs": []} for s in range(sections)}}
+    names = list(data["sections"])
+    for i in range(size):
+        s = i % sections
+        data["sections"][names[s]]["programs"].append(
+            {"name": f"tool{s}_{i}", "path": f"C:/Tools/vendor{i % 97}/tool{s}_{i}.exe", "run_as_admin": False})
+    return data
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset // 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# Лучшее время из repeat повторов: фоновые потоки окна и соседние процессы
+# только прибавляют время, а медиана из нескольких повторов ещё плавает на 20-40%
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def close_launcher(launcher):
+    launcher.close()
+    launcher.deleteLater()
+    # Вне цикла событий отложенное удаление само не выполняется
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def sleeper():
+    return [sys.executable, "-c", "import time; time.sleep(600)"]
+
+
+def bench(app, size, children, repeat):
+    tmp = tempfile.mkdtemp()
+    try:
+        settings_path = os.path.join(tmp, "settings.json")
+        with open(settings_path, "w", encoding="utf-8") as f:
+            json.dump(make_data(size), f, ensure_ascii=False)
+        BenchLauncher.settings_path = settings_path
+
+        result = {}
+        widgets_before = len(QApplication.allWidgets())
+        # Окно создаётся repeat раз, замеры дальше идут на последнем; отложенные
+        # импорты первого запуска в лучшее время не попадают
+        launcher = None
+        startup = []
+        for _ in range(repeat):
+            if launcher is not None:
+                close_launcher(launcher)
+            start = time.perf_counter()
+            launcher = BenchLauncher()
+            launcher.show()
+            app.processEvents()
+            startup.append((time.perf_counter() - start) * 1000)
+        result["startup_ms"] = min(startup)
+
+        result["load_settings_ms"] = measure(lambda: (launcher.load_settings(), app.processEvents()), repeat)
+
+        def save():
+            # Для JSON ждём, пока фоновый писатель доведёт запись до диска
+            launcher.save_settings()
+            writer = getattr(launcher.storage, "writer", None)
+            if writer is not None:
+                writer.flush()
+        result["save_settings_ms"] = measure(save, repeat)
+
+        result["update_ui_ms"] = measure(lambda: (launcher.update_ui(), app.processEvents()), repeat)
+
+        def build_all_pages():
+            for section_name in launcher.catalog.section_names():
+                launcher.ensure_section_view(section_name)
+            app.processEvents()
+        result["build_all_pages_ms"] = measure(build_all_pages, 1)
+        result["widgets"] = len(QApplication.allWidgets()) - widgets_before
+
+        def type_query():
+            for i in range(1, len(QUERY) + 1):
+                launcher.search_input.setText(QUERY[:i])
+                launcher.run_search()
+                app.processEvents()
+            launcher.search_input.setText("")
+            launcher.run_search()
+        result["filter_keystroke_ms"] = measure(type_query, repeat) / len(QUERY)
+
+        sections = launcher.catalog.section_names()
+        launcher.show_page(launcher.section_pages[sections[0]])
+        result["sort_programs_ms"] = measure(
+            lambda: (launcher.sort_programs("path"), launcher.sort_programs("name"), app.processEvents()),
+            repeat) / 2
+
+        target = sections[-1] if len(sections) > 1 else None
+        programs = list(launcher.catalog.programs(sections[0]))[:DROP_MOVES]
+        if target is not None and programs:
+            start = time.perf_counter()
+            for program in programs:
+                launcher.dropEvent(_Drop(program), target)
+            app.processEvents()
+            result["drop_move_ms"] = (time.perf_counter() - start) * 1000 / len(programs)
+
+        launcher.ensure_running_page()
+        for child in children:
+            launcher.process_monitor.track(child, sys.executable)
+        result["running_list_ms"] = measure(
+            lambda: (launcher.update_running_processes_list(), app.processEvents()), repeat)
+        result["running_items"] = launcher.running_list_widget.count()
+
+        result["peak_rss_kb"] = peak_rss_kb()
+        close_launcher(launcher)
+        return result
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for size, metrics in results.items():
+        base = baseline.get("results", {}).get(size, {})
+        for name, value in metrics.items():
+            if not name.endswith("_ms") or name not in base:
+                continue
+            if value > base[name] * (1 + threshold) and value - base[name] > NOISE_FLOOR_MS:
+                regressions.append((size, name, base[name], value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=SIZES,
+                        help="размеры каталогов через запятую")
+    parser.add_argument("--pids", type=int, default=TRACKED_PIDS, help="число отслеживаемых процессов")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="повторов на замер, берётся лучший")
+    parser.add_argument("--output", help="куда записать результаты в JSON")
+    parser.add_argument("--baseline", help="эталон в JSON для сравнения")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="допустимое ухудшение относительно эталона, доля")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    children = [subprocess.Popen(sleeper()) for _ in range(args.pids)]
+    results = {}
+    try:
+        for size in args.sizes:
+            results[str(size)] = bench(app, size, children, args.repeat)
+            metrics = results[str(size)]
+            print(f"{size:>7} записей: " + ", ".join(
+                f"{name} {value:.2f}" if isinstance(value, float) else f"{name} {value}"
+                for name, value in metrics.items()), flush=True)
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for size, name, before, after in regressions:
+            print(f"РЕГРЕССИЯ {size} записей, {name}: {before:.2f} -> {after:.2f} мс", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"Регрессий нет (порог {args.threshold:.0%})")
+
+
+if __name__ == '__main__':
+    main()
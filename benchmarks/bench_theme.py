@@ -0,0 +1,196 @@
+# Стоимость создания строки окна (кнопка навигации, страница раздела, заголовок и список),
+# отрисовки кнопки и смены темы: прежняя таблица стилей на всё окно против палитры
+# и стиля из theme.py.
+# Каждый режим замеряется в отдельном процессе: стиль приложения ставится один раз.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_theme.py
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+SIZES = [100, 1000]
+MODES = ["stylesheet", "theme"]
+REPEAT = 3
+PAINT_ROUNDS = 200
+
+# Таблица стилей, которую окно ставило на себя до theme.py
+LEGACY_STYLESHEET = """
+QWidget {
+    background-color: #2e2e2e;
+    font-family: "Segoe UI", sans-serif;
+}
+#main_frame {
+    background-color: #2e2e2e;
+    border-radius: 20px;
+}
+.title_bar {
+    background-color: #2e2e2e;
+    border-top-left-radius: 20px;
+    border-top-right-radius: 20px;
+}
+.title_bar_button {
+    background-color: #2e2e2e;
+    border: none;
+    color: #ffffff;
+    font-size: 18px;
+}
+.title_bar_button:hover {
+    color: #4a90e2;
+}
+QPushButton {
+    background: #2e2e2e;
+    color: white;
+    border-radius: 12px;
+    padding: 12px 24px;
+    font-weight: bold;
+    border: 2px solid #3e3e3e;
+}
+QPushButton:hover {
+    background: #3a3a3a;
+}
+QPushButton:pressed {
+}
+QLineEdit {
+    background-color: #2e2e2e;
+    border-radius: 10px;
+    border: 2px solid #3a3a3a;
+    padding: 8px;
+    color: #ffffff;
+}
+QFrame#nav_frame {
+    background: #2e2e2e;
+    border-radius: 15px;
+}
+#nav_frame QPushButton {
+    background: #2e2e2e;
+    border-radius: 8px;
+    text-align: left;
+    padding: 10px 15px;
+    font-size: 14px;
+    font-weight: normal;
+    color: #e0e0e0;
+    border: none;
+}
+#nav_frame QPushButton:checked {
+    background: #4a90e2;
+    color: white;
+    font-weight: bold;
+}
+#page_frame {
+    background-color: #2e2e2e;
+    border-radius: 15px;
+}
+QListView#program_list {
+    background-color: #2e2e2e;
+    border: none;
+}
+QListWidget {
+    background-color: #2e2e2e;
+    border: 2px solid #3a3a3a;
+    border-radius: 10px;
+    color: #e0e0e0;
+}
+QListWidget::item {
+    padding: 5px;
+}
+QListWidget::item:hover {
+    background-color: #3a3a3a;
+}
+QListWidget::item:selected {
+    background-color: #4a90e2;
+}
+"""
+
+
+def make_row(parent, i):
+    # То же, что окно создаёт на раздел: кнопка навигации, страница, заголовок и список.
+    # Стиль применяется к виджету при первом показе или запросе размера - делаем это сразу
+    from PyQt5.QtWidgets import QFrame, QLabel, QPushButton, QVBoxLayout
+    from program_list import ProgramListView
+    nav_button = QPushButton(f"Раздел {i}", parent)
+    nav_button.setFlat(True)
+    nav_button.setCheckable(True)
+    page = QFrame(parent)
+    page.setObjectName("page_frame")
+    page_layout = QVBoxLayout(page)
+    label = QLabel(f"Раздел {i}", page)
+    page_layout.addWidget(label)
+    view = ProgramListView(page)
+    page_layout.addWidget(view)
+    for widget in (nav_button, page, label, view):
+        widget.ensurePolished()
+    nav_button.sizeHint()
+    label.sizeHint()
+    return nav_button
+
+
+def run_mode(mode, sizes):
+    from PyQt5.QtWidgets import QApplication, QWidget
+    from PyQt5.QtGui import QPixmap
+    from theme import apply_theme
+    app = QApplication(sys.argv[:1])
+    window = QWidget()
+    if mode == "theme":
+        apply_theme(app, "dark")
+    else:
+        window.setStyleSheet(LEGACY_STYLESHEET)
+    window.resize(1000, 700)
+    window.show()
+    app.processEvents()
+
+    for count in sizes:
+        best = None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            for i in range(count):
+                nav_button = make_row(window, i)
+            row_us = (time.perf_counter() - start) * 1e6 / count
+
+            pixmap = QPixmap(nav_button.sizeHint())
+            start = time.perf_counter()
+            for _ in range(PAINT_ROUNDS):
+                nav_button.render(pixmap)
+            paint_us = (time.perf_counter() - start) * 1e6 / PAINT_ROUNDS
+
+            # Смена темы при count строках в окне, туда и обратно
+            start = time.perf_counter()
+            if mode == "theme":
+                apply_theme(app, "light")
+                app.processEvents()
+                apply_theme(app, "dark")
+            else:
+                window.setStyleSheet(LEGACY_STYLESHEET.replace("#2e2e2e", "#e9ecf1"))
+                app.processEvents()
+                window.setStyleSheet(LEGACY_STYLESHEET)
+            app.processEvents()
+            switch_ms = (time.perf_counter() - start) * 1000 / 2
+
+            result = (row_us, paint_us, switch_ms)
+            best = result if best is None else tuple(map(min, best, result))
+            for child in window.findChildren(QWidget):
+                child.deleteLater()
+            app.processEvents()
+        print(f"{mode:>10} {count:>7} {best[0]:>12.1f} {best[1]:>12.1f} {best[2]:>12.2f}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=MODES, help="замерить один режим в этом процессе")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.sizes)
+        return
+    print(f"{'режим':>10} {'строк':>7} {'строка, мкс':>12} {'кнопка, мкс':>12} {'смена, мс':>12}", flush=True)
+    for mode in MODES:
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode,
+                        "--sizes", *map(str, args.sizes)], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,468 @@
+from collections import namedtuple
+
+# Типизированные изменения каталога. Каждое изменение сообщается подписчикам дважды:
+# до применения (about_to_change) и после (changed), как это принято в моделях Qt
+ProgramAdded = namedtuple("ProgramAdded", "section row program")
+ProgramRemoved = namedtuple("ProgramRemoved", "section row program")
+ProgramMoved = namedtuple("ProgramMoved", "program old_section old_row new_section new_row")
+ProgramRenamed = namedtuple("ProgramRenamed", "section row program old_name")
+ProgramChanged = namedtuple("ProgramChanged", "section row program")
+SectionAdded = namedtuple("SectionAdded", "section")
+SectionRemoved = namedtuple("SectionRemoved", "section")
+SectionReordered = namedtuple("SectionReordered", "section")
+CatalogReset = namedtuple("CatalogReset", "")
+
+# Поля записи программы в settings.json; остальные ключи попадают в extra
+PROGRAM_FIELDS = ("id", "name", "path", "run_as_admin", "icon_path")
+_FIELD_SET = frozenset(PROGRAM_FIELDS)
+# Сколько удалений из раздела копится до перенумерации строк его записей:
+# поиск строки после удаления просматривает не больше стольких записей
+RENUMBER_AFTER = 1024
+
+
+# Запись программы каталога. Поля лежат в слотах, а не в словаре: на 100 000 записей
+# это около 27 МБ против 34 МБ у словарей. Неизвестные ключи из settings.json хранятся в extra
+# и записываются обратно без изменений. Доступ как к словарю (program["name"],
+# program.get("icon_path")) оставлен, чтобы делегаты, поиск и хранилища читали запись
+# так же, как раньше. id - постоянный номер записи в каталоге, section и row - её раздел
+# и строка в нём (заполняет каталог, в файл не пишется)
+class Program:
+    __slots__ = ("id", "name", "path", "run_as_admin", "icon_path", "extra", "section", "row")
+
+    def __init__(self, name, path, run_as_admin=False, icon_path="", program_id=None, extra=None):
+        self.id = program_id
+        self.name = name
+        self.path = path
+        self.run_as_admin = run_as_admin
+        self.icon_path = icon_path
+        self.extra = extra
+        self.section = None
+        self.row = -1
+
+    @classmethod
+    def from_dict(cls, data):
+        # Лишние ключи ищутся, только если их не может не быть: так загрузка
+        # обычного каталога не строит по словарю на запись
+        extra = None
+        known = (("id" in data) + ("name" in data) + ("path" in data)
+                 + ("run_as_admin" in data) + ("icon_path" in data))
+        if len(data) > known:
+            extra = {key: value for key, value in data.items() if key not in _FIELD_SET} or None
+        return cls(data.get("name", ""), data.get("path", ""), bool(data.get("run_as_admin", False)),
+                   data.get("icon_path", ""), data.get("id"), extra)
+
+    def to_dict(self):
+        data = {"id": self.id, "name": self.name, "path": self.path, "run_as_admin": self.run_as_admin}
+        if self.icon_path:
+            data["icon_path"] = self.icon_path
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in _FIELD_SET or bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Program(id={self.id}, name={self.name!r}, path={self.path!r})"
+
+
+def _find_name(programs, program_name):
+    # Списки из хранилища могут искать по индексу сами, не читая раздел целиком
+    find_name = getattr(programs, "find_name", None)
+    if find_name is not None:
+        return find_name(program_name)
+    for row, program in enumerate(programs):
+        if program["name"] == program_name:
+            return row
+    return -1
+
+
+# Индексы по имени и пути: значение - сама запись, а список заводится только
+# для совпадающих ключей, чтобы не держать по списку на каждую программу
+def _index_add(index, key, program):
+    existing = index.get(key)
+    if existing is None:
+        index[key] = program
+    elif type(existing) is list:
+        existing.append(program)
+    else:
+        index[key] = [existing, program]
+
+
+def _index_remove(index, key, program):
+    existing = index.get(key)
+    if existing is program:
+        del index[key]
+    elif type(existing) is list:
+        for i, record in enumerate(existing):
+            if record is program:
+                del existing[i]
+                break
+        if len(existing) == 1:
+            index[key] = existing[0]
+
+
+def _index_get(index, key):
+    existing = index.get(key)
+    if existing is None:
+        return []
+    if type(existing) is list:
+        return list(existing)
+    return [existing]
+
+
+def default_data():
+    return {
+        "sections": {
+            "Программы": {"icon_path": "", "programs": []},
+            "Игры": {"icon_path": "", "programs": []}
+        }
+    }
+
+
+# Каталог разделов и программ поверх словаря из settings.json.
+# Все изменения проходят через его методы, а подписчики получают дельты.
+# Программы хранятся записями Program с постоянными id; индекс по id строится
+# при загрузке (проход по записям для проверки id всё равно нужен), индексы по имени
+# и пути - при первом обращении, и дальше все они обновляются вместе с каталогом,
+# так что поиск записи для переноса, удаления или запуска не перебирает разделы.
+# Строку записи в разделе хранит сама запись (program.row). После удаления строки
+# записей ниже него не переписываются сразу: запись сдвинулась вверх не больше,
+# чем на число удалений, и ищется в этом окне. Раздел перенумеровывается
+# одним проходом, когда удалений набирается RENUMBER_AFTER
+class Catalog:
+    def __init__(self, data=None):
+        self._listeners = []
+        self._reset_index()
+        self.data = data if data is not None else default_data()
+        self._adopt(self.data)
+
+    def add_listener(self, changed, about_to_change=None):
+        self._listeners.append((changed, about_to_change))
+
+    def remove_listener(self, changed):
+        self._listeners = [l for l in self._listeners if l[0] != changed]
+
+    def _about_to_change(self, delta):
+        for _, about_to_change in list(self._listeners):
+            if about_to_change is not None:
+                about_to_change(delta)
+
+    def _changed(self, delta):
+        for changed, _ in list(self._listeners):
+            changed(delta)
+
+    @property
+    def sections(self):
+        return self.data["sections"]
+
+    def section_names(self):
+        return list(self.sections.keys())
+
+    def programs(self, section_name):
+        return self.sections[section_name]["programs"]
+
+    # Индексы
+
+    def _reset_index(self):
+        # раздел -> (сколько удалений с последней перенумерации, первая удалённая строка)
+        self._shifts = {}
+        self._by_id = None
+        self._by_name = None
+        self._by_path = None
+        self._next_id = None
+
+    def _adopt(self, data):
+        # Словари из settings.json превращаются в записи; записям без id или с
+        # повторяющимся id выдаются новые, и заодно строится индекс по id.
+        # Постраничные списки SQLite уже отдают записи с id, для них индексы
+        # и следующий свободный id строит ensure_index
+        pending = []
+        by_id = {}
+        paged = False
+        from_dict = Program.from_dict
+        for section_name, section_data in data.get("sections", {}).items():
+            programs = section_data["programs"]
+            if type(programs) is not list:
+                paged = True
+                continue
+            for row, program in enumerate(programs):
+                if type(program) is not Program:
+                    program = programs[row] = from_dict(program)
+                program.row = row
+                program.section = section_name
+                program_id = program.id
+                if type(program_id) is not int or program_id in by_id:
+                    pending.append(program)
+                else:
+                    by_id[program_id] = program
+        if paged:
+            return
+        self._next_id = max(by_id, default=0) + 1
+        for program in pending:
+            program.id = self._next_id
+            by_id[program.id] = program
+            self._next_id += 1
+        self._by_id = by_id
+
+    def ensure_index(self):
+        # Индексы по имени и пути строятся один раз, при первом поиске записи по ним;
+        # окно строит их в простое после запуска
+        if self._by_name is not None:
+            return
+        by_id, by_name, by_path = {}, {}, {}
+        for section_name, section_data in self.sections.items():
+            for program in section_data["programs"]:
+                program.section = section_name
+                by_id[program.id] = program
+                _index_add(by_name, program.name, program)
+                _index_add(by_path, program.path, program)
+        self._by_id, self._by_name, self._by_path = by_id, by_name, by_path
+        if self._next_id is None:
+            self._next_id = max(by_id, default=0) + 1
+
+    def _new_id(self):
+        if self._next_id is None:
+            self.ensure_index()
+        program_id = self._next_id
+        self._next_id += 1
+        return program_id
+
+    def _index_program(self, section_name, program):
+        program.section = section_name
+        if self._by_id is not None:
+            self._by_id[program.id] = program
+        if self._by_name is None:
+            return
+        _index_add(self._by_name, program.name, program)
+        _index_add(self._by_path, program.path, program)
+
+    def _unindex_program(self, program):
+        if self._by_id is not None and self._by_id.get(program.id) is program:
+            del self._by_id[program.id]
+        if self._by_name is None:
+            return
+        _index_remove(self._by_name, program.name, program)
+        _index_remove(self._by_path, program.path, program)
+
+    def get(self, program_id):
+        # Запись по id или None
+        if self._by_id is None:
+            self.ensure_index()
+        return self._by_id.get(program_id)
+
+    def by_name(self, name):
+        self.ensure_index()
+        return _index_get(self._by_name, name)
+
+    def by_path(self, path):
+        self.ensure_index()
+        return _index_get(self._by_path, path)
+
+    def paths(self):
+        # Все различные пути программ каталога
+        self.ensure_index()
+        return list(self._by_path)
+
+    def find_program(self, program_name):
+        # (раздел, строка) первой записи с этим именем. Пока индекс не построен,
+        # поиск идёт по разделам: SQLite отвечает запросом, не читая раздел целиком
+        if self._by_name is not None:
+            records = _index_get(self._by_name, program_name)
+            if not records:
+                return None, -1
+            return records[0].section, self._row_of(records[0].section, records[0])
+        for section_name, section_data in self.sections.items():
+            row = _find_name(section_data["programs"], program_name)
+            if row >= 0:
+                return section_name, row
+        return None, -1
+
+    # Изменения
+
+    def reset(self, data):
+        delta = CatalogReset()
+        self._about_to_change(delta)
+        self.data = data
+        self._reset_index()
+        self._adopt(data)
+        self._changed(delta)
+
+    def add_section(self, section_name, icon_path=""):
+        if section_name in self.sections:
+            return False
+        delta = SectionAdded(section_name)
+        self._about_to_change(delta)
+        self.sections[section_name] = {"icon_path": icon_path, "programs": []}
+        self._changed(delta)
+        return True
+
+    def remove_section(self, section_name):
+        if section_name not in self.sections:
+            return False
+        delta = SectionRemoved(section_name)
+        self._about_to_change(delta)
+        if self._by_id is not None:
+            for program in self.programs(section_name):
+                self._unindex_program(program)
+        del self.sections[section_name]
+        self._shifts.pop(section_name, None)
+        self._changed(delta)
+        return True
+
+    def add_program(self, section_name, program):
+        # program - Program или словарь в формате settings.json; возвращается запись
+        if not isinstance(program, Program):
+            program = Program.from_dict(program)
+        if type(program.id) is not int or self.get(program.id) is not None:
+            program.id = self._new_id()
+        else:
+            self._next_id = max(self._next_id, program.id + 1)
+        programs = self.programs(section_name)
+        delta = ProgramAdded(section_name, len(programs), program)
+        self._about_to_change(delta)
+        program.row = len(programs)
+        programs.append(program)
+        self._index_program(section_name, program)
+        self._changed(delta)
+        return program
+
+    def remove_program(self, program_id):
+        # Удаляется ровно одна запись, даже если в каталоге есть другие с тем же именем
+        program = self.get(program_id)
+        if program is None:
+            return False
+        section_name = program.section
+        row = self._row_of(section_name, program)
+        delta = ProgramRemoved(section_name, row, program)
+        self._about_to_change(delta)
+        del self.programs(section_name)[row]
+        self._rows_shifted(section_name, row)
+        self._unindex_program(program)
+        self._changed(delta)
+        return True
+
+    def rename_program(self, section_name, program, new_name):
+        row = self._row_of(section_name, program)
+        delta = ProgramRenamed(section_name, row, program, program.name)
+        self._about_to_change(delta)
+        self._unindex_program(program)
+        program.name = new_name
+        self._index_program(section_name, program)
+        self._changed(delta)
+
+    def set_run_as_admin(self, section_name, program, run_as_admin):
+        row = self._row_of(section_name, program)
+        delta = ProgramChanged(section_name, row, program)
+        self._about_to_change(delta)
+        program.run_as_admin = run_as_admin
+        self._changed(delta)
+
+    def update_program(self, program_id, **fields):
+        # Поля записи (name, path, run_as_admin, icon_path, extra) одной дельтой ProgramChanged;
+        # False, если записи нет
+        program = self.get(program_id)
+        if program is None:
+            return False
+        section_name = program.section
+        row = self._row_of(section_name, program)
+        delta = ProgramChanged(section_name, row, program)
+        self._about_to_change(delta)
+        self._unindex_program(program)
+        for field, value in fields.items():
+            setattr(program, field, value)
+        self._index_program(section_name, program)
+        self._changed(delta)
+        return True
+
+    def move_program(self, program_id, new_section):
+        program = self.get(program_id)
+        if program is None or new_section not in self.sections:
+            return False
+        old_section = program.section
+        old_programs = self.programs(old_section)
+        new_programs = self.programs(new_section)
+        old_row = self._row_of(old_section, program)
+        # Перемещение в конец того же раздела, где запись и так последняя, ничего не меняет
+        if old_section == new_section and old_row == len(old_programs) - 1:
+            return False
+
+        new_row = len(new_programs) - 1 if old_section == new_section else len(new_programs)
+        delta = ProgramMoved(program, old_section, old_row, new_section, new_row)
+        self._about_to_change(delta)
+        del old_programs[old_row]
+        self._rows_shifted(old_section, old_row)
+        program.row = len(new_programs)
+        new_programs.append(program)
+        program.section = new_section
+        self._changed(delta)
+        return True
+
+    def sort_section(self, section_name, key):
+        # key - поле программы или функция ключа сортировки
+        sort_key = key if callable(key) else (lambda p: getattr(p, key).lower())
+        delta = SectionReordered(section_name)
+        self._about_to_change(delta)
+        self.programs(section_name).sort(key=sort_key)
+        self._renumber(section_name, 0)
+        self._changed(delta)
+
+    def _rows_shifted(self, section_name, row):
+        shift, first = self._shifts.get(section_name, (0, row))
+        if shift + 1 >= RENUMBER_AFTER:
+            self._renumber(section_name, min(first, row))
+        else:
+            self._shifts[section_name] = (shift + 1, min(first, row))
+
+    def _renumber(self, section_name, start):
+        self._shifts.pop(section_name, None)
+        programs = self.programs(section_name)
+        if type(programs) is list:
+            for row in range(start, len(programs)):
+                programs[row].row = row
+
+    def _row_of(self, section_name, program):
+        programs = self.programs(section_name)
+        if type(programs) is list:
+            row = program.row
+            if 0 <= row < len(programs) and programs[row] is program:
+                return row
+            shift, first = self._shifts.get(section_name, (0, 0))
+            if shift and row >= first:
+                # У записей нет __eq__, list.index сравнивает их по identity прямо в C
+                try:
+                    return programs.index(program, max(first, row - shift), row)
+                except ValueError:
+                    pass
+            # Список менялся в обход каталога
+            self._renumber(section_name, 0)
+            row = program.row
+            if 0 <= row < len(programs) and programs[row] is program:
+                return row
+            return -1
+        # Постраничный список SQLite не дочитывается целиком ради поиска строки
+        for row, p in enumerate(programs):
+            if p is program:
+                return row
+        return -1
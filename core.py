@@ -0,0 +1,501 @@
+import os
+import re
+import subprocess
+import threading
+import time
+
+from catalog import Catalog, default_data
+from frecency import UsageStats
+from launch_groups import GROUP_CONCURRENCY, GroupRun, check_order, group_items
+from search import SearchIndex
+from storage import open_storage
+from tracing import traced
+
+# Ядро лаунчера без Qt: каталог, хранилище, поисковый индекс, запуск программ
+# и отслеживание процессов. Окно (launcher.Launcher), команды --run/--list
+# и бенчмарки работают с каталогом одинаково, через этот класс.
+#
+#   core = LauncherCore("settings.json")    # json или sqlite, как в open_storage
+#   core.load()
+#   core.add_section("Игры")
+#   doom = core.add_program("Игры", "Doom", "/usr/bin/doom")   # -> Program, doom.id
+#   core.move_program(doom.id, "Программы")
+#   core.search("do")                       # -> [SearchResult], частые программы выше
+#   core.launch("Doom")                     # -> TrackedProcess
+#   core.set_group("Смена", [{"program": "Doom", "id": doom.id, "args": ["-warp", "1"]}])
+#   core.launch_group("Смена")              # -> GroupRun, запуск в фоне
+#   core.terminate_processes(core.group_processes("Смена"))   # -> Termination, в фоне
+#   core.adopt_processes()                  # запущенные до лаунчера программы каталога, в фоне
+#   core.close()
+#
+# Каждое изменение каталога сразу сохраняется: settings.json пишется в фоне,
+# в SQLite фиксируется транзакция. settings.json сериализуется в потоке владельца:
+# dispatch(fn) должен вызвать fn в нём (в окне - сигналом Qt); без dispatch
+# это происходит при следующем изменении или close(). Подписка на изменения - catalog.add_listener.
+# Неизвестное имя программы или группы - KeyError, ошибка запуска - OSError.
+# Колбэки процессов и групп вызываются из фоновых потоков
+class LauncherCore:
+    def __init__(self, settings_path, storage_kind=None,
+                 on_process_started=None, on_process_exited=None, on_sampled=None,
+                 on_group_finished=None, on_terminated=None, dispatch=None):
+        self.settings_path = settings_path
+        self.catalog = Catalog({"sections": {}})
+        self.search_index = SearchIndex()
+        self.catalog.add_listener(lambda delta: self.search_index.apply(delta, self.catalog))
+        self.storage = open_storage(settings_path, storage_kind, dispatch)
+        self.catalog.add_listener(lambda delta: self.storage.catalog_changed(delta, self.catalog))
+
+        self.on_process_started = on_process_started
+        self.on_process_exited = on_process_exited
+        self.on_sampled = on_sampled
+        self.on_group_finished = on_group_finished
+        self.on_terminated = on_terminated
+        self.group_runs = set()
+        self.usage = UsageStats()
+        self.prewarmer = None
+        # Захваченный вывод программ: ключ процесса -> ProcessOutput, и журналы по именам программ.
+        # Их пополняют и потоки запуска групп, поэтому изменения - под _outputs_lock
+        self.outputs = {}
+        self.output_logs = {}
+        self._outputs_lock = threading.Lock()
+        # Последняя известная версия settings.json для слияния внешних правок
+        self.settings_base = None
+        # Монитор процессов и psutil поднимаются при первой надобности
+        self.process_monitor = None
+        self.process_sampler = None
+        self.process_scanner = None
+
+    @property
+    def data(self):
+        return self.catalog.data
+
+    # Загрузка и сохранение
+
+    @traced("load_settings")
+    def load(self):
+        data = self.storage.load()
+        if data is None:
+            data = default_data()
+        # Статистика заменяется до сброса каталога: слушатели CatalogReset уже видят новую
+        self.usage = UsageStats(data.setdefault("usage", {}))
+        self.catalog.reset(data)
+        self.settings_base = None
+        if self.process_sampler is not None:
+            self.configure_telemetry()
+
+    @traced("save_settings")
+    def save(self):
+        self.storage.save(self.data)
+
+    def sync_settings(self, snapshot):
+        # Новая версия settings.json, прочитанная в фоне (settings_sync.SettingsSnapshot).
+        # Своя запись и первое чтение только запоминаются как известная версия, чужая
+        # правка сливается с каталогом в памяти; возвращается MergeReport или None.
+        # Только для хранилища json: каталог SQLite меняется транзакциями, а не файлом
+        if self.storage.kind != "json":
+            return None
+        base, self.settings_base = self.settings_base, snapshot
+        writer = self.storage.writer
+        if snapshot.stat == writer.last_stat:
+            return None
+        if base is None:
+            # Правка между загрузкой и первым чтением: сливать не с чем, остаётся каталог в памяти
+            if writer.rebase(snapshot.stat):
+                self.save()
+            return None
+        from settings_sync import merge
+        report = merge(self, base, snapshot)
+        if report.applied and self.process_sampler is not None:
+            self.configure_telemetry()
+        # Своя запись после base затёрта чужой или отложена из-за неё:
+        # изменения есть только в памяти
+        overwritten = writer.last_stat not in (None, base.stat)
+        if writer.rebase(snapshot.stat) or report.needs_save or overwritten:
+            self.save()
+        return report
+
+    def close(self):
+        # Несохранённые изменения дописываются до выхода
+        self.flush_usage()
+        self.storage.close()
+        if self.prewarmer is not None:
+            self.prewarmer.cancel()
+        for run in list(self.group_runs):
+            run.cancel()
+        with self._outputs_lock:
+            logs = list(self.output_logs.values())
+        for log in logs:
+            log.close()
+        if self.process_scanner is not None:
+            self.process_scanner.wait(1)
+        if self.process_monitor is not None:
+            self.process_sampler.stop()
+            self.process_monitor.stop()
+
+    # Разделы
+
+    def section_names(self):
+        return self.catalog.section_names()
+
+    def add_section(self, section_name, icon_path=""):
+        # False, если раздел с таким именем уже есть
+        if not self.catalog.add_section(section_name, icon_path):
+            return False
+        self.save()
+        return True
+
+    def remove_section(self, section_name):
+        if not self.catalog.remove_section(section_name):
+            return False
+        self.save()
+        return True
+
+    @traced("sort_programs")
+    def sort_section(self, section_name, key):
+        # key - поле программы ("name", "path") или "frecency" - сначала частые
+        if key == "frecency":
+            now = time.time()
+            key = lambda program: -self.usage.score(program.path, now)
+        self.catalog.sort_section(section_name, key)
+        self.save()
+
+    # Программы
+
+    def programs(self, section_name):
+        return self.catalog.programs(section_name)
+
+    def list_programs(self):
+        # Пары (раздел, программа) по всему каталогу в порядке отображения
+        for section_name in self.catalog.section_names():
+            for program in self.catalog.programs(section_name):
+                yield section_name, program
+
+    def find_program(self, name):
+        # (раздел, программа); сначала точное имя, затем без учёта регистра
+        section_name, row = self.catalog.find_program(name)
+        if section_name is not None:
+            return section_name, self.catalog.programs(section_name)[row]
+        folded = name.casefold()
+        for section_name, program in self.list_programs():
+            if program["name"].casefold() == folded:
+                return section_name, program
+        return None, None
+
+    def find_member(self, member):
+        # (раздел, программа) участника группы: по id записи, затем по пути,
+        # и только для групп без id - по имени. Имена в каталоге могут повторяться
+        program = self.catalog.get(member["id"]) if member.get("id") is not None else None
+        if program is None and member.get("path"):
+            records = self.catalog.by_path(member["path"])
+            program = records[0] if records else None
+        if program is not None:
+            return program.section, program
+        if member.get("id") is not None or member.get("path"):
+            return None, None
+        return self.find_program(member["program"])
+
+    def get_program(self, program_id):
+        # Запись по постоянному id или None; её раздел - program.section
+        return self.catalog.get(program_id)
+
+    def add_program(self, section_name, name, path, run_as_admin=False, **extra):
+        # Новая запись каталога (Program) с выданным id
+        program = {"name": name, "path": path, "run_as_admin": run_as_admin}
+        program.update(extra)
+        program = self.catalog.add_program(section_name, program)
+        self.save()
+        return program
+
+    def add_programs(self, section_name, programs):
+        # Пачка программ одной транзакцией хранилища; раздел создаётся при необходимости
+        with self.storage.transaction():
+            if section_name not in self.catalog.sections:
+                self.catalog.add_section(section_name)
+            for program in programs:
+                self.catalog.add_program(section_name, program)
+            self.save()
+
+    def rename_program(self, section_name, program, new_name):
+        self.catalog.rename_program(section_name, program, new_name)
+        self.save()
+
+    def set_run_as_admin(self, section_name, program, run_as_admin):
+        self.catalog.set_run_as_admin(section_name, program, run_as_admin)
+        self.save()
+
+    def set_capture_output(self, program, capture, log=False):
+        # Вывод программы сохраняется в памяти (capture_output) и, по желанию, в журнал (output_log)
+        extra = dict(program.extra or {})
+        extra.pop("capture_output", None)
+        extra.pop("output_log", None)
+        if capture:
+            extra["capture_output"] = True
+            if log:
+                extra["output_log"] = True
+        self.catalog.update_program(program.id, extra=extra or None)
+        self.save()
+
+    def remove_program(self, program_id):
+        # False, если записи с таким id уже нет
+        if not self.catalog.remove_program(program_id):
+            return False
+        self.save()
+        return True
+
+    @traced("move_program")
+    def move_program(self, program_id, new_section):
+        # False, если записи нет или она уже последняя в этом разделе
+        if not self.catalog.move_program(program_id, new_section):
+            return False
+        self.save()
+        return True
+
+    # Группы запуска: {"groups": {имя: {"concurrency": N, "members": [
+    #     {"program": имя в каталоге, "id": id записи, "path": путь, "args": [...], "cwd": каталог,
+    #      "after": [имена участников]}]}}}
+    # id и path необязательны; без них участник ищется по имени
+
+    def groups(self):
+        return self.data.get("groups", {})
+
+    def set_group(self, group_name, members, concurrency=GROUP_CONCURRENCY):
+        # ValueError, если зависимости участников не складываются в порядок запуска
+        group = {"concurrency": concurrency, "members": members}
+        check_order(group_items(group, self.find_member))
+        self.data.setdefault("groups", {})[group_name] = group
+        self.save()
+
+    def remove_group(self, group_name):
+        if self.data.get("groups", {}).pop(group_name, None) is None:
+            return False
+        self.save()
+        return True
+
+    def set_theme(self, theme_name):
+        self.data["theme"] = theme_name
+        self.save()
+
+    def add_discovery_folder(self, folder):
+        # Папка для импорта программ: {"discovery": {"folders": [...]}}; False, если уже есть
+        folders = self.data.setdefault("discovery", {}).setdefault("folders", [])
+        if folder in folders:
+            return False
+        folders.append(folder)
+        self.save()
+        return True
+
+    @traced("search")
+    def search(self, text, limit=200):
+        self.search_index.ensure_built(self.catalog)
+        return self.search_index.search(text, limit, self.usage.boost, self.usage.usage)
+
+    # Запуск и процессы
+
+    def configure_telemetry(self):
+        telemetry = self.data.get("telemetry", {})
+        self.process_sampler.configure(telemetry.get("interval"), telemetry.get("history"))
+
+    def start_process_services(self):
+        if self.process_monitor is not None:
+            return
+        from process_monitor import ProcessMonitor
+        from telemetry import ProcessSampler
+        self.process_monitor = ProcessMonitor(on_started=self.on_process_started,
+                                              on_exited=self.on_process_exited)
+        self.process_monitor.start()
+        self.process_sampler = ProcessSampler(self.process_monitor, on_sampled=self.on_sampled)
+        self.configure_telemetry()
+        self.process_sampler.start()
+
+    @traced("subprocess.Popen")
+    def start_program(self, path, run_as_admin=False, args=(), cwd=None, capture=None):
+        # TrackedProcess запущенной программы; запуск через runas не отслеживается.
+        # capture - запись каталога, чей вывод захватывается (см. capture_program), или None.
+        # Её ищет вызывающий в потоке владельца каталога: из потоков групп каталог
+        # не читается (SQLite отвечает только своему потоку).
+        # Запуск учитывается в self.usage, сохраняет его flush_usage
+        started = time.perf_counter()
+        if run_as_admin:
+            subprocess.Popen(['runas', '/user:Administrator', subprocess.list2cmdline([path, *args])], cwd=cwd)
+            self.usage.record(path, (time.perf_counter() - started) * 1000)
+            return None
+        if capture is None:
+            process = subprocess.Popen([path, *args], cwd=cwd)
+        else:
+            process = subprocess.Popen([path, *args], cwd=cwd,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        self.usage.record(path, (time.perf_counter() - started) * 1000)
+        self.start_process_services()
+        info = self.process_monitor.track(process, path)
+        if capture is not None:
+            self.capture_output(info, process.stdout, capture)
+        return info
+
+    # Вывод программ: {"output": {"buffer_kb": 256, "log_dir": "logs", "log_kb": 1024, "log_backups": 2}}
+    # и у программы "capture_output": true, "output_log": true
+
+    def output_list(self):
+        # Захваченный вывод в порядке запуска; список - копия, его можно читать в любом потоке
+        with self._outputs_lock:
+            return list(self.outputs.values())
+
+    def capture_program(self, path):
+        # Запись каталога с этим путём, у которой включён захват вывода, или None
+        for program in self.catalog.by_path(path):
+            if program.get("capture_output"):
+                return program
+        return None
+
+    def capture_output(self, info, stream, program):
+        from output_capture import (KEEP_FINISHED, LOG_BACKUPS, LOG_MAX_BYTES, OUTPUT_BUFFER_BYTES,
+                                    OutputBuffer, ProcessOutput, RotatingLog)
+        settings = self.data.get("output", {})
+        log = None
+        if program.get("output_log"):
+            log_dir = os.path.join(os.path.dirname(os.path.abspath(self.settings_path)),
+                                   settings.get("log_dir", "logs"))
+            log_path = os.path.join(log_dir, re.sub(r"[^\w.-]+", "_", program.name) + ".log")
+            # Участники группы с одним журналом пишут в один RotatingLog
+            with self._outputs_lock:
+                log = self.output_logs.get(log_path)
+                if log is None:
+                    log = self.output_logs[log_path] = RotatingLog(
+                        log_path, settings.get("log_kb", LOG_MAX_BYTES // 1024) * 1024,
+                        settings.get("log_backups", LOG_BACKUPS))
+        output = ProcessOutput(info, stream, OutputBuffer(
+            settings.get("buffer_kb", OUTPUT_BUFFER_BYTES // 1024) * 1024), log)
+        with self._outputs_lock:
+            # Вывод завершившихся программ остаётся для просмотра, но не больше KEEP_FINISHED
+            finished = [key for key, other in self.outputs.items() if other.finished]
+            for key in finished[:max(0, len(finished) - KEEP_FINISHED + 1)]:
+                del self.outputs[key]
+            self.outputs[info.key] = output
+        output.start()
+        return output
+
+    def launch(self, name):
+        _, program = self.find_program(name)
+        if program is None:
+            raise KeyError(name)
+        info = self.start_program(program["path"], program.get("run_as_admin", False),
+                                  capture=self.capture_program(program["path"]))
+        self.flush_usage()
+        return info
+
+    def flush_usage(self):
+        # Статистика запусков пишется вместе с настройками, но только из потока,
+        # владеющего хранилищем: потоки групп лишь отмечают её как изменённую
+        if self.usage.dirty:
+            self.usage.dirty = False
+            self.save()
+
+    def prewarm(self, on_finished=None):
+        # Фоновый прогрев кэша для самых частых программ: {"prewarm": {"enabled": true, "top": 10}}
+        settings = self.data.get("prewarm", {})
+        if not settings.get("enabled", True) or self.prewarmer is not None:
+            return None
+        from prewarm import PREWARM_MAX_BYTES, PREWARM_TOP, Prewarmer
+        self.prewarmer = Prewarmer(self.usage.top(settings.get("top", PREWARM_TOP)),
+                                   settings.get("max_bytes", PREWARM_MAX_BYTES), on_finished)
+        self.prewarmer.start()
+        return self.prewarmer
+
+    def launch_group(self, group_name, on_progress=None, on_finished=None):
+        # Группа запускается в пуле потоков, вызов сразу возвращает GroupRun.
+        # Итог приходит в on_finished (по умолчанию self.on_group_finished)
+        group = self.groups().get(group_name)
+        if group is None:
+            raise KeyError(group_name)
+        if on_finished is None:
+            on_finished = self.on_group_finished
+        # Монитор поднимается здесь, а не из потоков пула
+        self.start_process_services()
+
+        def finished(report):
+            self.group_runs.discard(run)
+            if on_finished:
+                on_finished(report)
+
+        run = GroupRun(group_name, group_items(group, self.find_member),
+                       lambda item: self.start_program(item.path, item.run_as_admin, item.args, item.cwd,
+                                                       item.capture),
+                       group.get("concurrency", GROUP_CONCURRENCY), on_progress, finished)
+        self.group_runs.add(run)
+        run.start()
+        return run
+
+    def adopt_processes(self, on_finished=None):
+        # Уже запущенные программы каталога берутся под наблюдение, как запущенные
+        # из лаунчера: {"adopt": {"enabled": true, "rescan_s": 15}}. Поиск идёт в фоне,
+        # вызов возвращает его поток или None (выключено или предыдущий поиск не закончен)
+        if not self.data.get("adopt", {}).get("enabled", True):
+            return None
+        self.start_process_services()
+        if self.process_scanner is None:
+            from process_scan import ProcessScanner
+            self.process_scanner = ProcessScanner(self.catalog)
+            self.catalog.add_listener(self.process_scanner.apply)
+        return self.process_scanner.start(self.process_monitor, on_finished)
+
+    def adopt_interval(self):
+        # Период повторного поиска, секунды; 0 - только при старте
+        from process_scan import RESCAN_INTERVAL
+        settings = self.data.get("adopt", {})
+        if not settings.get("enabled", True):
+            return 0
+        return settings.get("rescan_s", RESCAN_INTERVAL)
+
+    def running_processes(self):
+        if self.process_monitor is None:
+            return []
+        return self.process_monitor.processes()
+
+    @traced("psutil.terminate")
+    def terminate_process(self, pid):
+        # Завершает процесс вместе с потомками и ждёт их; возвращает TreeResult.
+        # ProcessLookupError, если процесса уже нет. Окно так не делает - см. terminate_processes
+        from termination import terminate_tree
+        return terminate_tree(pid)
+
+    def terminate_processes(self, processes, on_finished=None):
+        # Деревья процессов (TrackedProcess) завершаются в фоне, вызов сразу возвращает
+        # Termination. Итог приходит в on_finished (по умолчанию self.on_terminated)
+        from termination import Termination
+        termination = Termination(processes, on_finished=on_finished or self.on_terminated)
+        termination.start()
+        return termination
+
+    def group_processes(self, group_name):
+        # Запущенные процессы программ группы; KeyError, если группы нет
+        group = self.groups().get(group_name)
+        if group is None:
+            raise KeyError(group_name)
+        paths = {item.path for item in group_items(group, self.find_member) if item.path}
+        return [info for info in self.running_processes() if info.path in paths]
+
+    def handle_command(self, message):
+        # Команды единственного экземпляра, не требующие окна (--run, --group, --list)
+        command = message.get("command")
+        if command == "list":
+            return {"ok": True, "result": [
+                {"id": program.id, "section": section_name, "name": program.name, "path": program.path}
+                for section_name, program in self.list_programs()]}
+        if command == "run":
+            name = message.get("name", "")
+            try:
+                self.launch(name)
+            except KeyError:
+                return {"ok": False, "error": f"Программа '{name}' не найдена"}
+            except OSError as e:
+                return {"ok": False, "error": f"Не удалось запустить программу: {e}"}
+            return {"ok": True}
+        if command == "group":
+            name = message.get("name", "")
+            try:
+                run = self.launch_group(name)
+            except KeyError:
+                return {"ok": False, "error": f"Группа '{name}' не найдена"}
+            except ValueError as e:
+                return {"ok": False, "error": f"Группа '{name}': {e}"}
+            return {"ok": True, "result": {"members": len(run.items)}}
+        return {"ok": False, "error": f"Неизвестная команда: {command}"}
@@ -0,0 +1,270 @@
+import json
+import os
+import shlex
+import shutil
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+SCAN_THREADS = 8
+SCAN_CACHE_NAME = "scan_cache.json"
+SCAN_CACHE_VERSION = 1
+# Расширения исполняемых файлов вне Windows; остальное отсекается без stat
+POSIX_SUFFIXES = {"", ".sh", ".py", ".appimage"}
+WINDOWS_SUFFIXES = {".exe"}
+
+# Найденная программа; icon_path указывает на .desktop файл, из которого берётся значок
+Candidate = namedtuple("Candidate", "name path icon_path")
+# Каталог для сканирования; PATH просматривается без вложенных каталогов
+ScanRoot = namedtuple("ScanRoot", "path recursive")
+
+
+def default_roots():
+    roots = [ScanRoot(path, False) for path in os.environ.get("PATH", "").split(os.pathsep) if path]
+    if sys.platform != "win32":
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+        for base in [data_home] + data_dirs.split(":"):
+            if base:
+                roots.append(ScanRoot(os.path.join(base, "applications"), True))
+    return roots
+
+
+def _desktop_exec(command):
+    try:
+        args = shlex.split(command)
+    except ValueError:
+        return None
+    # "env VAR=value программа %U" -> программа
+    if args and args[0] == "env":
+        args = [arg for arg in args[1:] if "=" not in arg]
+    if not args or args[0].startswith("%"):
+        return None
+    return args[0] if os.path.isabs(args[0]) else shutil.which(args[0])
+
+
+def read_desktop_entry(path):
+    fields = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            in_entry = False
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    key, value = line.split("=", 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    if fields.get("Type", "Application") != "Application":
+        return None
+    if fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+        return None
+    executable = _desktop_exec(fields.get("Exec", ""))
+    if not executable:
+        return None
+    return Candidate(fields.get("Name") or os.path.basename(executable), executable, path)
+
+
+def classify_entry(entry):
+    # По DirEntry решает, программа ли это; stat делается только для подходящих имён
+    if entry.name.startswith("."):
+        return None
+    name, suffix = os.path.splitext(entry.name)
+    suffix = suffix.lower()
+    if suffix == ".desktop":
+        return read_desktop_entry(entry.path)
+    if sys.platform == "win32":
+        if suffix in WINDOWS_SUFFIXES and entry.is_file():
+            return Candidate(name, entry.path, "")
+        return None
+    if suffix not in POSIX_SUFFIXES or not entry.is_file():
+        return None
+    if not entry.stat().st_mode & 0o111:
+        return None
+    return Candidate(name, entry.path, "")
+
+
+# Кэш результатов сканирования по каталогам. Каталог с тем же mtime
+# повторно не читается: берутся сохранённые находки и список подкаталогов.
+# Правка .desktop файла без изменения каталога кэшем не замечается
+class ScanCache:
+    def __init__(self, path=None):
+        self.path = path
+        self.dirs = {}
+
+    def load(self):
+        if not self.path:
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == SCAN_CACHE_VERSION:
+            self.dirs = data.get("dirs", {})
+        return self
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": SCAN_CACHE_VERSION, "dirs": self.dirs}, f, ensure_ascii=False,
+                          separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+# Счётчики одного прохода сканера
+class ScanStats:
+    def __init__(self):
+        self.dirs = 0
+        self.cached_dirs = 0
+        self.found = 0
+        self.elapsed_ms = 0.0
+        self.cancelled = False
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+# Параллельный обход каталогов через os.scandir в пуле потоков.
+# Каждый каталог - отдельная задача, подкаталоги ставятся в очередь по мере чтения,
+# находки отдаются пачками через on_found сразу, не дожидаясь конца обхода.
+# Колбэки on_found и on_finished вызываются из рабочих потоков
+class DiscoveryScanner:
+    def __init__(self, roots, cache=None, on_found=None, on_finished=None, threads=SCAN_THREADS):
+        self.roots = list(roots)
+        self.cache = cache if cache is not None else ScanCache()
+        self.on_found = on_found
+        self.on_finished = on_finished
+        self.threads = threads
+        self.stats = ScanStats()
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._visited = set()
+        self._seen_paths = set()
+        self._new_dirs = {}
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._executor = None
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix="discovery")
+        roots = [root for root in self.roots if root.path]
+        if not roots:
+            self._finish()
+            return
+        with self._lock:
+            self._pending = len(roots)
+        for root in roots:
+            self._executor.submit(self._scan_dir, os.path.abspath(root.path), root.recursive)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _scan_dir(self, path, recursive):
+        try:
+            if not self._cancelled.is_set():
+                self._visit(path, recursive)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._pending -= 1
+                finished = self._pending == 0
+            if finished:
+                self._finish()
+
+    def _visit(self, path, recursive):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            # Ссылки и пересекающиеся корни не приводят к повторному обходу
+            if (st.st_dev, st.st_ino) in self._visited:
+                return
+            self._visited.add((st.st_dev, st.st_ino))
+
+        cached = self.cache.dirs.get(path)
+        if cached is not None and cached["mtime_ns"] == st.st_mtime_ns:
+            candidates = [Candidate(*item) for item in cached["candidates"]]
+            subdirs = cached["subdirs"]
+            from_cache = True
+        else:
+            candidates, subdirs = self._list_dir(path)
+            from_cache = False
+
+        with self._lock:
+            self._new_dirs[path] = {"mtime_ns": st.st_mtime_ns,
+                                    "candidates": [list(c) for c in candidates],
+                                    "subdirs": subdirs}
+            self.stats.dirs += 1
+            self.stats.cached_dirs += from_cache
+            fresh = []
+            for candidate in candidates:
+                key = os.path.normcase(candidate.path)
+                if key not in self._seen_paths:
+                    self._seen_paths.add(key)
+                    fresh.append(candidate)
+            self.stats.found += len(fresh)
+            if recursive:
+                self._pending += len(subdirs)
+
+        if recursive:
+            for subdir in subdirs:
+                self._executor.submit(self._scan_dir, subdir, True)
+        if fresh and self.on_found:
+            self.on_found(fresh)
+
+    @staticmethod
+    def _list_dir(path):
+        candidates = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                            continue
+                        candidate = classify_entry(entry)
+                    except OSError:
+                        continue
+                    if candidate is not None:
+                        candidates.append(candidate)
+        except OSError:
+            pass
+        return candidates, subdirs
+
+    def _finish(self):
+        self.stats.cancelled = self._cancelled.is_set()
+        self.stats.elapsed_ms = (time.perf_counter() - self._started) * 1000
+        if not self.stats.cancelled:
+            # Каталоги под просканированными корнями, которые больше не встретились,
+            # из кэша удаляются
+            prefixes = tuple(os.path.join(os.path.abspath(root.path), "") for root in self.roots if root.path)
+            self.cache.dirs = {path: entry for path, entry in self.cache.dirs.items()
+                               if not path.startswith(prefixes)}
+            self.cache.dirs.update(self._new_dirs)
+            self.cache.save()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._done.set()
+        if self.on_finished:
+            self.on_finished(self.stats)
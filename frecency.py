@@ -0,0 +1,74 @@
+import math
+import threading
+import time
+
+# За сколько дней вклад запуска в частоту убывает вдвое
+HALF_LIFE_DAYS = 7.0
+# Прибавка к текстовой оценке поиска: BOOST_PER_LEVEL за каждое удвоение частоты,
+# но не больше BOOST_MAX, чтобы частая программа не перебивала точное совпадение имени
+BOOST_PER_LEVEL = 40
+BOOST_MAX = 200
+
+_DECAY = math.log(2) / (HALF_LIFE_DAYS * 86400)
+
+
+# Статистика запусков в settings.json: {"usage": {путь: [запусков, время последнего
+# запуска (unix, с), частота на момент последнего запуска, Popen последнего запуска (мс)]}}.
+# Частота - затухающий счётчик: при запуске к ней прибавляется 1, а со временем
+# она убывает вдвое за HALF_LIFE_DAYS, поэтому запись на программу - четыре числа
+# и пересчитывать историю не нужно. Ключ - путь: переименование и перенос
+# между разделами статистику не сбрасывают.
+# record() можно вызывать из фоновых потоков; dirty означает несохранённые изменения
+class UsageStats:
+    def __init__(self, usage=None):
+        self.usage = usage if usage is not None else {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def record(self, path, spawn_ms=None, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self.usage.get(path)
+            if entry is None:
+                entry = [0, now, 0.0, None]
+            launches, last, score, last_spawn = entry[:4]
+            score = round(_decayed(score, last, now) + 1, 3)
+            if spawn_ms is not None:
+                last_spawn = round(spawn_ms, 1)
+            self.usage[path] = [launches + 1, int(now), score, last_spawn]
+            self.dirty = True
+
+    def launches(self, path):
+        entry = self.usage.get(path)
+        return entry[0] if entry else 0
+
+    def last_launched(self, path):
+        # Время последнего запуска (unix) или None
+        entry = self.usage.get(path)
+        return entry[1] if entry else None
+
+    def last_spawn_ms(self, path):
+        entry = self.usage.get(path)
+        return entry[3] if entry and len(entry) > 3 else None
+
+    def score(self, path, now=None):
+        entry = self.usage.get(path)
+        if not entry:
+            return 0.0
+        return _decayed(entry[2], entry[1], time.time() if now is None else now)
+
+    def boost(self, path, now=None):
+        score = self.score(path, now)
+        if score <= 0:
+            return 0
+        return min(BOOST_MAX, int(BOOST_PER_LEVEL * math.log2(1 + score)))
+
+    def top(self, limit, now=None):
+        # Пути самых частых программ, по убыванию частоты
+        now = time.time() if now is None else now
+        ranked = sorted(((self.score(path, now), path) for path in list(self.usage)), reverse=True)
+        return [path for score, path in ranked[:limit] if score > 0]
+
+
+def _decayed(score, last, now):
+    return score * math.exp(-_DECAY * max(0.0, now - last))
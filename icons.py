@@ -0,0 +1,213 @@
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QSize, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPixmap
+
+from tracing import traced
+
+ICON_SIZE = 32
+MEMORY_CACHE_KB = 8 * 1024
+LOADER_THREADS = 4
+IMAGE_SUFFIXES = {".png", ".ico", ".svg", ".jpg", ".jpeg", ".bmp", ".xpm", ".gif"}
+
+# Где искать значки по имени из .desktop файлов и по имени исполняемого файла
+ICON_THEME_DIRS = [
+    os.path.expanduser("~/.local/share/icons/hicolor"),
+    "/usr/share/icons/hicolor",
+]
+ICON_PIXMAP_DIRS = ["/usr/share/pixmaps"]
+ICON_THEME_SIZES = ["48x48", "64x64", "32x32", "128x128", "256x256", "scalable"]
+
+
+def icon_source(program):
+    # Явно заданный файл значка важнее самого исполняемого файла
+    return program.get("icon_path") or program.get("path", "")
+
+
+def _read_image(path, size):
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    if path.lower().endswith(".svg"):
+        reader.setScaledSize(QSize(size, size))
+    image = reader.read()
+    if image.isNull():
+        return None
+    return image
+
+
+def _find_theme_icon(name):
+    if os.path.isabs(name):
+        return name if os.path.exists(name) else None
+    for base in ICON_THEME_DIRS:
+        for size in ICON_THEME_SIZES:
+            for suffix in (".png", ".svg", ".xpm"):
+                candidate = os.path.join(base, size, "apps", name + suffix)
+                if os.path.exists(candidate):
+                    return candidate
+    for base in ICON_PIXMAP_DIRS:
+        for suffix in (".png", ".svg", ".xpm"):
+            candidate = os.path.join(base, name + suffix)
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+
+def _desktop_icon_name(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            in_entry = False
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and line.startswith("Icon="):
+                    return line[len("Icon="):].strip()
+    except OSError:
+        pass
+    return None
+
+
+def _extract_exe_icon(path):
+    # Значок из ресурсов .exe; без QtWinExtras остаётся заглушка
+    try:
+        import ctypes
+        from PyQt5.QtWinExtras import QtWin
+    except ImportError:
+        return None
+    large = ctypes.c_void_p()
+    if not ctypes.windll.shell32.ExtractIconExW(path, 0, ctypes.byref(large), None, 1) or not large.value:
+        return None
+    try:
+        image = QtWin.imageFromHICON(large.value)
+    finally:
+        ctypes.windll.user32.DestroyIcon(large)
+    return None if image.isNull() else image
+
+
+def load_icon_image(source, size=ICON_SIZE):
+    # Выполняется в рабочем потоке: здесь допустим только QImage, не QPixmap
+    suffix = os.path.splitext(source)[1].lower()
+    if suffix in IMAGE_SUFFIXES:
+        return _read_image(source, size)
+    if suffix == ".desktop":
+        name = _desktop_icon_name(source)
+        icon_file = _find_theme_icon(name) if name else None
+        return _read_image(icon_file, size) if icon_file else None
+    if sys.platform == "win32":
+        return _extract_exe_icon(source)
+    icon_file = _find_theme_icon(os.path.splitext(os.path.basename(source))[0])
+    return _read_image(icon_file, size) if icon_file else None
+
+
+class _LoaderSignals(QObject):
+    done = pyqtSignal(str, QImage, bool)
+
+
+# Загрузка одного значка: сначала дисковый кэш миниатюр по (путь, mtime, размер),
+# затем извлечение из источника с сохранением результата в кэш
+class _IconTask(QRunnable):
+    def __init__(self, source, cache_dir, size, signals):
+        super().__init__()
+        self.source = source
+        self.cache_dir = cache_dir
+        self.size = size
+        self.signals = signals
+
+    @traced("icon.load", "io")
+    def run(self):
+        try:
+            st = os.stat(self.source)
+        except OSError:
+            self.signals.done.emit(self.source, QImage(), False)
+            return
+
+        key = f"{os.path.abspath(self.source)}\0{st.st_mtime_ns}\0{st.st_size}\0{self.size}"
+        cache_file = os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+        if os.path.exists(cache_file):
+            # Пустой файл в кэше означает, что значка у источника нет
+            image = QImage(cache_file) if os.path.getsize(cache_file) else QImage()
+            self.signals.done.emit(self.source, image, True)
+            return
+
+        image = load_icon_image(self.source, self.size)
+        if image is not None:
+            image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if image is not None:
+                image.save(cache_file, "PNG")
+            else:
+                open(cache_file, "wb").close()
+        except OSError:
+            pass
+        self.signals.done.emit(self.source, image if image is not None else QImage(), False)
+
+
+# Значки разделов и программ. Строки рисуются сразу с заглушкой, а значки
+# подгружаются пулом потоков и складываются в ограниченный по объёму LRU-кэш.
+# iconsReady сообщает о пачке готовых значков, чтобы представления перерисовались
+class IconProvider(QObject):
+    iconsReady = pyqtSignal()
+
+    def __init__(self, cache_dir, size=ICON_SIZE, memory_kb=MEMORY_CACHE_KB, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.size = size
+        self.memory_kb = memory_kb
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "extracted": 0, "evicted": 0}
+
+        self._cache = OrderedDict()
+        self._cache_kb = 0
+        self._missing = set()
+        self._pending = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(LOADER_THREADS)
+        self._signals = _LoaderSignals()
+        self._signals.done.connect(self._on_loaded)
+        self._notify_timer = QTimer(self)
+        self._notify_timer.setSingleShot(True)
+        self._notify_timer.setInterval(30)
+        self._notify_timer.timeout.connect(self.iconsReady.emit)
+
+    def pixmap(self, source):
+        # Готовый значок или None; при промахе ставит загрузку в очередь
+        if not source:
+            return None
+        pixmap = self._cache.get(source)
+        if pixmap is not None:
+            self._cache.move_to_end(source)
+            self.stats["memory_hits"] += 1
+            return pixmap
+        if source not in self._pending and source not in self._missing:
+            self._pending.add(source)
+            self._pool.start(_IconTask(source, self.cache_dir, self.size, self._signals))
+        return None
+
+    def clear(self):
+        self._cache.clear()
+        self._cache_kb = 0
+        self._missing.clear()
+
+    def wait(self, msecs=-1):
+        return self._pool.waitForDone(msecs)
+
+    def _on_loaded(self, source, image, from_disk):
+        self._pending.discard(source)
+        self.stats["disk_hits" if from_disk else "extracted"] += 1
+        if image.isNull():
+            self._missing.add(source)
+            return
+
+        pixmap = QPixmap.fromImage(image)
+        cost_kb = max(1, pixmap.width() * pixmap.height() * pixmap.depth() // 8 // 1024)
+        self._cache[source] = pixmap
+        self._cache_kb += cost_kb
+        while self._cache_kb > self.memory_kb and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_kb -= max(1, evicted.width() * evicted.height() * evicted.depth() // 8 // 1024)
+            self.stats["evicted"] += 1
+        if not self._notify_timer.isActive():
+            self._notify_timer.start()
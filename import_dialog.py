@@ -0,0 +1,228 @@
+import os
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QListWidget, QListWidgetItem, QTreeView, QComboBox,
+                             QFileDialog, QAbstractItemView)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, pyqtSignal
+
+from discovery import DiscoveryScanner, ScanCache, ScanRoot, default_roots
+
+
+# Передаёт находки сканера из его потоков в поток интерфейса
+class _ScanEvents(QObject):
+    found = pyqtSignal(list)
+    finished = pyqtSignal(object)
+
+
+# Найденные программы с отметками. Новые находки дописываются пачкой в конец,
+# отметки хранятся отдельным набором строк, поэтому модель выдерживает сотни тысяч строк
+class CandidateModel(QAbstractTableModel):
+    HEADERS = ("Название", "Путь")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.candidates = []
+        self.unchecked = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.candidates)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        candidate = self.candidates[index.row()]
+        if role == Qt.DisplayRole:
+            return candidate.name if index.column() == 0 else candidate.path
+        if role == Qt.CheckStateRole and index.column() == 0:
+            return Qt.Unchecked if index.row() in self.unchecked else Qt.Checked
+        if role == Qt.ToolTipRole:
+            return candidate.icon_path or candidate.path
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or index.column() != 0:
+            return False
+        if value == Qt.Checked:
+            self.unchecked.discard(index.row())
+        else:
+            self.unchecked.add(index.row())
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def append(self, candidates):
+        start = len(self.candidates)
+        self.beginInsertRows(QModelIndex(), start, start + len(candidates) - 1)
+        self.candidates.extend(candidates)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.candidates = []
+        self.unchecked = set()
+        self.endResetModel()
+
+    def set_all_checked(self, checked):
+        self.unchecked = set() if checked else set(range(len(self.candidates)))
+        if self.candidates:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.candidates) - 1, 0),
+                                  [Qt.CheckStateRole])
+
+    def checked(self):
+        return [c for row, c in enumerate(self.candidates) if row not in self.unchecked]
+
+
+# Окно импорта установленных программ: выбор корней, потоковый вывод находок
+# во время сканирования и добавление отмеченных в раздел одной транзакцией
+class ImportDialog(QDialog):
+    def __init__(self, launcher):
+        super().__init__(launcher)
+        # Окно создаётся заново при каждом открытии и удаляется после закрытия
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.launcher = launcher
+        self.scanner = None
+        self.setWindowTitle("Импорт программ")
+        self.resize(800, 600)
+
+        discovery = launcher.data.get("discovery", {})
+        self.cache = ScanCache(os.path.join(os.path.dirname(launcher.get_settings_file_path()),
+                                            "scan_cache.json"))
+        self.existing = {os.path.normcase(program.get("path", ""))
+                         for section_name in launcher.catalog.section_names()
+                         for program in launcher.catalog.programs(section_name)}
+
+        self.events = _ScanEvents(self)
+        self.events.found.connect(self.on_found)
+        self.events.finished.connect(self.on_finished)
+
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel("Где искать:", self))
+        self.roots_list = QListWidget(self)
+        self.roots_list.setMaximumHeight(140)
+        for root in default_roots():
+            self.add_root_item(root, True)
+        for folder in discovery.get("folders", []):
+            self.add_root_item(ScanRoot(folder, True), True)
+        layout.addWidget(self.roots_list)
+
+        roots_buttons = QHBoxLayout()
+        self.add_folder_button = QPushButton("Добавить папку", self)
+        self.add_folder_button.clicked.connect(self.add_folder)
+        roots_buttons.addWidget(self.add_folder_button)
+        self.scan_button = QPushButton("Сканировать", self)
+        self.scan_button.clicked.connect(self.toggle_scan)
+        roots_buttons.addWidget(self.scan_button)
+        roots_buttons.addStretch()
+        layout.addLayout(roots_buttons)
+
+        self.status_label = QLabel("", self)
+        layout.addWidget(self.status_label)
+
+        self.model = CandidateModel(self)
+        self.results_view = QTreeView(self)
+        self.results_view.setModel(self.model)
+        self.results_view.setRootIsDecorated(False)
+        self.results_view.setUniformRowHeights(True)
+        self.results_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.results_view.setColumnWidth(0, 250)
+        layout.addWidget(self.results_view, 1)
+
+        accept_buttons = QHBoxLayout()
+        check_all_button = QPushButton("Отметить все", self)
+        check_all_button.clicked.connect(lambda: self.model.set_all_checked(True))
+        accept_buttons.addWidget(check_all_button)
+        uncheck_all_button = QPushButton("Снять все", self)
+        uncheck_all_button.clicked.connect(lambda: self.model.set_all_checked(False))
+        accept_buttons.addWidget(uncheck_all_button)
+        accept_buttons.addStretch()
+        accept_buttons.addWidget(QLabel("Раздел:", self))
+        self.section_combo = QComboBox(self)
+        self.section_combo.setEditable(True)
+        self.section_combo.addItems(launcher.catalog.section_names())
+        current = launcher.current_section_name()
+        if current:
+            self.section_combo.setCurrentText(current)
+        accept_buttons.addWidget(self.section_combo)
+        self.import_button = QPushButton("Добавить отмеченные", self)
+        self.import_button.clicked.connect(self.import_checked)
+        accept_buttons.addWidget(self.import_button)
+        layout.addLayout(accept_buttons)
+
+    def add_root_item(self, root, checked):
+        item = QListWidgetItem(root.path + ("" if root.recursive else "  (без подпапок)"))
+        item.setData(Qt.UserRole, root)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
+        self.roots_list.addItem(item)
+
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выбрать папку")
+        if not folder:
+            return
+        self.add_root_item(ScanRoot(folder, True), True)
+        self.launcher.core.add_discovery_folder(folder)
+
+    def checked_roots(self):
+        roots = []
+        for row in range(self.roots_list.count()):
+            item = self.roots_list.item(row)
+            if item.checkState() == Qt.Checked:
+                roots.append(item.data(Qt.UserRole))
+        return roots
+
+    def toggle_scan(self):
+        if self.scanner is not None:
+            self.scanner.cancel()
+            return
+        self.model.clear()
+        self.status_label.setText("Сканирование...")
+        self.scan_button.setText("Остановить")
+        self.scanner = DiscoveryScanner(self.checked_roots(), self.cache.load(),
+                                        on_found=self.events.found.emit,
+                                        on_finished=self.events.finished.emit)
+        self.scanner.start()
+
+    def on_found(self, candidates):
+        fresh = [c for c in candidates if os.path.normcase(c.path) not in self.existing]
+        if fresh:
+            self.model.append(fresh)
+        if self.scanner is not None:
+            self.status_label.setText(f"Сканирование... каталогов: {self.scanner.stats.dirs}, "
+                                      f"найдено: {self.model.rowCount()}")
+
+    def on_finished(self, stats):
+        self.scanner = None
+        self.scan_button.setText("Сканировать")
+        state = "Остановлено" if stats.cancelled else "Готово"
+        self.status_label.setText(f"{state}: каталогов {stats.dirs} (из кэша {stats.cached_dirs}), "
+                                  f"новых программ {self.model.rowCount()}, {stats.elapsed_ms / 1000:.1f} с")
+
+    def import_checked(self):
+        section_name = self.section_combo.currentText().strip()
+        candidates = self.model.checked()
+        if not section_name or not candidates:
+            return
+        self.launcher.import_programs(section_name, candidates)
+        self.existing.update(os.path.normcase(c.path) for c in candidates)
+        self.model.clear()
+        self.status_label.setText(f"Добавлено в раздел '{section_name}': {len(candidates)}")
+
+    def done(self, result):
+        if self.scanner is not None:
+            self.scanner.cancel()
+            self.scanner.wait(2)
+        super().done(result)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import socket
+import sys
+
+# Сколько клиент ждёт ответа запущенного экземпляра, секунды
+CLIENT_TIMEOUT = 2.0
+# Аргументы, которые обрабатываются уже запущенным экземпляром
+CLIENT_FLAGS = {"--run": "run", "--group": "group", "--show": "show", "--list": "list"}
+
+
+class InstanceNotRunning(Exception):
+    pass
+
+
+def server_name(settings_path):
+    # Один экземпляр на пользователя и на файл настроек
+    digest = hashlib.sha1(os.path.abspath(settings_path).encode("utf-8")).hexdigest()[:12]
+    user = os.environ.get("USERNAME") or os.environ.get("USER") or str(getattr(os, "getuid", lambda: 0)())
+    return f"zenith-nexus-{user}-{digest}"
+
+
+def server_address(name):
+    # Имя для QLocalServer.listen: на Windows это именованный канал,
+    # в остальных системах явный путь к Unix-сокету
+    if sys.platform == "win32":
+        return name
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(runtime_dir, name + ".sock")
+
+
+def encode_message(message):
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_message(line):
+    message = json.loads(line.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("ожидался JSON-объект")
+    return message
+
+
+def send_command(address, command, timeout=CLIENT_TIMEOUT):
+    # Одна команда - одно соединение: запрос и ответ по строке JSON.
+    # Qt здесь не нужен, поэтому клиент завершается за миллисекунды
+    try:
+        if sys.platform == "win32":
+            with open("\\\\.\\pipe\\" + address, "r+b", buffering=0) as pipe:
+                pipe.write(encode_message(command))
+                return decode_message(_read_line(pipe.read))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(address)
+            sock.sendall(encode_message(command))
+            return decode_message(_read_line(lambda size: sock.recv(size)))
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        raise InstanceNotRunning(str(e))
+
+
+def _read_line(read):
+    chunks = []
+    while True:
+        chunk = read(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+def parse_client_args(argv):
+    # Команда для запущенного экземпляра или None, если её нет в аргументах
+    for i, arg in enumerate(argv):
+        name, _, value = arg.partition("=")
+        command = CLIENT_FLAGS.get(name)
+        if command is None:
+            continue
+        message = {"command": command}
+        if command in ("run", "group"):
+            if not value and i + 1 < len(argv):
+                value = argv[i + 1]
+            message["name"] = value
+        return message
+    return None
+
+
+def deliver(argv, settings_path, out=sys.stdout):
+    # Код выхода, если команду обработал уже запущенный экземпляр,
+    # или None, если этот процесс должен стать экземпляром сам
+    command = parse_client_args(argv) or {"command": "show"}
+    try:
+        reply = send_command(server_address(server_name(settings_path)), command)
+    except InstanceNotRunning:
+        if command["command"] == "list":
+            print("Лаунчер не запущен", file=sys.stderr)
+            return 1
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Не удалось связаться с запущенным лаунчером: {e}", file=sys.stderr)
+        return 1
+
+    if not reply.get("ok"):
+        print(reply.get("error", "Ошибка"), file=sys.stderr)
+        return 1
+    if command["command"] == "list":
+        for entry in reply.get("result", []):
+            print(f"{entry['section']}\t{entry['name']}\t{entry['path']}", file=out)
+    return 0
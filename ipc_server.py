@@ -0,0 +1,71 @@
+import os
+import sys
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+from ipc import decode_message, encode_message, server_address
+
+
+# Сервер единственного экземпляра. Принимает строки JSON от ipc.send_command
+# и отвечает результатом handler(message), который выполняется в потоке интерфейса
+class InstanceServer(QObject):
+    def __init__(self, name, handler, parent=None):
+        super().__init__(parent)
+        self.address = server_address(name)
+        self.handler = handler
+        # Сокет занят этим процессом: только тогда его можно удалять при выходе
+        self.listening = False
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+
+    def listen(self):
+        self.listening = self._listen()
+        return self.listening
+
+    def _listen(self):
+        # Сначала проверяется, не отвечает ли на адресе живой экземпляр: с
+        # UserAccessOption Qt на POSIX создаёт сокет рядом и переименовывает его
+        # поверх существующего, так что listen "удаётся" и при работающем экземпляре
+        probe = QLocalSocket()
+        probe.connectToServer(self.address)
+        if probe.waitForConnected(200):
+            probe.abort()
+            return False
+        if self.server.listen(self.address):
+            return True
+        if self.server.serverError() != QLocalSocket.AddressInUseError:
+            return False
+        # Сокет остался от аварийно завершённого экземпляра: на нём никто
+        # не отвечает, его можно удалить и занять заново
+        QLocalServer.removeServer(self.address)
+        return self.server.listen(self.address)
+
+    def close(self):
+        # Чужой сокет (listen не удался) не трогается: иначе работающий
+        # экземпляр перестанет находиться следующими запусками
+        self.server.close()
+        if self.listening and sys.platform != "win32" and os.path.exists(self.address):
+            QLocalServer.removeServer(self.address)
+        self.listening = False
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.buffer = b""
+            connection.readyRead.connect(lambda c=connection: self._on_ready_read(c))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def _on_ready_read(self, connection):
+        connection.buffer += bytes(connection.readAll())
+        if b"\n" not in connection.buffer:
+            return
+        line = connection.buffer.split(b"\n", 1)[0]
+        try:
+            reply = self.handler(decode_message(line))
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        connection.write(encode_message(reply))
+        connection.flush()
+        connection.disconnectFromServer()
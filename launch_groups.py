@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from tracing import count, span
+
+# Сколько программ группы запускается одновременно, если в группе не указано
+GROUP_CONCURRENCY = 4
+
+# Участник группы, уже сопоставленный с каталогом: after - имена участников,
+# которые должны быть запущены раньше, capture - запись каталога, если у неё включён
+# захват вывода. Всё из каталога берётся при сборке участников: потоки пула каталог не читают
+LaunchItem = namedtuple("LaunchItem", "name path args cwd run_as_admin after capture")
+# Итог по одному участнику. spawn_ms - сам вызов Popen, started_ms - от начала
+# запуска группы до появления процесса (включая ожидание зависимостей и очереди).
+# error - текст ошибки, для успешного запуска None
+MemberResult = namedtuple("MemberResult", "name path pid spawn_ms started_ms error")
+
+
+def group_items(group, find_member):
+    # Участники группы из настроек -> LaunchItem в порядке группы.
+    # find_member(member) -> (раздел, программа) как в LauncherCore.find_member;
+    # участник, которого нет в каталоге, получает пустой путь и завершится ошибкой.
+    # Одноимённые участники различаются по id записи: "Имя #id"
+    items = []
+    names = set()
+    for member in group.get("members", []):
+        _, program = find_member(member)
+        name = member["program"]
+        if name in names and member.get("id") is not None:
+            name = f"{name} #{member['id']}"
+        names.add(name)
+        items.append(LaunchItem(
+            name=name,
+            path=program["path"] if program is not None else "",
+            args=list(member.get("args", [])),
+            cwd=member.get("cwd") or None,
+            run_as_admin=program.get("run_as_admin", False) if program is not None else False,
+            after=list(member.get("after", [])),
+            capture=program if program is not None and program.get("capture_output") else None))
+    return items
+
+
+def check_order(items):
+    # ValueError, если зависимость не входит в группу или зависимости образуют цикл
+    names = {item.name for item in items}
+    if len(names) != len(items):
+        raise ValueError("имена участников группы повторяются")
+    for item in items:
+        for name in item.after:
+            if name not in names:
+                raise ValueError(f"'{item.name}' зависит от '{name}', которого нет в группе")
+
+    remaining = {item.name: set(item.after) for item in items}
+    while remaining:
+        ready = [name for name, after in remaining.items() if not after]
+        if not ready:
+            raise ValueError("зависимости в группе образуют цикл: " + ", ".join(sorted(remaining)))
+        for name in ready:
+            del remaining[name]
+        for after in remaining.values():
+            after.difference_update(ready)
+
+
+# Итог запуска группы целиком
+class GroupReport:
+    def __init__(self, group_name, results, total_ms):
+        self.group_name = group_name
+        self.results = results
+        self.total_ms = total_ms
+
+    @property
+    def spawned(self):
+        return [result for result in self.results if result.error is None]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if result.error is not None]
+
+    def summary(self):
+        spawned = self.spawned
+        text = f"Группа '{self.group_name}': запущено {len(spawned)} из {len(self.results)} за {self.total_ms:.0f} мс"
+        if spawned:
+            text += f", Popen ср. {sum(r.spawn_ms for r in spawned) / len(spawned):.1f} мс, " \
+                    f"макс. {max(r.spawn_ms for r in spawned):.1f} мс"
+        return text
+
+
+# Фоновый запуск группы программ.
+# Участник отправляется в пул, как только запущены все его зависимости;
+# одновременно выполняется не больше concurrency вызовов Popen. Если участник
+# не запустился, зависимые от него пропускаются с ошибкой.
+# spawn(item) -> TrackedProcess или None (запуск через runas), ошибка - исключение.
+# Колбэки вызываются из потоков пула
+class GroupRun:
+    def __init__(self, group_name, items, spawn, concurrency=GROUP_CONCURRENCY,
+                 on_progress=None, on_finished=None):
+        check_order(items)
+        self.group_name = group_name
+        self.items = list(items)
+        self.spawn = spawn
+        self.concurrency = max(1, int(concurrency or GROUP_CONCURRENCY))
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.report = None
+
+        self._lock = threading.Lock()
+        self._results = {}
+        self._waiting = {item.name: set(item.after) for item in self.items}
+        self._dependents = {item.name: [] for item in self.items}
+        for item in self.items:
+            for name in item.after:
+                self._dependents[name].append(item)
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._executor = None
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._executor = ThreadPoolExecutor(min(self.concurrency, max(1, len(self.items))),
+                                            thread_name_prefix="launch-group")
+        ready = [item for item in self.items if not item.after]
+        if not ready:
+            self._finish()
+            return
+        for item in ready:
+            self._executor.submit(self._launch, item)
+
+    def cancel(self):
+        # Ещё не запущенные участники пропускаются, уже запущенные не трогаются
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _launch(self, item):
+        pid = None
+        error = None
+        spawn_start = time.perf_counter()
+        if self._cancelled.is_set():
+            error = "запуск группы отменён"
+        elif not item.path:
+            error = "программа не найдена в каталоге"
+        else:
+            try:
+                with span("group.spawn", "process"):
+                    info = self.spawn(item)
+                pid = info.pid if info is not None else None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        now = time.perf_counter()
+        self._complete(item, MemberResult(item.name, item.path, pid, (now - spawn_start) * 1000,
+                                          (now - self._started) * 1000, error))
+
+    def _complete(self, item, result):
+        ready = []
+        with self._lock:
+            # Неудача участника обходит всех зависимых от него без запуска
+            failed = [(item, result)]
+            while failed:
+                failed_item, failed_result = failed.pop()
+                self._results[failed_item.name] = failed_result
+                for dependent in self._dependents[failed_item.name]:
+                    if dependent.name in self._results:
+                        continue
+                    waiting = self._waiting[dependent.name]
+                    waiting.discard(failed_item.name)
+                    if failed_result.error is not None:
+                        failed.append((dependent, MemberResult(
+                            dependent.name, dependent.path, None, 0.0, failed_result.started_ms,
+                            f"не запущена зависимость '{failed_item.name}'")))
+                    elif not waiting:
+                        ready.append(dependent)
+            finished = len(self._results) == len(self.items)
+
+        count("group_members_spawned" if result.error is None else "group_members_failed")
+        if self.on_progress:
+            self.on_progress(result)
+        for dependent in ready:
+            self._executor.submit(self._launch, dependent)
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        total_ms = (time.perf_counter() - self._started) * 1000
+        self.report = GroupReport(self.group_name,
+                                  [self._results[item.name] for item in self.items], total_ms)
+        self._executor.shutdown(wait=False)
+        try:
+            if self.on_finished:
+                self.on_finished(self.report)
+        finally:
+            self._done.set()
@@ -1,66 +1,126 @@
 import sys
 import os
-import json
+from startup_profile import StartupProfile
+from settings_store import default_settings_path
+
+if __name__ == '__main__':
+    # Команды для уже запущенного экземпляра отправляются до импорта Qt:
+    # повторный вызов не создаёт ни одного виджета и не пишет настройки
+    import ipc
+    _exit_code = ipc.deliver(sys.argv[1:], default_settings_path())
+    if _exit_code is not None:
+        sys.exit(_exit_code)
+
+import argparse
 import subprocess
-import psutil
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QFrame, QLabel, QPushButton, QFileDialog,
                              QInputDialog, QMenu, QMessageBox, QStackedWidget,
-                             QListWidget, QLineEdit)
-from PyQt5.QtCore import Qt, QMimeData, QSize, QDir
-from PyQt5.QtGui import QColor, QPalette, QDrag, QIcon, QPixmap
-from PyQt5.QtWidgets import QAbstractItemView
-
-# Класс для кнопки с возможностью перетаскивания
-class DraggableProgramButton(QPushButton):
-    def __init__(self, name, path, parent=None):
-        super().__init__(name, parent)
-        self.program_name = name
-        self.program_path = path
-        self.setToolTip(name)
-        self.setContextMenuPolicy(Qt.CustomContextMenu)
-
-    def mouseMoveEvent(self, e):
-        if e.buttons() != Qt.LeftButton:
-            return
+                             QListWidget, QListWidgetItem, QLineEdit, QButtonGroup)
+from PyQt5.QtCore import Qt, QTimer, QObject, pyqtSignal
+from PyQt5.QtGui import QIcon
 
-        mimeData = QMimeData()
-        mimeData.setText(self.program_name)
+from icons import IconProvider
+from ipc_server import InstanceServer
+from catalog import (CatalogReset, ProgramAdded, ProgramRemoved, ProgramChanged,
+                     SectionAdded, SectionRemoved)
+from core import LauncherCore
+from launch_groups import GROUP_CONCURRENCY
+from path_status import PathValidator
+from theme import DEFAULT_THEME, THEMES, apply_theme, current as current_theme
+from tracing import count, traced, tracer
+from program_list import PROGRAM_MIME_TYPE, ProgramListModel, ProgramListView, SearchResultsModel
+from sorting import SORT_FIELDS, SortKeys, SortOrder, push_field
 
-        drag = QDrag(self)
-        drag.setMimeData(mimeData)
-        
-        drag.exec_(Qt.MoveAction)
-
-# Класс для элементов списка программ
-class ProgramListItem(QWidget):
-    def __init__(self, program_info, section_name, parent=None):
-        super().__init__(parent)
-        self.program_info = program_info
-        self.section_name = section_name
-        self.setObjectName("program-list-item")
-        
-        item_layout = QHBoxLayout(self)
-        item_layout.setContentsMargins(10, 5, 10, 5)
-
-        self.program_button = DraggableProgramButton(program_info["name"], program_info["path"], self)
-        self.program_button.setObjectName("program-list-button")
-        
-        item_layout.addWidget(self.program_button, 1)
+# Пауза после последнего нажатия клавиши перед запуском поиска, мс
+SEARCH_DEBOUNCE_MS = 150
+# Сколько держать итог запуска группы в заголовке окна, мс
+GROUP_STATUS_MS = 5000
+# Через сколько после достройки страниц начинать прогрев частых программ, мс
+PREWARM_DELAY_MS = 2000
 
-        self.delete_button = QPushButton("X", self)
-        self.delete_button.setObjectName("delete-button")
-        self.delete_button.setFixedSize(QSize(30, 30))
-        item_layout.addWidget(self.delete_button)
+# Передаёт события монитора процессов, запуска групп и завершения программ
+# из их потоков в поток интерфейса
+class ProcessEvents(QObject):
+    started = pyqtSignal(object)
+    exited = pyqtSignal(object)
+    sampled = pyqtSignal()
+    group_finished = pyqtSignal(object)
+    terminated = pyqtSignal(object)
+    # Вызов функции в потоке интерфейса (сериализация настроек для SettingsWriter)
+    invoke = pyqtSignal(object)
 
-# Основной класс приложения-лаунчера
+# Основной класс приложения-лаунчера: окно поверх LauncherCore.
+# Вся работа с каталогом, хранилищем и процессами идёт через self.core
 class Launcher(QWidget):
-    def __init__(self):
+    def __init__(self, storage_kind=None, profile=None):
         super().__init__()
-        self.data = {}
+        self.profile = profile or StartupProfile()
+        self.process_events = ProcessEvents(self)
+        self.process_events.started.connect(self.on_process_started)
+        self.process_events.exited.connect(self.on_process_exited)
+        self.process_events.sampled.connect(self.on_processes_sampled)
+        self.process_events.group_finished.connect(self.on_group_finished)
+        self.process_events.terminated.connect(self.on_terminated)
+        self.process_events.invoke.connect(lambda fn: fn())
+        self.core = LauncherCore(self.get_settings_file_path(), storage_kind,
+                                 on_process_started=self.process_events.started.emit,
+                                 on_process_exited=self.process_events.exited.emit,
+                                 on_sampled=self.process_events.sampled.emit,
+                                 on_group_finished=self.process_events.group_finished.emit,
+                                 on_terminated=self.process_events.terminated.emit,
+                                 dispatch=self.process_events.invoke.emit)
+        self.catalog = self.core.catalog
+        self.search_index = self.core.search_index
+        self.storage = self.core.storage
+        self.catalog.add_listener(self.on_catalog_changed, self.on_catalog_about_to_change)
+        self.profile.mark("хранилище")
+        # (pid, create_time) -> строка в списке запущенных программ
         self.running_processes = {}
+        self.icon_provider = IconProvider(
+            os.path.join(os.path.dirname(self.get_settings_file_path()), "icon_cache"), parent=self)
+        self.icon_provider.iconsReady.connect(self.on_icons_ready)
+        self.path_validator = PathValidator(self)
+        self.path_validator.statusesChanged.connect(self.on_path_statuses_changed)
+        self.program_views = {}
+        self.section_pages = {}
+        self.nav_buttons = {}
+        # Разделы, чьи списки ещё не построены; достраиваются в простое
+        self.deferred_sections = []
+        self.deferred_timer = QTimer(self)
+        self.deferred_timer.setSingleShot(True)
+        self.deferred_timer.setInterval(0)
+        self.deferred_timer.timeout.connect(self.build_deferred_step)
+        self.prewarm_scheduled = False
+        self.adopt_timer = QTimer(self)
+        self.adopt_timer.timeout.connect(lambda: self.core.adopt_processes())
+        # Наблюдение за settings.json включается после достройки страниц
+        self.settings_watcher = None
+        self.changing_path = None
+        self.output_viewers = {}
+        # Сортировка списков - только порядок строк в моделях, каталог не меняется.
+        # sort_fields - [(поле, по убыванию)], sort_order - SortOrder или None
+        self.sort_keys = SortKeys()
+        self.sort_fields = []
+        self.sort_order = None
         self.initUI()
+        self.profile.mark("интерфейс")
         self.load_settings()
+        self.profile.mark("загрузка каталога")
+
+    @property
+    def data(self):
+        return self.catalog.data
+
+    # Монитор процессов и psutil поднимаются при первом запуске программы,
+    # первом показе страницы запущенных программ или в простое после старта
+    @property
+    def process_monitor(self):
+        return self.core.process_monitor
+
+    @property
+    def process_sampler(self):
+        return self.core.process_sampler
 
     def initUI(self):
         self.resize(1000, 700)
@@ -68,124 +128,8 @@ class Launcher(QWidget):
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.offset = None
 
-        # Настройка палитры для темной темы
-        palette = self.palette()
-        palette.setColor(QPalette.Window, QColor(20, 20, 20))
-        palette.setColor(QPalette.WindowText, Qt.white)
-        self.setPalette(palette)
-
-        # Стили неоморфизма
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2e2e2e;
-                font-family: "Segoe UI", sans-serif;
-            }
-            #main_frame {
-                background-color: #2e2e2e;
-                border-radius: 20px;
-            }
-            .title_bar {
-                background-color: #2e2e2e;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-            }
-            .title_bar_button {
-                background-color: #2e2e2e;
-                border: none;
-                color: #ffffff;
-                font-size: 18px;
-            }
-            .title_bar_button:hover {
-                color: #4a90e2;
-            }
-            QPushButton {
-                background: #2e2e2e;
-                color: white;
-                border-radius: 12px;
-                padding: 12px 24px;
-                font-weight: bold;
-                border: 2px solid #3e3e3e;
-            }
-            QPushButton:hover {
-                background: #3a3a3a;
-            }
-            QPushButton:pressed {
-            }
-            QLineEdit {
-                background-color: #2e2e2e;
-                border-radius: 10px;
-                border: 2px solid #3a3a3a;
-                padding: 8px;
-                color: #ffffff;
-            }
-            QFrame#nav_frame {
-                background: #2e2e2e;
-                border-radius: 15px;
-            }
-            #nav_frame QPushButton {
-                background: #2e2e2e;
-                border-radius: 8px;
-                text-align: left;
-                padding: 10px 15px;
-                font-size: 14px;
-                font-weight: normal;
-                color: #e0e0e0;
-                border: none;
-            }
-            #nav_frame QPushButton:checked {
-                background: #4a90e2;
-                color: white;
-                font-weight: bold;
-            }
-            #page_frame {
-                background-color: #2e2e2e;
-                border-radius: 15px;
-            }
-            .program-list-item {
-                background-color: #3e3e3e;
-                border-radius: 10px;
-                margin-bottom: 8px;
-            }
-            .program-list-button {
-                background-color: #3e3e3e;
-                color: #e0e0e0;
-                font-size: 14px;
-                border: none;
-                padding: 10px;
-                text-align: left;
-            }
-            .program-list-button:hover {
-                background-color: #4e4e4e;
-            }
-            .delete-button {
-                background-color: #e74c3c;
-                color: white;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                border: none;
-                width: 30px;
-                height: 30px;
-            }
-            .delete-button:hover {
-                background-color: #c0392b;
-            }
-            QListWidget {
-                background-color: #2e2e2e;
-                border: 2px solid #3a3a3a;
-                border-radius: 10px;
-                color: #e0e0e0;
-            }
-            QListWidget::item {
-                padding: 5px;
-            }
-            QListWidget::item:hover {
-                background-color: #3a3a3a;
-            }
-            QListWidget::item:selected {
-                background-color: #4a90e2;
-            }
-        """)
+        # Цвета и форма виджетов задаются темой (theme.py), а не таблицей стилей
+        apply_theme(QApplication.instance(), DEFAULT_THEME)
 
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
@@ -197,7 +141,16 @@ class Launcher(QWidget):
         self.title_bar_layout.setContentsMargins(15, 0, 15, 0)
         self.title_label = QLabel("Зенитный-Нексус", self)
         self.title_bar_layout.addWidget(self.title_label)
+        self.title_status_timer = QTimer(self)
+        self.title_status_timer.setSingleShot(True)
+        self.title_status_timer.setInterval(GROUP_STATUS_MS)
+        self.title_status_timer.timeout.connect(lambda: self.title_label.setText(self.windowTitle()))
         self.title_bar_layout.addStretch()
+        self.theme_button = QPushButton("Тема", self)
+        self.theme_menu = QMenu(self)
+        self.theme_menu.aboutToShow.connect(self.populate_theme_menu)
+        self.theme_button.setMenu(self.theme_menu)
+        self.title_bar_layout.addWidget(self.theme_button)
         self.minimize_button = QPushButton("—", self)
         self.minimize_button.clicked.connect(self.showMinimized)
         self.close_button = QPushButton("X", self)
@@ -216,6 +169,8 @@ class Launcher(QWidget):
         self.nav_frame.setObjectName("nav_frame")
         self.nav_layout = QVBoxLayout(self.nav_frame)
         self.nav_layout.setContentsMargins(0, 0, 0, 0)
+        self.nav_group = QButtonGroup(self)
+        self.nav_group.setExclusive(True)
         self.content_layout.addWidget(self.nav_frame, 1)
 
         self.sections_stack = QStackedWidget(self)
@@ -229,13 +184,16 @@ class Launcher(QWidget):
         self.search_input.textChanged.connect(self.filter_programs)
         self.control_panel_layout.addWidget(self.search_input)
 
-        self.sort_name_button = QPushButton("Сортировать по имени", self)
-        self.sort_name_button.clicked.connect(lambda: self.sort_programs("name"))
-        self.control_panel_layout.addWidget(self.sort_name_button)
-        
-        self.sort_path_button = QPushButton("Сортировать по пути", self)
-        self.sort_path_button.clicked.connect(lambda: self.sort_programs("path"))
-        self.control_panel_layout.addWidget(self.sort_path_button)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+
+        self.sort_button = QPushButton("Сортировка", self)
+        self.sort_menu = QMenu(self)
+        self.sort_menu.aboutToShow.connect(self.populate_sort_menu)
+        self.sort_button.setMenu(self.sort_menu)
+        self.control_panel_layout.addWidget(self.sort_button)
         
         self.main_layout.addLayout(self.control_panel_layout)
 
@@ -246,6 +204,16 @@ class Launcher(QWidget):
         self.add_program_button = QPushButton("Добавить программу", self)
         self.add_program_button.clicked.connect(self.add_program)
         self.control_buttons_layout.addWidget(self.add_program_button)
+
+        self.import_programs_button = QPushButton("Импорт программ", self)
+        self.import_programs_button.clicked.connect(self.show_import_dialog)
+        self.control_buttons_layout.addWidget(self.import_programs_button)
+
+        self.groups_button = QPushButton("Группы запуска", self)
+        self.groups_menu = QMenu(self)
+        self.groups_menu.aboutToShow.connect(self.populate_groups_menu)
+        self.groups_button.setMenu(self.groups_menu)
+        self.control_buttons_layout.addWidget(self.groups_button)
         
         self.add_section_button = QPushButton("Добавить раздел", self)
         self.add_section_button.clicked.connect(self.add_section)
@@ -255,8 +223,8 @@ class Launcher(QWidget):
         self.remove_section_button.clicked.connect(self.remove_section)
         self.control_buttons_layout.addWidget(self.remove_section_button)
         
-        self.update_ui()
-        self.update_running_processes_list()
+        self.build_running_page()
+        self.build_search_page()
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -271,32 +239,42 @@ class Launcher(QWidget):
     def mouseReleaseEvent(self, event):
         self.offset = None
     
+    def closeEvent(self, event):
+        self.core.close()
+        self.path_validator.shutdown()
+        if self.settings_watcher is not None:
+            self.settings_watcher.shutdown()
+        self.deferred_timer.stop()
+        self.adopt_timer.stop()
+        super().closeEvent(event)
+
     def load_settings(self):
-        settings_file = self.get_settings_file_path()
-        try:
-            with open(settings_file, "r", encoding="utf-8") as f:
-                self.data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.data = {
-                "sections": {
-                    "Программы": {"icon_path": "", "programs": []},
-                    "Игры": {"icon_path": "", "programs": []}
-                }
-            }
+        self.core.load()
+        theme_name = self.data.get("theme", DEFAULT_THEME)
+        if theme_name != current_theme().name:
+            apply_theme(QApplication.instance(), theme_name)
+
+    def populate_theme_menu(self):
+        self.theme_menu.clear()
+        for theme_name, theme in THEMES.items():
+            action = self.theme_menu.addAction(theme.title)
+            action.setCheckable(True)
+            action.setChecked(theme_name == current_theme().name)
+            action.triggered.connect(lambda checked, t=theme_name: self.set_theme(t))
+
+    @traced("set_theme")
+    def set_theme(self, theme_name):
+        # Только новая палитра: виджеты перерисовываются без повторного применения стиля
+        apply_theme(QApplication.instance(), theme_name)
+        self.core.set_theme(theme_name)
 
     def save_settings(self):
-        settings_file = self.get_settings_file_path()
-        with open(settings_file, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=4)
+        # settings.json пишется в фоне одной операцией на серию изменений,
+        # в SQLite фиксируется транзакция с уже применёнными дельтами
+        self.core.save()
     
     def get_settings_file_path(self):
-        # Получаем путь к исполняемому файлу или текущему скрипту
-        if getattr(sys, 'frozen', False):
-            # Если приложение запущено как исполняемый файл
-            return os.path.join(os.path.dirname(sys.executable), "settings.json")
-        else:
-            # Если запущено как скрипт Python
-            return os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
+        return default_settings_path()
 
     def add_program(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Выбрать программу", "", "Executable Files (*.exe)")
@@ -312,23 +290,99 @@ class Launcher(QWidget):
             section_name, ok = QInputDialog.getItem(self, "Выбор раздела", "Выберите раздел для программы:", section_names, 0, False)
             
             if ok and section_name:
-                self.data["sections"][section_name]["programs"].append({
-                    "name": program_name,
-                    "path": file_path,
-                    "run_as_admin": False
-                })
-                self.save_settings()
-                self.update_ui()
+                self.core.add_program(section_name, program_name, file_path)
+
+    def show_import_dialog(self):
+        from import_dialog import ImportDialog
+        ImportDialog(self).exec_()
+
+    def import_programs(self, section_name, candidates):
+        # Все найденные программы попадают в хранилище одной транзакцией
+        programs = []
+        for candidate in candidates:
+            program = {"name": candidate.name, "path": candidate.path, "run_as_admin": False}
+            if candidate.icon_path:
+                program["icon_path"] = candidate.icon_path
+            programs.append(program)
+        self.core.add_programs(section_name, programs)
+
+    def populate_groups_menu(self):
+        # Меню собирается при каждом открытии, группы могли поменяться в настройках
+        self.groups_menu.clear()
+        groups = self.core.groups()
+        for group_name, group in groups.items():
+            action = self.groups_menu.addAction(f"{group_name} ({len(group.get('members', []))})")
+            action.triggered.connect(lambda checked, g=group_name: self.launch_group(g))
+        if not groups:
+            self.groups_menu.addAction("Групп пока нет").setEnabled(False)
+        self.groups_menu.addSeparator()
+        self.groups_menu.addAction("Создать из текущего раздела...").triggered.connect(self.create_group_from_section)
+        close_menu = self.groups_menu.addMenu("Закрыть группу")
+        close_menu.setEnabled(bool(groups))
+        for group_name in groups:
+            close_menu.addAction(group_name).triggered.connect(
+                lambda checked, g=group_name: self.close_group(g))
+        remove_menu = self.groups_menu.addMenu("Удалить группу")
+        remove_menu.setEnabled(bool(groups))
+        for group_name in groups:
+            remove_menu.addAction(group_name).triggered.connect(
+                lambda checked, g=group_name: self.core.remove_group(g))
+
+    def create_group_from_section(self):
+        # Аргументы, рабочие каталоги и порядок участников задаются в settings.json
+        section_name = self.current_section_name()
+        if section_name is None:
+            QMessageBox.warning(self, "Ошибка", "Сначала откройте раздел с программами.")
+            return
+        group_name, ok = QInputDialog.getText(self, "Новая группа", "Название группы:", text=section_name)
+        if not ok or not group_name:
+            return
+        concurrency, ok = QInputDialog.getInt(self, "Новая группа", "Сколько программ запускать одновременно:",
+                                              GROUP_CONCURRENCY, 1, 64)
+        if not ok:
+            return
+        members = [{"program": program["name"], "id": program["id"], "path": program["path"]}
+                   for program in self.catalog.programs(section_name)]
+        try:
+            self.core.set_group(group_name, members, concurrency)
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось создать группу: {e}")
+
+    def launch_group(self, group_name):
+        # Popen идут в фоновых потоках, итог приходит в on_group_finished
+        try:
+            self.core.launch_group(group_name)
+        except KeyError:
+            QMessageBox.warning(self, "Ошибка", f"Группа '{group_name}' не найдена.")
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", f"Группа '{group_name}': {e}")
+
+    def close_group(self, group_name):
+        # Закрываются все запущенные экземпляры программ группы вместе с их дочерними процессами
+        try:
+            processes = self.core.group_processes(group_name)
+        except KeyError:
+            QMessageBox.warning(self, "Ошибка", f"Группа '{group_name}' не найдена.")
+            return
+        if not processes:
+            QMessageBox.information(self, "Группа запуска", f"Программы группы '{group_name}' не запущены.")
+            return
+        self.close_processes(processes)
+
+    def on_group_finished(self, report):
+        self.core.flush_usage()
+        if report.failed:
+            lines = [f"{result.name}: {result.error}" for result in report.failed]
+            QMessageBox.warning(self, "Группа запуска", report.summary() + "\n\n" + "\n".join(lines))
+            return
+        self.title_label.setText(report.summary())
+        self.title_status_timer.start()
 
     def add_section(self):
         section_name, ok = QInputDialog.getText(self, "Новый раздел", "Введите название для нового раздела:")
         
         if ok and section_name:
-            if section_name not in self.data["sections"]:
-                self.data["sections"][section_name] = {"icon_path": "", "programs": []}
-                self.save_settings()
-                self.update_ui()
-            else:
+            if not self.core.add_section(section_name):
                 QMessageBox.warning(self, "Ошибка", "Раздел с таким именем уже существует.")
 
     def remove_section(self):
@@ -344,64 +398,99 @@ class Launcher(QWidget):
                                          f"Вы уверены, что хотите удалить раздел '{section_name}' и все его программы?",
                                          QMessageBox.Yes | QMessageBox.No)
             if reply == QMessageBox.Yes:
-                del self.data["sections"][section_name]
-                self.save_settings()
-                self.update_ui()
+                self.core.remove_section(section_name)
 
+    @traced("update_ui")
     def update_ui(self):
-        while self.nav_layout.count():
-            item = self.nav_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        while self.sections_stack.count():
-            widget = self.sections_stack.widget(0)
-            self.sections_stack.removeWidget(widget)
-            widget.deleteLater()
-            
-        first_section_name = None
-        
-        for section_name, section_data in self.data.get("sections", {}).items():
-            if first_section_name is None:
-                first_section_name = section_name
-                
-            nav_button = QPushButton(section_name, self)
-            nav_button.setCheckable(True)
-            self.nav_layout.addWidget(nav_button)
-            
-            page = QFrame(self)
-            page.setObjectName("page_frame")
-            page_layout = QVBoxLayout(page)
-            page_layout.setContentsMargins(20, 20, 20, 20)
-            
-            label = QLabel(section_name, page)
-            label.setObjectName("section_label")
-            page_layout.addWidget(label)
-            
-            program_list_layout = QVBoxLayout()
-            page_layout.addLayout(program_list_layout)
-            page_layout.addStretch(1)
-            
-            page.setAcceptDrops(True)
-            page.dragEnterEvent = self.dragEnterEvent
-            page.dropEvent = lambda e, s=section_name: self.dropEvent(e, s)
-            
-            self.sections_stack.addWidget(page)
-            
-            nav_button.clicked.connect(lambda checked, idx=self.sections_stack.count()-1: self.sections_stack.setCurrentIndex(idx))
-            
-            for program in section_data["programs"]:
-                item = ProgramListItem(program, section_name, self)
-                item.program_button.clicked.connect(lambda checked, path=program["path"], admin=program.get("run_as_admin", False): self.launch_program(path, admin))
-                item.program_button.customContextMenuRequested.connect(
-                    lambda pos, p=program, sec=section_name: self.show_program_context_menu(pos, p, sec)
-                )
-                item.delete_button.clicked.connect(lambda checked, sec_name=section_name, name=program["name"]: self.remove_program(sec_name, name))
-                program_list_layout.addWidget(item)
-
-        # Добавляем раздел с запущенными процессами
+        # Полная перестройка страниц разделов; нужна только после загрузки каталога целиком.
+        # Обычные изменения применяются точечно в on_catalog_changed
+        current_section = self.current_section_name()
+        running_was_current = self.running_nav_button.isChecked()
+
+        for section_name in list(self.section_pages):
+            self.remove_section_page(section_name, reselect=False)
+        self.deferred_sections = []
+
+        for section_name in self.data.get("sections", {}):
+            self.add_section_page(section_name)
+
+        if self.sections_stack.currentWidget() is self.search_page:
+            return
+        if running_was_current:
+            self.show_page(self.running_page)
+        elif current_section in self.section_pages:
+            self.show_page(self.section_pages[current_section])
+        else:
+            self.show_page(self.sections_stack.widget(0))
+        if self.isVisible():
+            self.deferred_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Остальные страницы достраиваются после того, как окно уже показано
+        self.deferred_timer.start()
+
+    def build_deferred_step(self):
+        # За один шаг строится одна страница, чтобы окно не замирало
+        if self.running_list_widget is None:
+            self.ensure_running_page()
+        elif self.deferred_sections:
+            section_name = self.deferred_sections.pop(0)
+            if section_name in self.section_pages:
+                self.ensure_section_view(section_name)
+        if self.running_list_widget is None or self.deferred_sections:
+            self.deferred_timer.start()
+        elif not self.prewarm_scheduled:
+            # Всё построено, окно простаивает: строим индексы каталога
+            # и прогреваем кэш для частых программ
+            self.catalog.ensure_index()
+            self.prewarm_scheduled = True
+            QTimer.singleShot(PREWARM_DELAY_MS, self.core.prewarm)
+            self.start_settings_watcher()
+            self.start_process_adoption()
+
+    def start_process_adoption(self):
+        # Программы каталога, запущенные до старта лаунчера, появляются в списке
+        # запущенных; дальше раз в adopt_interval() досматриваются новые процессы
+        if self.core.adopt_processes() is None:
+            return
+        interval = self.core.adopt_interval()
+        if interval > 0:
+            self.adopt_timer.setInterval(int(interval * 1000))
+            self.adopt_timer.start()
+
+    def start_settings_watcher(self):
+        # Правки settings.json извне (развёртывание, другой пользователь) подхватываются
+        # без перезапуска и не затираются следующим сохранением
+        if self.settings_watcher is not None or self.storage.kind != "json":
+            return
+        from settings_watcher import SettingsWatcher
+        self.settings_watcher = SettingsWatcher(self.get_settings_file_path(), self)
+        self.settings_watcher.snapshotRead.connect(self.on_settings_file_changed)
+        self.settings_watcher.start()
+
+    def on_settings_file_changed(self, snapshot):
+        report = self.core.sync_settings(snapshot)
+        if report is None or not (report.applied or report.conflicts):
+            return
+        for section_name in report.sections_changed:
+            if section_name in self.nav_buttons:
+                self.nav_buttons[section_name].setIcon(QIcon())
+                self.update_section_icon(section_name)
+        if report.conflicts:
+            QMessageBox.warning(self, "Настройки изменены извне",
+                                report.summary() + ". Оставлены локальные версии:\n\n" + "\n".join(report.conflicts))
+            return
+        self.title_label.setText(report.summary())
+        self.title_status_timer.start()
+
+    def build_running_page(self):
+        # Раздел с запущенными процессами создаётся один раз и не перестраивается.
+        # Сначала это пустая страница, список строится в ensure_running_page
         nav_button = QPushButton("Запущенные программы", self)
+        nav_button.setFlat(True)
         nav_button.setCheckable(True)
+        self.nav_group.addButton(nav_button)
         self.nav_layout.addWidget(nav_button)
         
         running_page = QFrame(self)
@@ -409,59 +498,291 @@ class Launcher(QWidget):
         running_layout = QVBoxLayout(running_page)
         running_layout.setContentsMargins(20, 20, 20, 20)
         
-        running_label = QLabel("Запущенные программы", running_page)
-        running_layout.addWidget(running_label)
+        self.sections_stack.addWidget(running_page)
+        nav_button.clicked.connect(lambda checked, p=running_page: self.show_page(p))
+        
+        self.nav_layout.addStretch(1)
+        self.running_page = running_page
+        self.running_nav_button = nav_button
+        self.running_list_widget = None
+
+    @traced("build_running_page")
+    def ensure_running_page(self):
+        if self.running_list_widget is not None:
+            return
+        self.core.start_process_services()
+        from process_view import RunningProcessDelegate
+
+        running_layout = self.running_page.layout()
+        header_layout = QHBoxLayout()
+        running_label = QLabel("Запущенные программы", self.running_page)
+        header_layout.addWidget(running_label)
+        header_layout.addStretch()
+        output_button = QPushButton("Вывод программ", self.running_page)
+        self.output_menu = QMenu(self)
+        self.output_menu.aboutToShow.connect(self.populate_output_menu)
+        output_button.setMenu(self.output_menu)
+        header_layout.addWidget(output_button)
+        close_all_button = QPushButton("Закрыть все", self.running_page)
+        close_all_button.clicked.connect(self.close_all_processes)
+        header_layout.addWidget(close_all_button)
+        running_layout.addLayout(header_layout)
         
-        self.running_list_widget = QListWidget(running_page)
+        self.running_list_widget = QListWidget(self.running_page)
         self.running_list_widget.setContextMenuPolicy(Qt.CustomContextMenu)
         self.running_list_widget.customContextMenuRequested.connect(self.show_running_context_menu)
+        self.running_list_widget.setItemDelegate(RunningProcessDelegate(self.process_sampler, self.running_list_widget))
         running_layout.addWidget(self.running_list_widget)
+        self.update_running_processes_list()
+
+    def build_search_page(self):
+        # Общая страница результатов поиска по всем разделам; в навигации её нет
+        search_page = QFrame(self)
+        search_page.setObjectName("page_frame")
+        search_layout = QVBoxLayout(search_page)
+        search_layout.setContentsMargins(20, 20, 20, 20)
+
+        search_label = QLabel("Результаты поиска", search_page)
+        search_layout.addWidget(search_label)
+
+        self.search_results_view = ProgramListView(search_page, self.icon_provider, self.path_validator)
+        self.search_results_view.setModel(SearchResultsModel(self.search_results_view))
+        self.connect_program_view(self.search_results_view)
+        search_layout.addWidget(self.search_results_view, 1)
+
+        self.sections_stack.addWidget(search_page)
+        self.search_page = search_page
+        self.page_before_search = None
+
+    def connect_program_view(self, view):
+        view.launchRequested.connect(lambda p, sec: self.launch_program(p["path"], p.get("run_as_admin", False)))
+        view.deleteRequested.connect(lambda p, sec: self.remove_program(p))
+        view.contextMenuRequested.connect(self.show_program_context_menu)
+
+    def add_section_page(self, section_name):
+        # Разделы идут в порядке каталога, перед страницей запущенных программ
+        position = self.catalog.section_names().index(section_name)
+
+        nav_button = QPushButton(section_name, self)
+        nav_button.setFlat(True)
+        nav_button.setCheckable(True)
+        self.nav_group.addButton(nav_button)
+        self.nav_layout.insertWidget(position, nav_button)
         
-        self.sections_stack.addWidget(running_page)
-        nav_button.clicked.connect(lambda checked, idx=self.sections_stack.count()-1: self.sections_stack.setCurrentIndex(idx))
+        page = QFrame(self)
+        page.setObjectName("page_frame")
+        page_layout = QVBoxLayout(page)
+        page_layout.setContentsMargins(20, 20, 20, 20)
         
-        self.nav_layout.addStretch(1)
+        page.setAcceptDrops(True)
+        page.dragEnterEvent = self.dragEnterEvent
+        page.dropEvent = lambda e, s=section_name: self.dropEvent(e, s)
+        
+        self.sections_stack.insertWidget(position, page)
+        nav_button.clicked.connect(lambda checked, p=page: self.show_page(p))
+
+        self.section_pages[section_name] = page
+        self.nav_buttons[section_name] = nav_button
+        self.deferred_sections.append(section_name)
+        self.update_section_icon(section_name)
+
+    @traced("build_section_page")
+    def ensure_section_view(self, section_name):
+        # Список программ раздела строится при первом показе страницы или в простое
+        if section_name in self.program_views:
+            return
+        page = self.section_pages[section_name]
+        page_layout = page.layout()
+
+        label = QLabel(section_name, page)
+        label.setObjectName("section_label")
+        page_layout.addWidget(label)
         
-        if self.sections_stack.count() > 0:
-            self.sections_stack.setCurrentIndex(0)
-            if self.nav_layout.itemAt(0) and self.nav_layout.itemAt(0).widget():
-                self.nav_layout.itemAt(0).widget().setChecked(True)
+        view = ProgramListView(page, self.icon_provider, self.path_validator)
+        model = ProgramListModel(self.catalog, section_name, view)
+        if self.sort_order is not None:
+            model.set_sort(self.sort_order)
+        view.setModel(model)
+        self.connect_program_view(view)
+        page_layout.addWidget(view, 1)
+        self.program_views[section_name] = view
+        count("section_pages_built")
+
+    def update_section_icon(self, section_name):
+        nav_button = self.nav_buttons[section_name]
+        if not nav_button.icon().isNull():
+            return
+        pixmap = self.icon_provider.pixmap(self.data["sections"][section_name].get("icon_path", ""))
+        if pixmap is not None:
+            nav_button.setIcon(QIcon(pixmap))
+
+    def on_icons_ready(self):
+        # Перерисовываются только видимые строки; значки берутся уже из кэша
+        for view in list(self.program_views.values()) + [self.search_results_view]:
+            view.viewport().update()
+        for section_name in self.nav_buttons:
+            self.update_section_icon(section_name)
+
+    def on_path_statuses_changed(self, paths):
+        # Скрытые списки перерисуются сами при показе
+        for view in list(self.program_views.values()) + [self.search_results_view]:
+            if view.isVisible():
+                view.viewport().update()
+
+    def remove_section_page(self, section_name, reselect=True):
+        page = self.section_pages.pop(section_name)
+        nav_button = self.nav_buttons.pop(section_name)
+        self.program_views.pop(section_name, None)
+
+        was_current = self.sections_stack.currentWidget() is page
+        self.nav_group.removeButton(nav_button)
+        self.nav_layout.removeWidget(nav_button)
+        nav_button.deleteLater()
+        self.sections_stack.removeWidget(page)
+        page.deleteLater()
+
+        if self.page_before_search is page:
+            self.page_before_search = None
+        if was_current and reselect:
+            self.show_page(self.sections_stack.widget(0))
+
+    def show_page(self, page):
+        if page is None:
+            return
+        if page is self.running_page:
+            self.ensure_running_page()
+        section_name = next((name for name, section_page in self.section_pages.items()
+                             if section_page is page), None)
+        if section_name is not None:
+            self.ensure_section_view(section_name)
+            self.apply_sort(section_name)
+        self.sections_stack.setCurrentWidget(page)
+        if page is self.search_page:
+            # Во время поиска ни один раздел навигации не выбран
+            checked = self.nav_group.checkedButton()
+            if checked is not None:
+                self.nav_group.setExclusive(False)
+                checked.setChecked(False)
+                self.nav_group.setExclusive(True)
+        elif page is self.running_page:
+            self.on_processes_sampled()
+            self.running_nav_button.setChecked(True)
+        elif section_name is not None:
+            self.nav_buttons[section_name].setChecked(True)
+
+    def current_section_name(self):
+        current = self.sections_stack.currentWidget()
+        for section_name, page in self.section_pages.items():
+            if page is current:
+                return section_name
+        return None
+
+    def on_catalog_about_to_change(self, delta):
+        if isinstance(delta, SectionRemoved):
+            for program in self.catalog.programs(delta.section):
+                self.path_validator.discard(program.path)
+        elif isinstance(delta, ProgramChanged):
+            # Путь мог поменяться: сравнивается в on_catalog_changed
+            self.changing_path = delta.program.path
+        for view in self.program_views.values():
+            view.model().catalog_about_to_change(delta)
+
+    def on_catalog_changed(self, delta):
+        # Поисковый индекс обновляет слушатель ядра, он подписан раньше окна
+        self.sort_keys.apply(delta)
+        if self.search_input.text():
+            self.search_timer.start()
+
+        if isinstance(delta, CatalogReset):
+            # После загрузки статистика запусков - новый объект
+            self.sort_order = self.make_sort_order()
+            self.path_validator.reset(program.path
+                                      for section_name in self.catalog.section_names()
+                                      for program in self.catalog.programs(section_name))
+            self.update_ui()
+            return
+        if isinstance(delta, ProgramAdded):
+            self.path_validator.add(delta.program.path)
+        elif isinstance(delta, ProgramRemoved):
+            self.path_validator.discard(delta.program.path)
+        elif isinstance(delta, ProgramChanged) and delta.program.path != self.changing_path:
+            self.path_validator.discard(self.changing_path)
+            self.path_validator.add(delta.program.path)
+        if isinstance(delta, SectionAdded):
+            self.add_section_page(delta.section)
+            return
+        if isinstance(delta, SectionRemoved):
+            self.remove_section_page(delta.section)
+            return
+
+        for view in self.program_views.values():
+            view.model().catalog_changed(delta)
 
     def filter_programs(self, text):
-        for i in range(self.sections_stack.count()):
-            page = self.sections_stack.widget(i)
-            # Пропускаем страницу с запущенными программами
-            if page.children() and isinstance(page.children()[-1], QListWidget):
-                continue
-            
-            list_layout = page.children()[-1]
-            if not isinstance(list_layout, QVBoxLayout):
-                continue
-            
-            for j in range(list_layout.count()):
-                item_widget = list_layout.itemAt(j).widget()
-                if item_widget and isinstance(item_widget, ProgramListItem):
-                    name = item_widget.program_info.get("name", "").lower()
-                    path = item_widget.program_info.get("path", "").lower()
-                    if text.lower() in name or text.lower() in path:
-                        item_widget.setVisible(True)
-                    else:
-                        item_widget.setVisible(False)
+        # Серия нажатий клавиш схлопывается в один запрос к индексу
+        self.search_timer.start()
+
+    @traced("filter_programs")
+    def run_search(self):
+        text = self.search_input.text()
+        if not text.strip():
+            if self.sections_stack.currentWidget() is self.search_page:
+                self.show_page(self.page_before_search or self.sections_stack.widget(0))
+            self.page_before_search = None
+            self.search_results_view.model().set_results([])
+            return
+
+        self.search_results_view.model().set_results(self.core.search(text))
+        if self.sections_stack.currentWidget() is not self.search_page:
+            self.page_before_search = self.sections_stack.currentWidget()
+            self.show_page(self.search_page)
     
-    def sort_programs(self, key):
-        current_index = self.sections_stack.currentIndex()
-        if current_index >= 0 and current_index < len(self.data["sections"]):
-            section_name = list(self.data["sections"].keys())[current_index]
-            programs = self.data["sections"][section_name]["programs"]
-            programs.sort(key=lambda p: p.get(key, "").lower())
-            self.save_settings()
-            self.update_ui()
+    def populate_sort_menu(self):
+        self.sort_menu.clear()
+        action = self.sort_menu.addAction("Порядок каталога")
+        action.setCheckable(True)
+        action.setChecked(not self.sort_fields)
+        action.triggered.connect(lambda checked: self.sort_programs(None))
+        self.sort_menu.addSeparator()
+        ranks = {field: (rank, descending) for rank, (field, descending) in enumerate(self.sort_fields)}
+        for field, (title, default_descending) in SORT_FIELDS.items():
+            if field in ranks:
+                rank, descending = ranks[field]
+                title = f"{rank + 1}. {title} {'↓' if descending else '↑'}"
+            action = self.sort_menu.addAction(title)
+            action.setCheckable(True)
+            action.setChecked(field in ranks)
+            action.triggered.connect(lambda checked, f=field: self.sort_programs(f))
+
+    @traced("sort_programs")
+    def sort_programs(self, field):
+        # field становится главным полем сортировки, прежние поля - второстепенными;
+        # повторный выбор главного поля меняет направление, None - порядок каталога.
+        # Переставляются только строки видимого списка: ни записи в файл, ни новых виджетов.
+        # Остальные разделы пересортируются при показе
+        self.sort_fields = push_field(self.sort_fields, field) if field is not None else []
+        self.sort_order = self.make_sort_order()
+        self.sort_button.setText(f"Сортировка: {self.sort_order.label()}" if self.sort_order
+                                 else "Сортировка")
+        section_name = self.current_section_name()
+        if section_name is not None:
+            self.apply_sort(section_name)
+
+    def make_sort_order(self):
+        if not self.sort_fields:
+            return None
+        return SortOrder(self.sort_fields, self.sort_keys, self.core.usage)
+
+    def apply_sort(self, section_name):
+        view = self.program_views.get(section_name)
+        if view is not None and view.model().sort_order is not self.sort_order:
+            view.model().set_sort(self.sort_order)
     
-    def show_program_context_menu(self, pos, program, section_name):
+    def show_program_context_menu(self, global_pos, program, section_name):
         menu = QMenu(self)
         
         delete_action = menu.addAction("Удалить")
-        delete_action.triggered.connect(lambda: self.remove_program(section_name, program["name"]))
+        delete_action.triggered.connect(lambda: self.remove_program(program))
         
         edit_action = menu.addAction("Изменить")
         edit_action.triggered.connect(lambda: self.edit_program(section_name, program))
@@ -473,52 +794,56 @@ class Launcher(QWidget):
         run_as_admin_action.setCheckable(True)
         run_as_admin_action.setChecked(program.get("run_as_admin", False))
         run_as_admin_action.triggered.connect(lambda: self.toggle_run_as_admin(section_name, program))
+
+        capture = bool(program.get("capture_output"))
+        capture_action = menu.addAction("Сохранять вывод программы")
+        capture_action.setCheckable(True)
+        capture_action.setChecked(capture)
+        capture_action.triggered.connect(lambda checked: self.core.set_capture_output(program, checked))
+        log_action = menu.addAction("Записывать вывод в журнал")
+        log_action.setCheckable(True)
+        log_action.setChecked(bool(program.get("output_log")))
+        log_action.setEnabled(capture)
+        log_action.triggered.connect(lambda checked: self.core.set_capture_output(program, True, checked))
         
-        menu.exec_(self.mapToGlobal(pos))
+        menu.exec_(global_pos)
     
     def show_running_context_menu(self, pos):
         item = self.running_list_widget.itemAt(pos)
-        if not item:
-            return
-        
-        process_name = item.text()
-        pid = self.running_processes.get(process_name)
-        if not pid:
-            return
+        info = self.process_monitor.get(item.data(Qt.UserRole)) if item else None
 
         menu = QMenu(self)
-        kill_action = menu.addAction("Закрыть программу")
-        kill_action.triggered.connect(lambda: self.kill_process(pid))
+        if info is not None:
+            kill_action = menu.addAction("Закрыть программу")
+            kill_action.triggered.connect(lambda: self.kill_process(info))
+            output = self.core.outputs.get(info.key)
+            if output is not None:
+                menu.addAction("Показать вывод").triggered.connect(lambda: self.show_output(output))
+        close_all_action = menu.addAction("Закрыть все программы")
+        close_all_action.setEnabled(bool(self.running_processes))
+        close_all_action.triggered.connect(self.close_all_processes)
         
         menu.exec_(self.running_list_widget.mapToGlobal(pos))
 
     def edit_program(self, section_name, program):
         new_name, ok = QInputDialog.getText(self, "Изменить название", "Введите новое название программы:", text=program["name"])
         if ok and new_name:
-            program["name"] = new_name
-            self.save_settings()
-            self.update_ui()
+            self.core.rename_program(section_name, program, new_name)
 
     def toggle_run_as_admin(self, section_name, program):
-        program["run_as_admin"] = not program.get("run_as_admin", False)
-        self.save_settings()
-        self.update_ui()
+        self.core.set_run_as_admin(section_name, program, not program.get("run_as_admin", False))
         QMessageBox.information(self, "Настройки", f"Запуск '{program['name']}' от имени администратора: {'включен' if program['run_as_admin'] else 'выключен'}")
 
-    def remove_program(self, section_name, program_name):
+    def remove_program(self, program):
         reply = QMessageBox.question(self, "Удаление программы", 
-                                     f"Вы уверены, что хотите удалить '{program_name}'?",
+                                     f"Вы уверены, что хотите удалить '{program.name}'?",
                                      QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.data["sections"][section_name]["programs"] = [
-                p for p in self.data["sections"][section_name]["programs"] 
-                if p["name"] != program_name
-            ]
-            self.save_settings()
-            self.update_ui()
+            self.core.remove_program(program.id)
 
     def open_program_location(self, path):
-        if not os.path.exists(path):
+        # Статус пути уже известен из фоновой проверки, диск здесь не трогается
+        if self.path_validator.exists(path) is False:
             QMessageBox.warning(self, "Ошибка", "Файл не найден. Возможно, он был удален или перемещен.")
             return
 
@@ -528,84 +853,191 @@ class Launcher(QWidget):
             QMessageBox.critical(self, "Ошибка", f"Не удалось открыть расположение: {e}")
 
     def launch_program(self, path, run_as_admin=False):
-        if not os.path.exists(path):
+        if self.path_validator.exists(path) is False:
             QMessageBox.warning(self, "Ошибка", "Файл не найден. Возможно, он был удален или перемещен.")
             return
             
         try:
-            if run_as_admin:
-                subprocess.Popen(['runas', '/user:Administrator', path])
-            else:
-                process = subprocess.Popen([path])
-                self.running_processes[os.path.basename(path)] = process.pid
-                self.update_running_processes_list()
-
+            self.core.start_program(path, run_as_admin, capture=self.core.capture_program(path))
+            self.core.flush_usage()
+        except FileNotFoundError:
+            # Путь ещё не проверен в фоне или файл пропал после проверки
+            self.path_validator.recheck([path])
+            QMessageBox.warning(self, "Ошибка", "Файл не найден. Возможно, он был удален или перемещен.")
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось запустить программу: {e}")
 
+    def handle_ipc_command(self, message):
+        # Команды от повторных вызовов launcher.py (--run, --group, --show, --list)
+        command = message.get("command")
+        if command == "show":
+            self.showNormal()
+            self.raise_()
+            self.activateWindow()
+            return {"ok": True}
+        if command == "run":
+            _, program = self.core.find_program(message.get("name", ""))
+            if program is not None and self.path_validator.exists(program["path"]) is False:
+                return {"ok": False, "error": f"Файл не найден: {program['path']}"}
+        return self.core.handle_command(message)
+
+    @traced("update_running_processes_list")
     def update_running_processes_list(self):
+        # Полная пересборка списка; дальше он обновляется событиями монитора
         self.running_list_widget.clear()
-        
-        # Обновляем список, удаляя завершенные процессы
-        pids_to_check = list(self.running_processes.values())
-        for pid in pids_to_check:
-            try:
-                p = psutil.Process(pid)
-                if p.is_running():
-                    self.running_list_widget.addItem(p.name())
-                else:
-                    for name, p_id in list(self.running_processes.items()):
-                        if p_id == pid:
-                            del self.running_processes[name]
-                            break
-            except psutil.NoSuchProcess:
-                for name, p_id in list(self.running_processes.items()):
-                    if p_id == pid:
-                        del self.running_processes[name]
-                        break
-
-    def kill_process(self, pid):
-        try:
-            p = psutil.Process(pid)
-            p.terminate()
-            QMessageBox.information(self, "Успех", f"Процесс {p.name()} был успешно завершен.")
-            self.update_running_processes_list()
-        except psutil.NoSuchProcess:
-            QMessageBox.warning(self, "Ошибка", "Процесс уже не запущен.")
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось завершить процесс: {e}")
+        self.running_processes = {}
+        for info in self.process_monitor.processes():
+            self.on_process_started(info)
+
+    def on_process_started(self, info):
+        # Пока список не построен, он будет заполнен из монитора при построении
+        if self.running_list_widget is None or info.key in self.running_processes:
+            return
+        item = QListWidgetItem(f"{info.name} (PID {info.pid})")
+        item.setData(Qt.UserRole, info.key)
+        item.setToolTip(info.path)
+        self.running_list_widget.addItem(item)
+        self.running_processes[info.key] = item
+        count("running_items_created")
+
+    @traced("running_list.refresh")
+    def on_processes_sampled(self):
+        # Показатели обновляются только пока страница запущенных программ на экране
+        if self.sections_stack.currentWidget() is not self.running_page:
+            return
+        from process_view import describe_process
+        for key, item in self.running_processes.items():
+            info = self.process_monitor.get(key)
+            if info is not None:
+                item.setText(describe_process(info, self.process_sampler.history(key)))
+
+    def on_process_exited(self, info):
+        item = self.running_processes.pop(info.key, None)
+        if item is not None:
+            self.running_list_widget.takeItem(self.running_list_widget.row(item))
+
+    def populate_output_menu(self):
+        # Захваченный вывод запущенных и недавно завершившихся программ, новые сверху
+        self.output_menu.clear()
+        outputs = self.core.output_list()
+        for output in reversed(outputs):
+            info = output.info
+            state = "завершена" if output.finished else "выполняется"
+            self.output_menu.addAction(f"{info.name} (PID {info.pid}) - {state}").triggered.connect(
+                lambda checked, o=output: self.show_output(o))
+        if not outputs:
+            self.output_menu.addAction("Вывод не сохраняется ни для одной программы").setEnabled(False)
+
+    def show_output(self, output):
+        # Одно окно на процесс; окна не модальные и не мешают работе с лаунчером
+        viewer = self.output_viewers.get(output.info.key)
+        if viewer is None:
+            from output_view import OutputViewer
+            viewer = self.output_viewers[output.info.key] = OutputViewer(output, self)
+            viewer.finished.connect(lambda result, key=output.info.key: self.output_viewers.pop(key, None))
+        viewer.show()
+        viewer.raise_()
+        viewer.activateWindow()
+
+    def kill_process(self, info):
+        self.close_processes([info])
+
+    def close_all_processes(self):
+        processes = self.core.running_processes()
+        if not processes:
+            return
+        reply = QMessageBox.question(self, "Закрыть все программы",
+                                     f"Закрыть все запущенные программы ({len(processes)})?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.close_processes(processes)
+
+    def close_processes(self, processes):
+        # Деревья процессов завершаются в фоне: terminate, ожидание, затем kill.
+        # Строки списка исчезают по событиям монитора, итог приходит в on_terminated
+        self.title_label.setText(f"Закрытие программ: {len(processes)}...")
+        self.title_status_timer.stop()
+        self.core.terminate_processes(processes)
+
+    def on_terminated(self, report):
+        if report.failed:
+            lines = [f"{result.name} (PID {result.pid}): {result.error}" for result in report.failed]
+            QMessageBox.warning(self, "Ошибка", report.summary() + "\n\n" + "\n".join(lines))
+            self.title_label.setText(self.windowTitle())
+            return
+        self.title_label.setText(report.summary())
+        self.title_status_timer.start()
             
     def dragEnterEvent(self, e):
-        if e.mimeData().hasText():
+        if e.mimeData().hasFormat(PROGRAM_MIME_TYPE):
             e.accept()
         else:
             e.ignore()
 
     def dropEvent(self, e, new_section):
-        program_name = e.mimeData().text()
-        
-        old_section = None
-        program_to_move = None
-        for section_name, section_data in self.data["sections"].items():
-            for program in section_data["programs"]:
-                if program["name"] == program_name:
-                    old_section = section_name
-                    program_to_move = program
-                    self.data["sections"][old_section]["programs"].remove(program)
-                    break
-            if old_section:
-                break
+        try:
+            program_id = int(bytes(e.mimeData().data(PROGRAM_MIME_TYPE)).decode("ascii"))
+        except ValueError:
+            return
         
-        if old_section and new_section:
-            self.data["sections"][new_section]["programs"].append(program_to_move)
-            self.save_settings()
-            self.update_ui()
+        if new_section:
+            self.core.move_program(program_id, new_section)
 
 if __name__ == '__main__':
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
 
-    app = QApplication(sys.argv)
-    launcher = Launcher()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storage", choices=["json", "sqlite"],
+                        help="хранилище каталога; sqlite при первом запуске переносит settings.json")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="вывести время фаз запуска в stderr")
+    parser.add_argument("--run", metavar="NAME", help="запустить программу каталога по имени")
+    parser.add_argument("--group", metavar="NAME", help="запустить группу программ по имени")
+    parser.add_argument("--show", action="store_true", help="показать окно запущенного лаунчера")
+    parser.add_argument("--list", action="store_true", help="вывести программы каталога")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="при выходе записать трассировку в формате Chrome trace")
+    parser.add_argument("--perf-overlay", action="store_true",
+                        help="показывать задержки кадра и операций поверх окна")
+    args, qt_args = parser.parse_known_args()
+    if args.trace or args.perf_overlay:
+        tracer.enable()
+
+    profile = StartupProfile()
+    app = QApplication(sys.argv[:1] + qt_args)
+    profile.mark("импорт и QApplication")
+    # Сокет занимается до создания окна: второй экземпляр не должен ни читать,
+    # ни писать тот же файл настроек. Команды принимаются уже в цикле событий, когда окно есть
+    launcher = None
+    instance_server = InstanceServer(ipc.server_name(default_settings_path()),
+                                     lambda message: launcher.handle_ipc_command(message), app)
+    if not instance_server.listen():
+        # Другой экземпляр успел запуститься между проверкой выше и listen:
+        # команда передаётся ему, как при обычном повторном запуске
+        _exit_code = ipc.deliver(sys.argv[1:], default_settings_path())
+        if _exit_code is None:
+            print("Не удалось занять сокет единственного экземпляра", file=sys.stderr)
+            _exit_code = 1
+        sys.exit(_exit_code)
+    app.aboutToQuit.connect(instance_server.close)
+    launcher = Launcher(args.storage, profile)
     launcher.show()
+    if args.perf_overlay:
+        from perf_overlay import PerfOverlay
+        launcher.perf_overlay = PerfOverlay(launcher)
+        launcher.perf_overlay.show()
+    if args.trace:
+        app.aboutToQuit.connect(lambda: tracer.export_chrome_trace(args.trace))
+    if args.run:
+        # Экземпляра не было: этот процесс стал им и сам выполняет команду
+        reply = launcher.handle_ipc_command({"command": "run", "name": args.run})
+        if not reply["ok"]:
+            QMessageBox.warning(launcher, "Ошибка", reply["error"])
+    if args.group:
+        launcher.launch_group(args.group)
+    profile.mark("показ окна")
+    if args.profile_startup:
+        # Первый проход цикла событий: окно отрисовано и принимает ввод
+        QTimer.singleShot(0, lambda: (profile.mark("первая отрисовка"), profile.report()))
     sys.exit(app.exec_())
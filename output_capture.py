@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from collections import deque
+
+from tracing import count
+
+# Сколько последнего вывода программы держать в памяти и как большими кусками читать канал
+OUTPUT_BUFFER_BYTES = 256 * 1024
+READ_CHUNK = 64 * 1024
+# Журнал на диске: размер одного файла и сколько предыдущих хранить (.1, .2, ...)
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 2
+# Сколько захватов уже завершившихся программ оставлять для просмотра
+KEEP_FINISHED = 16
+
+
+# Кольцевой буфер байтов фиксированного размера: новые данные вытесняют самые старые.
+# written - сколько байт записано за всё время; по нему читатель забирает только новое
+class OutputBuffer:
+    def __init__(self, max_bytes=OUTPUT_BUFFER_BYTES):
+        self.max_bytes = max_bytes
+        self.written = 0
+        self.dropped = 0
+        self._chunks = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def write(self, data):
+        with self._lock:
+            self.written += len(data)
+            if len(data) >= self.max_bytes:
+                self.dropped += self._size + len(data) - self.max_bytes
+                self._chunks.clear()
+                data = data[-self.max_bytes:]
+                self._size = 0
+            self._chunks.append(data)
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                excess = self._size - self.max_bytes
+                oldest = self._chunks[0]
+                if len(oldest) <= excess:
+                    self._chunks.popleft()
+                    self._size -= len(oldest)
+                    self.dropped += len(oldest)
+                else:
+                    self._chunks[0] = oldest[excess:]
+                    self._size -= excess
+                    self.dropped += excess
+
+    def read_since(self, offset):
+        # (новый offset, байты после offset, были ли потеряны байты между offset и буфером)
+        with self._lock:
+            start = self.written - self._size
+            lost = offset < start
+            skip = max(0, offset - start)
+            data = b"".join(self._chunks)[skip:]
+            return self.written, data, lost
+
+
+# Журнал вывода на диске с ротацией по размеру: name.log, name.log.1 ... name.log.N.
+# Один на программу: экземпляры одной программы пишут в него по очереди
+class RotatingLog:
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+
+    def write(self, data):
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "ab")
+                self._size = self._file.tell()
+            if self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups, 0, -1):
+            older = f"{self.path}.{i}"
+            newer = f"{self.path}.{i - 1}" if i > 1 else self.path
+            if os.path.exists(newer):
+                os.replace(newer, older)
+        if not self.backups:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+        self._size = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Захват объединённых stdout и stderr одного процесса.
+# Канал читается в своём потоке: интерфейс только забирает готовые байты из буфера,
+# а программа, пишущая мегабайты в секунду, занимает не больше max_bytes памяти
+class ProcessOutput:
+    def __init__(self, info, stream, buffer, log=None):
+        self.info = info
+        self.buffer = buffer
+        self.log = log
+        self.started = time.time()
+        self.finished = False
+        self._stream = stream
+        self._thread = threading.Thread(target=self._pump, name=f"output-{info.pid}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.finished
+
+    def _pump(self):
+        fd = self._stream.fileno()
+        try:
+            while True:
+                try:
+                    chunk = os.read(fd, READ_CHUNK)
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                self.buffer.write(chunk)
+                count("output_bytes", len(chunk))
+                if self.log is not None:
+                    try:
+                        self.log.write(chunk)
+                    except OSError:
+                        # Диск переполнен или журнал недоступен: вывод остаётся в памяти
+                        self.log = None
+        finally:
+            self._stream.close()
+            self.finished = True
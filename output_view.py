@@ -0,0 +1,105 @@
+import codecs
+import locale
+
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPlainTextEdit
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFontDatabase, QTextCursor
+
+REFRESH_INTERVAL_MS = 250
+# Сколько нового вывода выводится за одно обновление: остальное пропускается,
+# чтобы программа, пишущая мегабайты в секунду, не занимала поток интерфейса
+MAX_REFRESH_BYTES = 64 * 1024
+MAX_LINES = 5000
+# Строки длиннее переносятся принудительно: раскладка одной строки в мегабайт
+# в QPlainTextEdit занимает секунды
+MAX_LINE_CHARS = 1000
+
+
+# Окно с выводом программы из её кольцевого буфера (output_capture.ProcessOutput).
+# Раз в REFRESH_INTERVAL_MS дописывает только то, что пришло с прошлого раза
+class OutputViewer(QDialog):
+    def __init__(self, output, parent=None):
+        super().__init__(parent)
+        self.output = output
+        info = output.info
+        self.setWindowTitle(f"Вывод: {info.name} (PID {info.pid})")
+        self.resize(800, 500)
+
+        layout = QVBoxLayout(self)
+        self.status_label = QLabel(self)
+        layout.addWidget(self.status_label)
+        self.text_edit = QPlainTextEdit(self)
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setMaximumBlockCount(MAX_LINES)
+        self.text_edit.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.text_edit)
+
+        self._offset = 0
+        self._line_length = 0
+        self._decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))("replace")
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+        self.refresh()
+
+    def refresh(self):
+        finished = self.output.finished
+        offset, data, lost = self.output.buffer.read_since(self._offset)
+        if len(data) > MAX_REFRESH_BYTES:
+            data = data[-MAX_REFRESH_BYTES:]
+            lost = True
+        self._offset = offset
+        text = ""
+        if lost and self.text_edit.document().characterCount() > 1:
+            self._decoder.reset()
+            text = "\n[... часть вывода пропущена ...]\n"
+        text += self._wrap(self._decoder.decode(data))
+        if text:
+            scrollbar = self.text_edit.verticalScrollBar()
+            at_bottom = scrollbar.value() == scrollbar.maximum()
+            cursor = self.text_edit.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+            if at_bottom:
+                scrollbar.setValue(scrollbar.maximum())
+        self._update_status(finished)
+        if finished:
+            # Всё прочитано до конца канала, дальше ничего не придёт
+            self._timer.stop()
+
+    def _wrap(self, text):
+        lines = text.split("\n")
+        wrapped = []
+        length = self._line_length
+        for i, line in enumerate(lines):
+            if i:
+                length = 0
+            while length + len(line) > MAX_LINE_CHARS:
+                cut = MAX_LINE_CHARS - length
+                wrapped.append(line[:cut] + "\n")
+                line = line[cut:]
+                length = 0
+            wrapped.append(line + "\n" if i < len(lines) - 1 else line)
+            length += len(line)
+        self._line_length = length
+        return "".join(wrapped)
+
+    def _update_status(self, finished):
+        info = self.output.info
+        if not finished:
+            status = "выполняется"
+        elif info.returncode is not None:
+            status = f"завершена, код {info.returncode}"
+        else:
+            status = "завершена"
+        status += f"; получено {self.output.buffer.written} байт"
+        if self.output.buffer.dropped:
+            status += f", в памяти последние {self.output.buffer.max_bytes // 1024} КБ"
+        if self.output.log is not None:
+            status += f"; журнал: {self.output.log.path}"
+        self.status_label.setText(status)
+
+    def closeEvent(self, event):
+        self._timer.stop()
+        super().closeEvent(event)
@@ -0,0 +1,156 @@
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from tracing import traced
+
+VALIDATE_BATCH = 256
+VALIDATOR_THREADS = 4
+# Изменения статусов копятся и сообщаются не чаще раза за этот интервал, мс
+NOTIFY_INTERVAL_MS = 50
+
+
+def _watch_dir(path):
+    # Ближайший существующий каталог над путём: за ним и следим,
+    # чтобы заметить и появление, и исчезновение файла
+    directory = os.path.dirname(path)
+    while directory and not os.path.isdir(directory):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+    return directory or None
+
+
+# Фоновая проверка существования программ каталога.
+# При запуске все пути проверяются параллельно пачками в пуле потоков,
+# затем родительские каталоги ставятся под QFileSystemWatcher, и при их изменении
+# перепроверяются только лежащие в них пути. Интерфейс берёт готовый статус
+# из exists() и не делает блокирующих os.path.exists, в том числе на сетевых дисках
+class PathValidator(QObject):
+    statusesChanged = pyqtSignal(list)
+    _checked = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stats = {"checked": 0, "batches": 0}
+        self._status = {}
+        self._refs = Counter()
+        self._watched = {}
+        self._dir_paths = defaultdict(set)
+        self._executor = ThreadPoolExecutor(VALIDATOR_THREADS, thread_name_prefix="path-validator")
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._checked.connect(self._on_checked)
+        self._changed = []
+        self._notify_timer = QTimer(self)
+        self._notify_timer.setSingleShot(True)
+        self._notify_timer.setInterval(NOTIFY_INTERVAL_MS)
+        self._notify_timer.timeout.connect(self._notify)
+
+    def exists(self, path):
+        # True/False по последней проверке или None, если путь ещё не проверен
+        return self._status.get(path)
+
+    def missing(self):
+        return [path for path, exists in self._status.items() if not exists]
+
+    def reset(self, paths):
+        if self._watched:
+            self._watcher.removePaths(list(self._dir_paths))
+        self._status.clear()
+        self._refs.clear()
+        self._watched.clear()
+        self._dir_paths.clear()
+        for path in paths:
+            self._refs[path] += 1
+        # Пути одного каталога попадают в одну пачку и делят проверку каталога
+        self._queue(sorted(self._refs))
+
+    def add(self, path):
+        self._refs[path] += 1
+        if self._refs[path] == 1:
+            self._queue([path])
+
+    def discard(self, path):
+        if self._refs[path] > 1:
+            self._refs[path] -= 1
+            return
+        self._refs.pop(path, None)
+        self._status.pop(path, None)
+        self._unwatch(path)
+
+    def recheck(self, paths=None):
+        self._queue(list(self._refs) if paths is None else list(paths))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _queue(self, paths):
+        for start in range(0, len(paths), VALIDATE_BATCH):
+            self._executor.submit(self._check_batch, paths[start:start + VALIDATE_BATCH])
+
+    @traced("path_status.batch", "io")
+    def _check_batch(self, paths):
+        # Выполняется в пуле потоков; результат уходит в поток интерфейса сигналом.
+        # Каталог проверяется один раз на пачку: если его нет, файлы в нём не stat'ятся
+        results = []
+        directories = {}
+        for path in paths:
+            if not path:
+                results.append((path, False, None))
+                continue
+            directory = os.path.dirname(path)
+            known = directories.get(directory)
+            if known is None:
+                known = directories[directory] = (os.path.isdir(directory), _watch_dir(path))
+            directory_exists, watch_dir = known
+            results.append((path, directory_exists and os.path.exists(path), watch_dir))
+        self._checked.emit(results)
+
+    def _on_checked(self, results):
+        self.stats["batches"] += 1
+        changed = []
+        for path, exists, watch_dir in results:
+            if path not in self._refs:
+                continue
+            self.stats["checked"] += 1
+            if self._watched.get(path) != watch_dir:
+                self._unwatch(path)
+                if watch_dir:
+                    self._watch(path, watch_dir)
+            if self._status.get(path) != exists:
+                self._status[path] = exists
+                changed.append(path)
+        if changed:
+            self._changed.extend(changed)
+            if not self._notify_timer.isActive():
+                self._notify_timer.start()
+
+    def _notify(self):
+        changed, self._changed = self._changed, []
+        self.statusesChanged.emit(changed)
+
+    def _watch(self, path, directory):
+        self._watched[path] = directory
+        paths = self._dir_paths[directory]
+        if not paths:
+            self._watcher.addPath(directory)
+        paths.add(path)
+
+    def _unwatch(self, path):
+        directory = self._watched.pop(path, None)
+        if directory is None:
+            return
+        paths = self._dir_paths.get(directory)
+        if paths is None:
+            return
+        paths.discard(path)
+        if not paths:
+            del self._dir_paths[directory]
+            self._watcher.removePath(directory)
+
+    def _on_directory_changed(self, directory):
+        self._queue(list(self._dir_paths.get(directory, ())))
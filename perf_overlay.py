@@ -0,0 +1,66 @@
+import time
+
+from PyQt5.QtWidgets import QApplication, QLabel
+from PyQt5.QtCore import Qt, QEvent, QTimer
+
+from tracing import tracer
+
+FRAME_INTERVAL_MS = 16
+REFRESH_INTERVAL_MS = 500
+TOP_SPANS = 8
+
+
+# Полупрозрачная панель в углу окна с задержками цикла событий ("кадр")
+# и последних операций из трассировки. Задержка кадра - насколько таймер
+# на 16 мс сработал позже срока: это и есть подвисание интерфейса
+class PerfOverlay(QLabel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #9fe89f;"
+                           "font-family: monospace; font-size: 11px; padding: 6px; border-radius: 6px;")
+        self.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        parent.installEventFilter(self)
+
+        self._last_frame = time.perf_counter()
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self._frame_timer.timeout.connect(self._on_frame)
+        self._frame_timer.start()
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self._refresh_timer.start()
+        self.refresh()
+
+    def _on_frame(self):
+        now = time.perf_counter()
+        tracer.sample("frame", max(0.0, (now - self._last_frame) * 1000 - FRAME_INTERVAL_MS))
+        self._last_frame = now
+
+    def refresh(self):
+        tracer.gauge("widgets", len(QApplication.allWidgets()))
+        recent = tracer.recent()
+        lines = []
+        frame = recent.pop("frame", None)
+        if frame is not None:
+            lines.append(f"кадр      +{frame[1]:6.1f} ср  +{frame[2]:6.1f} макс мс")
+        spans = sorted(recent.items(), key=lambda item: item[1][2], reverse=True)[:TOP_SPANS]
+        for name, (last, average, peak) in spans:
+            lines.append(f"{name[:24]:<24} {last:7.2f} {average:7.2f} {peak:7.2f}")
+        counters = dict(tracer.counters)
+        lines.append("  ".join(f"{name}={value}" for name, value in sorted(counters.items())))
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self._reposition()
+        self.raise_()
+
+    def _reposition(self):
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 12, 40)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize:
+            self._reposition()
+        return False
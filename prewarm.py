@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+
+from tracing import count, span
+
+# Сколько самых частых программ прогревать и сколько байт читать за один проход
+PREWARM_TOP = 10
+PREWARM_MAX_BYTES = 256 * 1024 * 1024
+# Соседние файлы, которые программа почти наверняка загрузит при старте
+SHARED_SUFFIXES = (".so", ".dll", ".dylib")
+SHARED_SUBDIRS = ("lib", "lib64")
+MAX_NEIGHBOURS = 64
+READ_CHUNK = 1024 * 1024
+
+
+# Итог прогрева
+class PrewarmStats:
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.elapsed_ms = 0.0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+def _is_shared(name):
+    lower = name.lower()
+    return lower.endswith(SHARED_SUFFIXES) or ".so." in lower
+
+
+def neighbours(path):
+    # Библиотеки рядом с исполняемым файлом и в его lib/ - без обхода вглубь
+    directory = os.path.dirname(path)
+    found = []
+    for subdir in ("",) + SHARED_SUBDIRS:
+        try:
+            with os.scandir(os.path.join(directory, subdir) if subdir else directory) as entries:
+                for entry in entries:
+                    if _is_shared(entry.name) and entry.is_file():
+                        found.append(entry.path)
+                        if len(found) >= MAX_NEIGHBOURS:
+                            return found
+        except OSError:
+            continue
+    return found
+
+
+def warm_file(path, budget):
+    # Сколько байт файла поставлено в чтение. posix_fadvise(WILLNEED) только
+    # просит ядро начать упреждающее чтение и сразу возвращается; где его нет
+    # (Windows, macOS), файл читается вручную, в пределах budget
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = min(os.fstat(fd).st_size, budget)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+            return size
+        done = 0
+        while done < size:
+            chunk = os.read(fd, min(READ_CHUNK, size - done))
+            if not chunk:
+                break
+            done += len(chunk)
+        return done
+    finally:
+        os.close(fd)
+
+
+# Прогрев страничного кэша для самых частых программ в фоновом потоке.
+# После перезагрузки первый запуск большой программы упирается в чтение с диска;
+# прогретый исполняемый файл и его библиотеки к моменту клика уже в памяти.
+# Каждый файл прогревается один раз, общий объём ограничен max_bytes
+class Prewarmer:
+    def __init__(self, paths, max_bytes=PREWARM_MAX_BYTES, on_finished=None):
+        self.paths = list(paths)
+        self.max_bytes = max_bytes
+        self.on_finished = on_finished
+        self.stats = PrewarmStats()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _run(self):
+        started = time.perf_counter()
+        seen = set()
+        try:
+            with span("prewarm", "io"):
+                for path in self.paths:
+                    for file_path in [path] + neighbours(path):
+                        if self._cancelled.is_set() or self.stats.bytes >= self.max_bytes:
+                            return
+                        if file_path in seen:
+                            continue
+                        seen.add(file_path)
+                        try:
+                            warmed = warm_file(file_path, self.max_bytes - self.stats.bytes)
+                        except OSError:
+                            self.stats.skipped += 1
+                            continue
+                        self.stats.files += 1
+                        self.stats.bytes += warmed
+                        count("prewarm_bytes", warmed)
+        finally:
+            self.stats.elapsed_ms = (time.perf_counter() - started) * 1000
+            try:
+                if self.on_finished:
+                    self.on_finished(self.stats)
+            finally:
+                self._done.set()
@@ -0,0 +1,270 @@
+import os
+import selectors
+import sys
+import threading
+import time
+
+import psutil
+
+from tracing import count
+
+# Интервал проверки для платформ без уведомлений о завершении процесса, секунды
+POLL_INTERVAL = 0.5
+
+
+# Отслеживаемый процесс. Ключ (pid, create_time) не путается при повторном
+# использовании PID и позволяет держать несколько экземпляров одной программы
+class TrackedProcess:
+    def __init__(self, pid, create_time, name, path, popen=None):
+        self.pid = pid
+        self.create_time = create_time
+        self.name = name
+        self.path = path
+        self.popen = popen
+        self.returncode = None
+
+    @property
+    def key(self):
+        return (self.pid, self.create_time)
+
+    def __repr__(self):
+        return f"TrackedProcess(pid={self.pid}, name={self.name!r})"
+
+
+def _create_time(pid):
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return time.time()
+
+
+# Фоновый монитор запущенных программ.
+# На Linux ждёт завершения через pidfd в selectors (без опроса вообще),
+# на Windows проверяет дескрипторы пачками через WaitForMultipleObjects,
+# на остальных POSIX-системах опрашивает своих потомков через popen.poll():
+# waitpid(-1) забрал бы и чужих потомков (например, помощников завершения).
+# Процесс, для которого pidfd открыть не удалось, проверяется опросом,
+# остальные по-прежнему ждут через pidfd.
+# Колбэки on_started/on_exited вызываются из потока монитора
+class ProcessMonitor:
+    def __init__(self, on_started=None, on_exited=None, poll_interval=POLL_INTERVAL):
+        self.on_started = on_started
+        self.on_exited = on_exited
+        self.poll_interval = poll_interval
+        self.polls = 0
+
+        self._lock = threading.Lock()
+        self._tracked = {}
+        self._by_pid = {}
+        self._foreign = {}
+        self._pidfds = {}
+        self._stopping = False
+        self._use_pidfd = hasattr(os, "pidfd_open") and sys.platform.startswith("linux")
+        self._wake_event = threading.Event()
+
+        self._selector = None
+        if self._use_pidfd:
+            self._selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, name="process-monitor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wake()
+        if self._thread.is_alive():
+            self._thread.join(2)
+
+    def processes(self):
+        with self._lock:
+            return list(self._tracked.values())
+
+    def get(self, key):
+        with self._lock:
+            return self._tracked.get(key)
+
+    def track(self, popen, path):
+        # Процесс, запущенный самим лаунчером через subprocess.Popen
+        info = TrackedProcess(popen.pid, _create_time(popen.pid), os.path.basename(path), path, popen)
+        self._add(info)
+        return info
+
+    def track_pid(self, pid, path, create_time=None):
+        # Процесс, который лаунчер не запускал: за ним следим через psutil
+        if create_time is None:
+            create_time = _create_time(pid)
+        info = TrackedProcess(pid, create_time, os.path.basename(path), path)
+        self._add(info)
+        return info
+
+    def _add(self, info):
+        with self._lock:
+            if info.key in self._tracked:
+                return
+            self._tracked[info.key] = info
+            self._by_pid[info.pid] = info
+            if self._use_pidfd:
+                try:
+                    fd = os.pidfd_open(info.pid)
+                except OSError:
+                    fd = None
+                if fd is not None:
+                    self._pidfds[fd] = info
+                    self._selector.register(fd, selectors.EVENT_READ, info)
+                else:
+                    # Только этот процесс переходит на опрос в _check_foreign
+                    self._foreign[info.key] = info
+            elif info.popen is None:
+                self._foreign[info.key] = info
+        if self.on_started:
+            self.on_started(info)
+        self._wake()
+
+    def _wake(self):
+        self._wake_event.set()
+        if self._selector is not None:
+            try:
+                os.write(self._wake_w, b"\0")
+            except OSError:
+                pass
+
+    def _run(self):
+        while not self._stopping:
+            if self._use_pidfd:
+                exited = self._wait_pidfds()
+            else:
+                self._wake_event.wait(self.poll_interval)
+                self._wake_event.clear()
+                exited = self._reap_children()
+            exited.extend(self._check_foreign())
+            self.polls += 1
+            count("processes_polled", len(self._tracked))
+
+            for info in exited:
+                if info is not None:
+                    self._finish(info)
+
+        if self._selector is not None:
+            for fd in list(self._pidfds):
+                self._close_pidfd(fd)
+            self._selector.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def _wait_pidfds(self):
+        # Поток спит, пока не завершится один из процессов или не придёт новый
+        timeout = self.poll_interval if self._foreign else None
+        exited = []
+        for key, _ in self._selector.select(timeout):
+            if key.fileobj == self._wake_r:
+                try:
+                    while os.read(self._wake_r, 512):
+                        pass
+                except OSError:
+                    pass
+                continue
+            exited.append(self._close_pidfd(key.fileobj))
+        return exited
+
+    def _close_pidfd(self, fd):
+        with self._lock:
+            info = self._pidfds.pop(fd, None)
+        try:
+            self._selector.unregister(fd)
+        except (KeyError, ValueError):
+            pass
+        os.close(fd)
+        if info is not None and info.popen is not None:
+            info.returncode = info.popen.poll()
+        return info
+
+    def _reap_children(self):
+        if sys.platform == "win32":
+            return self._reap_windows()
+
+        with self._lock:
+            children = [info for info in self._tracked.values()
+                        if info.popen is not None and info.returncode is None]
+        return [info for info in children if self._poll_child(info)]
+
+    @staticmethod
+    def _poll_child(info):
+        # True, если потомок завершился; waitpid по его PID не трогает чужих потомков
+        returncode = info.popen.poll()
+        if returncode is None:
+            return False
+        info.returncode = returncode
+        return True
+
+    def _reap_windows(self):
+        import _winapi
+        with self._lock:
+            children = [info for info in self._tracked.values()
+                        if info.popen is not None and info.returncode is None]
+
+        exited = []
+        # WaitForMultipleObjects принимает не больше 64 дескрипторов за вызов
+        for start in range(0, len(children), 64):
+            chunk = children[start:start + 64]
+            while chunk:
+                result = _winapi.WaitForMultipleObjects([int(c.popen._handle) for c in chunk], False, 0)
+                if result == _winapi.WAIT_TIMEOUT:
+                    break
+                info = chunk.pop(result - _winapi.WAIT_OBJECT_0)
+                info.returncode = info.popen.poll()
+                exited.append(info)
+        return exited
+
+    def _check_foreign(self):
+        with self._lock:
+            foreign = list(self._foreign.values())
+        if not foreign:
+            return []
+
+        exited = []
+        procs = []
+        for info in foreign:
+            if info.popen is not None:
+                # Свой потомок без pidfd
+                if self._poll_child(info):
+                    exited.append(info)
+                continue
+            try:
+                proc = psutil.Process(info.pid)
+                # Тот же PID у другого процесса значит, что наш уже завершился
+                if abs(proc.create_time() - info.create_time) > 1:
+                    exited.append(info)
+                    continue
+            except psutil.NoSuchProcess:
+                exited.append(info)
+                continue
+            except psutil.Error:
+                # Нет прав (процесс другого пользователя или служба): PID ещё занят,
+                # значит процесс считается запущенным до следующей проверки
+                continue
+            proc.tracked = info
+            procs.append(proc)
+
+        try:
+            gone, _ = psutil.wait_procs(procs, timeout=0)
+        except psutil.Error:
+            # wait без прав на процесс; is_running проверяет только PID и время запуска
+            gone = [proc for proc in procs if not proc.is_running()]
+        for proc in gone:
+            proc.tracked.returncode = getattr(proc, "returncode", None)
+            exited.append(proc.tracked)
+        return exited
+
+    def _finish(self, info):
+        with self._lock:
+            if self._tracked.pop(info.key, None) is None:
+                return
+            if self._by_pid.get(info.pid) is info:
+                del self._by_pid[info.pid]
+            self._foreign.pop(info.key, None)
+        if self.on_exited:
+            self.on_exited(info)
@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import psutil
+
+from catalog import ProgramAdded, ProgramRemoved, ProgramChanged, SectionRemoved, CatalogReset
+from tracing import count, span
+
+# Через сколько секунд повторять поиск уже запущенных программ; 0 - только при старте
+RESCAN_INTERVAL = 15.0
+
+# Итог одного просмотра: full - просмотрены все процессы системы, а не только новые;
+# scanned - у скольких процессов проверен путь, adopted - сколько взято под наблюдение
+ScanReport = namedtuple("ScanReport", "full scanned adopted total_ms")
+
+
+def normalize_path(path):
+    # Проводник и QFileDialog дают "C:/Program Files/...", psutil - "C:\\Program Files\\..."
+    return os.path.normcase(os.path.normpath(path))
+
+
+# Поиск уже запущенных программ каталога: после перезапуска лаунчера они снова
+# видны в списке запущенных и их можно закрыть.
+# Каждый просмотр - один проход process_iter; путь exe читается только у процессов,
+# появившихся с прошлого раза, а исчезнувшие PID просто забываются. Полностью
+# процессы пересматриваются после изменения путей каталога.
+# Путь процесса ищется в словаре нормализованных путей каталога. Процесс,
+# родитель которого - та же программа (вкладки браузера, рабочие процессы),
+# отдельно не берётся: его закроет завершение дерева родителя.
+# Словарь путей строится в потоке владельца каталога, сам просмотр идёт в фоне.
+# Пути каталога через симлинки совпадают с процессом по своему realpath
+class ProcessScanner:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._paths = None
+        # pid -> create_time всех процессов прошлого просмотра
+        self._known = None
+        self._rescan_all = True
+        # pid -> путь каталога для процессов, совпавших с программой
+        self._matched = {}
+        # путь каталога -> нормализованный путь после realpath; только в потоке просмотра
+        self._realpaths = {}
+        # (словарь path_index, он же с путями после realpath)
+        self._resolved = None
+        self._thread = None
+
+    def apply(self, delta):
+        # Новый или изменённый путь мог совпасть с процессом, который уже просмотрен
+        if isinstance(delta, (ProgramAdded, ProgramChanged, CatalogReset)):
+            self._paths = None
+            self._rescan_all = True
+        elif isinstance(delta, (ProgramRemoved, SectionRemoved)):
+            self._paths = None
+
+    def path_index(self):
+        if self._paths is None:
+            self._paths = {normalize_path(path): path for path in self.catalog.paths() if path}
+        return self._paths
+
+    def _resolve(self, paths):
+        # psutil отдаёт exe с раскрытыми ссылками, а в каталоге путь может идти через
+        # симлинк или junction: к словарю добавляются пути после realpath.
+        # realpath читает диск, поэтому он считается в потоке просмотра и запоминается;
+        # словарь пересобирается, только когда path_index построил новый.
+        # Программы каталога лежат в немногих папках: realpath считается один раз
+        # на папку, а у самого файла проверяется только, не ссылка ли он
+        if self._resolved is not None and self._resolved[0] is paths:
+            return self._resolved[1]
+        resolved = dict(paths)
+        realpaths = {}
+        folders = {}
+        for key, path in paths.items():
+            real = self._realpaths.get(path)
+            if real is None:
+                folder, name = os.path.split(path)
+                if folder not in folders:
+                    # None - папка и есть свой realpath
+                    real_folder = os.path.realpath(folder)
+                    same = normalize_path(real_folder) == normalize_path(folder)
+                    folders[folder] = None if same else real_folder
+                real_folder = folders[folder]
+                if os.path.islink(path):
+                    real = normalize_path(os.path.realpath(path))
+                elif real_folder is None:
+                    real = key
+                else:
+                    real = normalize_path(os.path.join(real_folder, name))
+            realpaths[path] = real
+            resolved.setdefault(real, path)
+        self._realpaths = realpaths
+        self._resolved = (paths, resolved)
+        return resolved
+
+    @property
+    def scanning(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, monitor, on_finished=None):
+        # Просмотр в фоновом потоке; совпавшие процессы передаются monitor.track_pid.
+        # None, если предыдущий просмотр ещё идёт
+        if self.scanning:
+            return None
+        self._thread = threading.Thread(target=self._run, name="process-scan", daemon=True,
+                                        args=(self.path_index(), monitor, on_finished))
+        self._thread.start()
+        return self._thread
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, paths, monitor, on_finished):
+        started = time.perf_counter()
+        full = self._rescan_all or self._known is None
+        self._rescan_all = False
+        with span("process_scan", "process"):
+            matched, scanned = self._scan(self._resolve(paths), full)
+            adopted = self._adopt(matched, monitor)
+        count("processes_scanned", scanned)
+        count("processes_adopted", adopted)
+        if on_finished:
+            on_finished(ScanReport(full, scanned, adopted, (time.perf_counter() - started) * 1000))
+
+    def _scan(self, paths, full):
+        # process_iter держит объекты Process между вызовами и сам заводит их только
+        # для новых PID, а путь exe каждый объект запоминает. Поэтому и полный
+        # повторный просмотр обходится без чтения /proc на каждый процесс.
+        # Вне полного просмотра путь читается только у процессов, которых не было в прошлый раз
+        known = self._known or {}
+        own_pid = os.getpid()
+        seen = {}
+        matched = []
+        scanned = 0
+        for proc in psutil.process_iter():
+            try:
+                create_time = proc.create_time()
+            except psutil.Error:
+                continue
+            pid = proc.pid
+            seen[pid] = create_time
+            if (not full and known.get(pid) == create_time) or pid == own_pid:
+                continue
+            scanned += 1
+            try:
+                exe = proc.exe()
+            except psutil.Error:
+                # Нет прав (системные процессы) или процесс уже завершился
+                continue
+            path = paths.get(normalize_path(exe)) if exe else None
+            if path is not None:
+                matched.append((proc, create_time, path))
+        self._known = seen
+        if full:
+            self._matched = {}
+        else:
+            self._matched = {pid: path for pid, path in self._matched.items() if pid in seen}
+        for proc, create_time, path in matched:
+            self._matched[proc.pid] = path
+        return matched, scanned
+
+    def _adopt(self, matched, monitor):
+        adopted = 0
+        for proc, create_time, path in matched:
+            try:
+                if self._matched.get(proc.ppid()) == path:
+                    continue
+            except psutil.Error:
+                continue
+            # Уже отслеживаемые (запущенные самим лаунчером) монитор не дублирует
+            if monitor.get((proc.pid, create_time)) is None:
+                monitor.track_pid(proc.pid, path, create_time)
+                adopted += 1
+        return adopted
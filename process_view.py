@@ -0,0 +1,72 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionViewItem, QApplication
+from PyQt5.QtCore import Qt, QPointF, QSize
+from PyQt5.QtGui import QColor, QPainter, QPolygonF
+
+from theme import current as current_theme
+
+SPARKLINE_WIDTH = 120
+ROW_HEIGHT = 36
+
+
+def format_bytes(value):
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if value < 1024 or unit == "ГБ":
+            return f"{value:.0f} {unit}"
+        value /= 1024
+
+
+def describe_process(info, history):
+    text = f"{info.name} (PID {info.pid})"
+    if history is None or not len(history.cpu):
+        return text
+    io = history.read_bps.last() + history.write_bps.last()
+    return (f"{text}   CPU {history.cpu.last():.0f}%   RAM {format_bytes(history.rss.last())}"
+            f"   потоков {history.threads.last()}   I/O {format_bytes(io)}/с")
+
+
+# Делегат строки списка запущенных программ: текст с текущими показателями
+# и спарклайны загрузки CPU и памяти из истории сэмплера
+class RunningProcessDelegate(QStyledItemDelegate):
+    def __init__(self, sampler, parent=None):
+        super().__init__(parent)
+        self.sampler = sampler
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        return QSize(size.width(), max(size.height(), ROW_HEIGHT))
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, opt, painter, widget)
+        text_opt = QStyleOptionViewItem(opt)
+        text_opt.rect = opt.rect.adjusted(0, 0, -SPARKLINE_WIDTH - 10, 0)
+        style.drawControl(QStyle.CE_ItemViewItem, text_opt, painter, widget)
+
+        history = self.sampler.history(index.data(Qt.UserRole))
+        if history is None or len(history.cpu) < 2:
+            return
+
+        spark_rect = opt.rect.adjusted(opt.rect.width() - SPARKLINE_WIDTH - 5, 6, -5, -6)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        theme = current_theme()
+        painter.setPen(QColor(theme.frame))
+        painter.drawRect(spark_rect)
+        self._draw_sparkline(painter, spark_rect, history.rss.values(), QColor(theme.memory))
+        self._draw_sparkline(painter, spark_rect, history.cpu.values(), QColor(theme.accent), ceiling=100.0)
+        painter.restore()
+
+    @staticmethod
+    def _draw_sparkline(painter, rect, values, color, ceiling=None):
+        top = max(max(values), ceiling or 0.0) or 1.0
+        step = rect.width() / max(1, len(values) - 1)
+        polygon = QPolygonF([
+            QPointF(rect.left() + i * step, rect.bottom() - rect.height() * value / top)
+            for i, value in enumerate(values)
+        ])
+        painter.setPen(color)
+        painter.drawPolyline(polygon)
@@ -0,0 +1,398 @@
+from bisect import bisect_right
+
+from PyQt5.QtWidgets import (QApplication, QFrame, QListView, QStyledItemDelegate,
+                             QStyle, QAbstractItemView)
+from PyQt5.QtCore import (Qt, QAbstractListModel, QModelIndex, QMimeData,
+                          QRect, QSize, pyqtSignal)
+from PyQt5.QtGui import QColor, QDrag, QFont, QPainter
+
+from icons import icon_source
+from theme import current as current_theme
+from catalog import (ProgramAdded, ProgramRemoved, ProgramMoved, ProgramRenamed,
+                     ProgramChanged, SectionReordered)
+
+# Роли модели: запись программы целиком и название её раздела
+ProgramRole = Qt.UserRole + 1
+SectionRole = Qt.UserRole + 2
+# Перетаскиваемая запись передаётся по id: одноимённые программы разных разделов
+# не путаются. Текстом рядом идёт название - для перетаскивания в другие приложения
+PROGRAM_MIME_TYPE = "application/x-zenith-program-id"
+
+ROW_HEIGHT = 50
+ROW_SPACING = 4
+DELETE_BUTTON_SIZE = 30
+ICON_BOX = 28
+
+
+# Модель списка программ одного раздела.
+# Работает прямо поверх списка self.data["sections"][...]["programs"], ничего не копируя,
+# и обновляется по дельтам каталога только в затронутых строках.
+# С порядком сортировки (sorting.SortOrder) модель держит свой список записей в этом
+# порядке и ключи к нему: каталог и файл настроек не меняются, а новые и
+# переименованные записи встают на место двоичным поиском
+class ProgramListModel(QAbstractListModel):
+    def __init__(self, catalog, section_name, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.section_name = section_name
+        self.sort_order = None
+        self._order = None
+        self._keys = None
+
+    @property
+    def programs(self):
+        if self._order is not None:
+            return self._order
+        return self.catalog.programs(self.section_name)
+
+    def set_sort(self, sort_order):
+        # None - порядок каталога
+        self.layoutAboutToBeChanged.emit()
+        self.sort_order = sort_order
+        if sort_order is None:
+            self._order = self._keys = None
+        else:
+            programs = list(self.catalog.programs(self.section_name))
+            keys = list(map(sort_order.key, programs))
+            rows = sorted(range(len(keys)), key=keys.__getitem__)
+            self._keys = [keys[row] for row in rows]
+            self._order = [programs[row] for row in rows]
+        self.layoutChanged.emit()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.programs)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.programs):
+            return None
+
+        program = self.programs[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return program["name"]
+        if role == ProgramRole:
+            return program
+        if role == SectionRole:
+            return self.section_name
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsDragEnabled
+
+    def program_at(self, row):
+        programs = self.programs
+        if 0 <= row < len(programs):
+            return programs[row]
+        return None
+
+    def _sorted_row(self, program):
+        # У записей нет __eq__, list.index сравнивает их по identity
+        try:
+            return self._order.index(program)
+        except ValueError:
+            return -1
+
+    def _insert_sorted(self, program):
+        key = self.sort_order.key(program)
+        row = bisect_right(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self._order.insert(row, program)
+        self.endInsertRows()
+
+    def _remove_sorted(self, program):
+        row = self._sorted_row(program)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        del self._order[row]
+        self.endRemoveRows()
+
+    def _update_sorted(self, program):
+        # Запись с новым названием или путём переезжает на своё место
+        row = self._sorted_row(program)
+        if row < 0:
+            return
+        key = self.sort_order.key(program)
+        # Место ищется в списке без самой записи
+        old_key = self._keys.pop(row)
+        new_row = bisect_right(self._keys, key)
+        self._keys.insert(row, old_key)
+        if new_row == row:
+            self._keys[row] = key
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return
+        # Место назначения для beginMoveRows считается в нумерации до переноса
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), new_row + (new_row > row))
+        del self._keys[row]
+        del self._order[row]
+        self._keys.insert(new_row, key)
+        self._order.insert(new_row, program)
+        self.endMoveRows()
+
+    def catalog_about_to_change(self, delta):
+        if self._order is not None:
+            # Отсортированный список меняется целиком в catalog_changed
+            return
+        section = self.section_name
+        if isinstance(delta, ProgramAdded) and delta.section == section:
+            self.beginInsertRows(QModelIndex(), delta.row, delta.row)
+        elif isinstance(delta, ProgramRemoved) and delta.section == section:
+            self.beginRemoveRows(QModelIndex(), delta.row, delta.row)
+        elif isinstance(delta, ProgramMoved):
+            if delta.old_section == section and delta.new_section == section:
+                self.beginMoveRows(QModelIndex(), delta.old_row, delta.old_row,
+                                   QModelIndex(), len(self.programs))
+            elif delta.old_section == section:
+                self.beginRemoveRows(QModelIndex(), delta.old_row, delta.old_row)
+            elif delta.new_section == section:
+                self.beginInsertRows(QModelIndex(), delta.new_row, delta.new_row)
+        elif isinstance(delta, SectionReordered) and delta.section == section:
+            self.layoutAboutToBeChanged.emit()
+
+    def catalog_changed(self, delta):
+        if self._order is not None:
+            self._sorted_catalog_changed(delta)
+            return
+        section = self.section_name
+        if isinstance(delta, ProgramAdded) and delta.section == section:
+            self.endInsertRows()
+        elif isinstance(delta, ProgramRemoved) and delta.section == section:
+            self.endRemoveRows()
+        elif isinstance(delta, ProgramMoved):
+            if delta.old_section == section and delta.new_section == section:
+                self.endMoveRows()
+            elif delta.old_section == section:
+                self.endRemoveRows()
+            elif delta.new_section == section:
+                self.endInsertRows()
+        elif isinstance(delta, (ProgramRenamed, ProgramChanged)) and delta.section == section:
+            index = self.index(delta.row)
+            self.dataChanged.emit(index, index)
+        elif isinstance(delta, SectionReordered) and delta.section == section:
+            self.layoutChanged.emit()
+
+    def _sorted_catalog_changed(self, delta):
+        # Перестановка внутри раздела (SectionReordered, перенос в конец)
+        # на отсортированный список не влияет
+        section = self.section_name
+        if isinstance(delta, ProgramAdded) and delta.section == section:
+            self._insert_sorted(delta.program)
+        elif isinstance(delta, ProgramRemoved) and delta.section == section:
+            self._remove_sorted(delta.program)
+        elif isinstance(delta, ProgramMoved) and delta.old_section != delta.new_section:
+            if delta.old_section == section:
+                self._remove_sorted(delta.program)
+            elif delta.new_section == section:
+                self._insert_sorted(delta.program)
+        elif isinstance(delta, (ProgramRenamed, ProgramChanged)) and delta.section == section:
+            self._update_sorted(delta.program)
+
+
+# Модель результатов поиска по всем разделам: список SearchResult из SearchIndex
+class SearchResultsModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.results = []
+
+    def set_results(self, results):
+        self.beginResetModel()
+        self.results = results
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.results)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.results):
+            return None
+
+        result = self.results[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{result.program['name']}  —  {result.section}"
+        if role == Qt.ToolTipRole:
+            return result.program.get("path", "")
+        if role == ProgramRole:
+            return result.program
+        if role == SectionRole:
+            return result.section
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsDragEnabled
+
+
+# Делегат, рисующий строку программы: значок, плашка с названием и кнопка удаления.
+# Вместо отдельных виджетов на каждую запись рисуются только видимые строки.
+# Пока значок не загружен, на его месте рисуется заглушка.
+# Программы, файл которых не найден, рисуются приглушённо с пометкой
+class ProgramItemDelegate(QStyledItemDelegate):
+    def __init__(self, icon_provider=None, path_validator=None, parent=None):
+        super().__init__(parent)
+        self.icon_provider = icon_provider
+        self.path_validator = path_validator
+        self.name_font = QFont("Segoe UI")
+        self.name_font.setPixelSize(14)
+        self.delete_font = QFont("Segoe UI")
+        self.delete_font.setPixelSize(14)
+        self.delete_font.setBold(True)
+
+    @staticmethod
+    def delete_button_rect(rect):
+        return QRect(rect.right() - 10 - DELETE_BUTTON_SIZE,
+                     rect.center().y() - DELETE_BUTTON_SIZE // 2,
+                     DELETE_BUTTON_SIZE, DELETE_BUTTON_SIZE)
+
+    def sizeHint(self, option, index):
+        return QSize(0, ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        name = index.data(Qt.DisplayRole) or ""
+        rect = option.rect
+        hovered = bool(option.state & QStyle.State_MouseOver)
+
+        view = option.widget
+        hover_pos = getattr(view, "hover_pos", None)
+        delete_rect = self.delete_button_rect(rect)
+        delete_hovered = hovered and hover_pos is not None and delete_rect.contains(hover_pos)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+
+        theme = current_theme()
+        painter.setBrush(QColor(theme.row_hover) if hovered and not delete_hovered else QColor(theme.row))
+        painter.drawRoundedRect(rect, 10, 10)
+
+        icon_rect = QRect(rect.left() + 12, rect.center().y() - ICON_BOX // 2, ICON_BOX, ICON_BOX)
+        program = index.data(ProgramRole)
+        missing = (self.path_validator is not None and program is not None
+                   and self.path_validator.exists(program.get("path", "")) is False)
+        pixmap = None
+        if self.icon_provider is not None:
+            pixmap = self.icon_provider.pixmap(icon_source(program)) if program else None
+        if pixmap is not None:
+            painter.drawPixmap(icon_rect, pixmap)
+        else:
+            painter.setBrush(QColor(theme.placeholder) if not hovered or delete_hovered else QColor(theme.placeholder_hover))
+            painter.drawRoundedRect(icon_rect, 6, 6)
+
+        text_rect = rect.adjusted(12 + ICON_BOX + 12, 0, -(DELETE_BUTTON_SIZE + 30), 0)
+        painter.setFont(self.name_font)
+        if missing:
+            name = f"{name}  (файл не найден)"
+        painter.setPen(QColor(theme.missing) if missing else QColor(theme.muted_text))
+        elided = painter.fontMetrics().elidedText(name, Qt.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft, elided)
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(theme.danger_hover) if delete_hovered else QColor(theme.danger))
+        painter.drawRoundedRect(delete_rect, 8, 8)
+        painter.setFont(self.delete_font)
+        painter.setPen(Qt.white)
+        painter.drawText(delete_rect, Qt.AlignCenter, "X")
+
+        painter.restore()
+
+
+# Представление списка программ: запуск по клику, удаление по "X",
+# перетаскивание между разделами и контекстное меню
+class ProgramListView(QListView):
+    launchRequested = pyqtSignal(object, str)
+    deleteRequested = pyqtSignal(object, str)
+    contextMenuRequested = pyqtSignal(object, object, str)
+
+    def __init__(self, parent=None, icon_provider=None, path_validator=None):
+        super().__init__(parent)
+        self.setObjectName("program_list")
+        self.setFrameShape(QFrame.NoFrame)
+        self.setItemDelegate(ProgramItemDelegate(icon_provider, path_validator, self))
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(500)
+        self.setSpacing(ROW_SPACING)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover, True)
+        # Сброс принимает страница раздела, поэтому сам список drop не принимает
+        self.setAcceptDrops(False)
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._on_context_menu)
+
+        self.hover_pos = None
+        self._press_pos = None
+        self._press_index = QModelIndex()
+
+    def _program_at(self, pos):
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return QModelIndex(), None
+        return index, index.data(ProgramRole)
+
+    def _on_context_menu(self, pos):
+        index, program = self._program_at(pos)
+        if program is not None:
+            self.contextMenuRequested.emit(self.viewport().mapToGlobal(pos), program, index.data(SectionRole))
+
+    def mousePressEvent(self, e):
+        if e.button() == Qt.LeftButton:
+            self._press_pos = e.pos()
+            self._press_index = self.indexAt(e.pos())
+        super().mousePressEvent(e)
+
+    def mouseMoveEvent(self, e):
+        self.hover_pos = e.pos()
+        index = self.indexAt(e.pos())
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
+
+        if (e.buttons() & Qt.LeftButton and self._press_pos is not None
+                and self._press_index.isValid()
+                and (e.pos() - self._press_pos).manhattanLength() >= QApplication.startDragDistance()):
+            program = self._press_index.data(ProgramRole)
+            self._press_pos = None
+            self._press_index = QModelIndex()
+            if program is not None:
+                self.start_program_drag(program)
+            return
+        super().mouseMoveEvent(e)
+
+    def mouseReleaseEvent(self, e):
+        if e.button() == Qt.LeftButton and self._press_index.isValid():
+            index, program = self._program_at(e.pos())
+            if program is not None and index == self._press_index:
+                rect = self.visualRect(index)
+                section_name = index.data(SectionRole)
+                if ProgramItemDelegate.delete_button_rect(rect).contains(e.pos()):
+                    self.deleteRequested.emit(program, section_name)
+                else:
+                    self.launchRequested.emit(program, section_name)
+        self._press_pos = None
+        self._press_index = QModelIndex()
+        super().mouseReleaseEvent(e)
+
+    def leaveEvent(self, e):
+        self.hover_pos = None
+        super().leaveEvent(e)
+
+    def start_program_drag(self, program):
+        mimeData = QMimeData()
+        mimeData.setData(PROGRAM_MIME_TYPE, str(program.id).encode("ascii"))
+        mimeData.setText(program.name)
+
+        drag = QDrag(self)
+        drag.setMimeData(mimeData)
+
+        drag.exec_(Qt.MoveAction)
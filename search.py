@@ -0,0 +1,279 @@
+import bisect
+import heapq
+import re
+from array import array
+from collections import namedtuple
+
+from catalog import (ProgramAdded, ProgramRemoved, ProgramMoved, ProgramRenamed,
+                     ProgramChanged, SectionRemoved, CatalogReset)
+
+SearchResult = namedtuple("SearchResult", "section program score")
+
+# Сколько записей одного списка просматривается при поиске.
+# Для неизбирательных запросов (например, "exe" или "c") это ограничивает цену запроса,
+# а выдача всё равно упирается в limit. Названия, которые начинаются с запроса
+# (и точные совпадения), оцениваются все, без этого ограничения
+CANDIDATE_CAP = 1000
+# Сколько самых редких триграмм запроса участвуют в подборе кандидатов
+MAX_TRIGRAM_LISTS = 4
+# Если названий, начинающихся с запроса, не больше limit * PREFIX_SCAN_FACTOR,
+# они просматриваются все по отсортированному списку названий
+PREFIX_SCAN_FACTOR = 4
+
+_WORD_SPLIT = re.compile(r"[^\w]+")
+
+
+def _add_postings(table, keys, entry_id):
+    for key in keys:
+        try:
+            table[key].append(entry_id)
+        except KeyError:
+            table[key] = array("I", (entry_id,))
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _prefixes(name, path):
+    # Префиксы длиной 1 и 2 всех слов названия и имени файла
+    basename = path.replace("\\", "/").rsplit("/", 1)[-1]
+    prefixes = set()
+    for token in _WORD_SPLIT.split(name + " " + basename):
+        if token:
+            prefixes.add(token[:1])
+            prefixes.add(token[:2])
+    return prefixes
+
+
+# Поисковый индекс по названиям и путям программ всех разделов.
+# Строки приводятся к casefold один раз при индексации; для запросов от трёх символов
+# используется триграммный индекс, для коротких — таблица префиксов слов
+# (запрос из одного-двух символов ищется только в начале слов, а не внутри них).
+# Индекс строится при первом запросе и дальше обновляется по дельтам каталога,
+# удалённые записи помечаются и вычищаются пачкой
+class SearchIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # entry_id -> [section, program, name, path] или None для удалённой записи
+        self._entries = []
+        self._ids = {}
+        self._trigrams = {}
+        self._prefixes = {}
+        # начало названия (1-3 символа) -> {длина названия: entry_id}
+        self._name_starts = {}
+        # (название, entry_id) по алфавиту: названия с общим началом идут подряд
+        self._names = []
+        self._names_sorted = True
+        self._paths = {}
+        self._dead = 0
+        self.built = False
+
+    def __len__(self):
+        return len(self._ids)
+
+    def build(self, catalog):
+        self.clear()
+        for section_name, section_data in catalog.sections.items():
+            for program in section_data["programs"]:
+                self._index(section_name, program)
+        self._sort_names()
+        self.built = True
+
+    def ensure_built(self, catalog):
+        if not self.built:
+            self.build(catalog)
+
+    def add(self, section_name, program):
+        self._index(section_name, program)
+
+    def remove(self, program):
+        entry_id = self._ids.pop(id(program), None)
+        if entry_id is None:
+            return
+        self._entries[entry_id] = None
+        self._dead += 1
+        if self._dead > 1000 and self._dead > len(self._ids):
+            self._compact()
+
+    def update(self, program):
+        entry_id = self._ids.get(id(program))
+        if entry_id is None:
+            return
+        section_name = self._entries[entry_id][0]
+        self.remove(program)
+        self.add(section_name, program)
+
+    def apply(self, delta, catalog):
+        if isinstance(delta, CatalogReset):
+            self.clear()
+        elif not self.built:
+            return
+        elif isinstance(delta, ProgramAdded):
+            self.add(delta.section, delta.program)
+        elif isinstance(delta, ProgramRemoved):
+            self.remove(delta.program)
+        elif isinstance(delta, ProgramMoved):
+            entry_id = self._ids.get(id(delta.program))
+            if entry_id is not None:
+                self._entries[entry_id][0] = delta.new_section
+        elif isinstance(delta, (ProgramRenamed, ProgramChanged)):
+            self.update(delta.program)
+        elif isinstance(delta, SectionRemoved):
+            for entry in self._entries:
+                if entry is not None and entry[0] == delta.section:
+                    self.remove(entry[1])
+
+    def search(self, query, limit=200, boost=None, boosted=None):
+        # boost(path) -> прибавка к оценке совпадения, например за частоту запусков;
+        # boosted - пути, у которых она может быть больше нуля (None - у любых)
+        query = query.strip().casefold()
+        if not query:
+            return []
+
+        if len(query) < 3:
+            candidates = self._prefix_candidates(query)
+            grams_count = 0
+        else:
+            candidates, grams_count = self._trigram_candidates(query)
+
+        entries = self._entries
+        scored = self._name_start_matches(query, limit, boost, boosted)
+        for entry_id, hits in candidates.items():
+            entry = entries[entry_id]
+            # Начинающиеся с запроса названия уже оценены в _name_start_matches
+            if entry is None or entry[2].startswith(query):
+                continue
+            score = self._score(query, entry[2], entry[3], hits, grams_count)
+            if score > 0:
+                if boost is not None and (boosted is None or entry[1].path in boosted):
+                    score += boost(entry[1].path)
+                scored.append((score, -entry_id, entry))
+
+        best = heapq.nlargest(limit, scored)
+        return [SearchResult(entry[0], entry[1], score) for score, _, entry in best]
+
+    def _index(self, section_name, program):
+        name = program.name.casefold()
+        path = program.path.casefold()
+        entry_id = len(self._entries)
+        self._entries.append([section_name, program, name, path])
+        self._ids[id(program)] = entry_id
+
+        _add_postings(self._trigrams, _trigrams(name + "\n" + path), entry_id)
+        _add_postings(self._prefixes, _prefixes(name, path), entry_id)
+        _add_postings(self._paths, (program.path,), entry_id)
+        if self.built:
+            bisect.insort(self._names, (name, entry_id))
+        else:
+            # При построении список сортируется один раз в конце
+            self._names.append((name, entry_id))
+            self._names_sorted = False
+        for key in {name[:1], name[:2], name[:3]}:
+            if key:
+                buckets = self._name_starts.get(key)
+                if buckets is None:
+                    buckets = self._name_starts[key] = {}
+                _add_postings(buckets, (len(name),), entry_id)
+
+    def _compact(self):
+        live = [(entry[0], entry[1]) for entry in self._entries if entry is not None]
+        self.clear()
+        for section_name, program in live:
+            self._index(section_name, program)
+        self._sort_names()
+        self.built = True
+
+    def _name_start_matches(self, query, limit, boost, boosted):
+        # Названия, начинающиеся с запроса, - лучшие совпадения, и в выдачу они попадают
+        # без ограничения CANDIDATE_CAP. Их оценка зависит только от длины названия,
+        # поэтому при большом их числе они перебираются от коротких к длинным, пока
+        # следующая длина ещё может попасть в limit лучших; немногие берутся подряд
+        # из отсортированного списка названий. Записи с прибавкой boost оцениваются
+        # отдельно: их мало, и они находятся по пути
+        buckets = self._name_starts.get(query[:3])
+        if not buckets:
+            return []
+        lists = ((length, buckets[length]) for length in sorted(buckets))
+        if len(query) > 3:
+            if not self._names_sorted:
+                self._sort_names()
+            names = self._names
+            start = bisect.bisect_left(names, (query,))
+            end = bisect.bisect_left(names, (query + "\U0010ffff",), start)
+            if end - start <= limit * PREFIX_SCAN_FACTOR:
+                lists = ((None, [entry_id for _, entry_id in names[start:end]]),)
+
+        entries = self._entries
+        if boost is None:
+            boosted = ()
+        best = []
+        for length, entry_ids in lists:
+            if length is not None and len(best) >= limit and 900 - min(length, 99) < best[0][0]:
+                break
+            for entry_id in entry_ids:
+                entry = entries[entry_id]
+                if entry is None or not entry[2].startswith(query):
+                    continue
+                if boosted is not None and entry[1].path in boosted:
+                    continue
+                score = 1000 if entry[2] == query else 900 - min(len(entry[2]), 99)
+                if boosted is None:
+                    score += boost(entry[1].path)
+                item = (score, -entry_id, entry)
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+
+        if boosted:
+            for path in list(boosted):
+                for entry_id in self._paths.get(path, ()):
+                    entry = entries[entry_id]
+                    if entry is None or entry[1].path != path or not entry[2].startswith(query):
+                        continue
+                    score = 1000 if entry[2] == query else 900 - min(len(entry[2]), 99)
+                    best.append((score + boost(path), -entry_id, entry))
+        return best
+
+    def _sort_names(self):
+        self._names.sort()
+        self._names_sorted = True
+
+    def _prefix_candidates(self, query):
+        entry_ids = self._prefixes.get(query, ())
+        return dict.fromkeys(entry_ids[:CANDIDATE_CAP], 1)
+
+    def _trigram_candidates(self, query):
+        grams = _trigrams(query)
+        postings = sorted((self._trigrams[g] for g in grams if g in self._trigrams), key=len)
+        postings = postings[:MAX_TRIGRAM_LISTS]
+
+        counts = {}
+        for entry_ids in postings:
+            for entry_id in entry_ids[:CANDIDATE_CAP]:
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+
+        # Нечёткое совпадение: достаточно половины использованных триграмм
+        required = max(1, (len(postings) + 1) // 2)
+        candidates = {entry_id: hits for entry_id, hits in counts.items() if hits >= required}
+        return candidates, len(postings)
+
+    @staticmethod
+    def _score(query, name, path, hits, grams_count):
+        if name == query:
+            return 1000
+        if name.startswith(query):
+            return 900 - min(len(name), 99)
+        position = name.find(query)
+        if position > 0:
+            if not name[position - 1].isalnum():
+                return 700 - min(position, 99)
+            return 500 - min(position, 99)
+        if query in path:
+            return 300 - min(len(path), 99)
+        if grams_count:
+            return 100 * hits // grams_count
+        return 0
@@ -0,0 +1,330 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+from tracing import count, traced
+
+# Сколько ждать после последнего изменения перед записью и как долго
+# можно откладывать запись при непрерывном потоке изменений, секунды
+WRITE_DELAY = 0.3
+MAX_WRITE_DELAY = 2.0
+BACKUP_COUNT = 3
+# Сколько раз повторять неудавшуюся запись (диск переполнен, файл заблокирован)
+# и через сколько секунд, умноженных на номер попытки
+WRITE_RETRIES = 3
+RETRY_DELAY = 0.5
+
+
+def default_settings_path():
+    # Получаем путь к исполняемому файлу или текущему скрипту
+    if getattr(sys, 'frozen', False):
+        # Если приложение запущено как исполняемый файл
+        return os.path.join(os.path.dirname(sys.executable), "settings.json")
+    else:
+        # Если запущено как скрипт Python
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
+
+
+def file_stat(path):
+    # Отпечаток файла для сравнения версий: inode, время изменения и размер; None, если файла нет
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def backup_paths(path, count=BACKUP_COUNT):
+    return [f"{path}.bak{i}" for i in range(1, count + 1)]
+
+
+# Счётчики фонового писателя настроек.
+# latency — от первого изменения серии до записи на диск, write — сама запись (сериализация - в encode_pending)
+class WriterStats:
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.failures = 0
+        self.conflicts = 0
+        self.bytes_written = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+# Фоновая запись settings.json.
+# schedule() только запоминает, что данные изменились: серия изменений схлопывается,
+# и данные сериализуются один раз за окно задержки. Сериализация идёт в потоке
+# владельца данных (он же меняет каталог, поэтому снимок согласован): когда окно
+# истекло, поток записи просит его об этом через dispatch(fn) - например, сигналом Qt.
+# Без dispatch данные сериализуются в следующем schedule() после окна и в flush().
+# Потоку записи достаются только готовые байты. Файл заменяется атомарно через
+# временный файл и rename, а предыдущие версии сохраняются как settings.json.bak1..bakN.
+# Неудачная запись повторяется WRITE_RETRIES раз, если её не вытеснила более новая;
+# последняя ошибка остаётся в last_error и выводится в stderr.
+# Если файл после last_stat изменил кто-то другой, запись пропускается: изменения
+# остаются в памяти, пока чужая правка не будет слита (LauncherCore.sync_settings
+# вызывает rebase и сохраняет каталог заново)
+class SettingsWriter:
+    def __init__(self, path, delay=WRITE_DELAY, max_delay=MAX_WRITE_DELAY, backups=BACKUP_COUNT,
+                 dispatch=None):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.backups = backups
+        self.dispatch = dispatch
+        self.stats = WriterStats()
+        self.last_error = None
+        # Отпечаток версии файла, которая уже есть в памяти: после своей записи,
+        # загрузки или слияния. По нему наблюдатель за settings.json отличает
+        # свою запись от чужой, а запись - не затирает ли она чужую правку
+        self.last_stat = None
+        # Запись пропущена из-за чужой правки и ждёт слияния
+        self.conflict = False
+
+        self._cond = threading.Condition()
+        # Изменённые данные, ещё не сериализованные (ссылка, а не копия)
+        self._data = None
+        self._first_request = None
+        self._due = None
+        self._encode_requested = False
+        # Готовые к записи байты: время первого изменения серии, номер попытки, когда писать
+        self._pending = None
+        self._pending_since = None
+        self._attempt = 0
+        self._write_at = None
+        self._writing = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+        self._thread.start()
+
+    def schedule(self, data):
+        with self._cond:
+            if self._closed:
+                return
+            now = time.monotonic()
+            self.stats.requests += 1
+            expired = self._data is not None and now >= self._due
+            if self._data is not None:
+                self.stats.coalesced += 1
+            else:
+                self._first_request = now
+            self._data = data
+            self._due = min(now + self.delay, self._first_request + self.max_delay)
+            self._cond.notify_all()
+        if expired and self.dispatch is None:
+            self.encode_pending()
+
+    def encode_pending(self):
+        # Сериализация изменённых данных; вызывается в потоке владельца данных
+        with self._cond:
+            data, self._data = self._data, None
+            self._encode_requested = False
+            if data is None or self._closed:
+                return
+            requested = self._first_request
+        payload = encode_settings(data)
+        with self._cond:
+            self._pending = payload
+            self._pending_since = requested
+            self._attempt = 0
+            self._write_at = time.monotonic()
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        # Вызывается в потоке владельца данных: несериализованные изменения
+        # сериализуются сразу, затем ожидается запись
+        self.encode_pending()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._pending is not None:
+                self._write_at = time.monotonic()
+                self._cond.notify_all()
+            while self._pending is not None or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _next_job(self):
+        # Под self._cond: "write", "encode" или None, если пора завершаться
+        while True:
+            now = time.monotonic()
+            timeout = None
+            if self._pending is not None:
+                if self._closed or now >= self._write_at:
+                    return "write"
+                timeout = self._write_at - now
+            elif self._closed:
+                return None
+            if self._data is not None and self.dispatch is not None and not self._encode_requested:
+                if now >= self._due:
+                    self._encode_requested = True
+                    return "encode"
+                timeout = self._due - now if timeout is None else min(timeout, self._due - now)
+            self._cond.wait(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                if job is None:
+                    return
+                if job == "write":
+                    payload = self._pending
+                    attempt = self._attempt
+                    requested = self._pending_since
+                    self._pending = None
+                    self._writing = True
+            if job == "encode":
+                # Сериализацию выполнит поток владельца; байты вернутся через encode_pending
+                self.dispatch(self.encode_pending)
+                continue
+
+            started = time.monotonic()
+            try:
+                written = self._write(payload)
+            except Exception as e:
+                self.last_error = e
+                self.stats.failures += 1
+                self._retry(payload, attempt, requested, e)
+            else:
+                if written is None:
+                    with self._cond:
+                        self._writing = False
+                        self._cond.notify_all()
+                    continue
+                self.last_error = None
+                finished = time.monotonic()
+                latency_ms = (finished - requested) * 1000
+                write_ms = (finished - started) * 1000
+                self.stats.writes += 1
+                self.stats.bytes_written += written
+                self.stats.last_latency_ms = latency_ms
+                self.stats.max_latency_ms = max(self.stats.max_latency_ms, latency_ms)
+                self.stats.total_latency_ms += latency_ms
+                self.stats.last_write_ms = write_ms
+                self.stats.max_write_ms = max(self.stats.max_write_ms, write_ms)
+
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _retry(self, payload, attempt, requested, error):
+        with self._cond:
+            if self._pending is not None or self._data is not None:
+                # Более новые данные уже ждут записи и заменят эти
+                return
+            if attempt >= WRITE_RETRIES:
+                print(f"Не удалось записать {self.path}: {error}", file=sys.stderr)
+                return
+            self._pending = payload
+            self._pending_since = requested
+            self._attempt = attempt + 1
+            self._write_at = time.monotonic() + RETRY_DELAY * (attempt + 1)
+            self._cond.notify_all()
+
+    def rebase(self, stat):
+        # Память теперь включает версию файла stat (загрузка или слияние чужой правки).
+        # True, если запись пропускалась из-за этой правки и каталог надо сохранить снова.
+        # Если файл уже сменился ещё раз, отпечаток не принимается: новая версия
+        # придёт следующим снимком
+        with self._cond:
+            if file_stat(self.path) != stat:
+                return False
+            self.last_stat = stat
+            conflict, self.conflict = self.conflict, False
+        return conflict
+
+    @traced("settings.write", "io")
+    def _write(self, payload):
+        # Число записанных байт или None, если файл изменён извне и запись пропущена
+        current = file_stat(self.path)
+        if self.last_stat is not None and current is not None and current != self.last_stat:
+            with self._cond:
+                if not self.conflict:
+                    print(f"{self.path} изменён извне: запись отложена до слияния правок",
+                          file=sys.stderr)
+                self.conflict = True
+                self.stats.conflicts += 1
+            return None
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._rotate_backups()
+        os.replace(tmp_path, self.path)
+        self.last_stat = file_stat(self.path)
+        _fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+        count("settings_bytes_written", len(payload))
+        return len(payload)
+
+    def _rotate_backups(self):
+        if not self.backups or not os.path.exists(self.path):
+            return
+        paths = backup_paths(self.path, self.backups)
+        for older, newer in zip(reversed(paths[1:]), reversed(paths[:-1])):
+            if os.path.exists(newer):
+                os.replace(newer, older)
+        if os.path.exists(paths[0]):
+            os.remove(paths[0])
+        # Жёсткая ссылка сохраняет текущую версию без копирования;
+        # на файловых системах без ссылок делается обычная копия
+        try:
+            os.link(self.path, paths[0])
+        except OSError:
+            shutil.copy2(self.path, paths[0])
+
+
+@traced("settings.serialize")
+def encode_settings(data):
+    # Словари и списки кодирует C-кодировщик, записи каталога превращаются
+    # в словари через to_dict
+    return json.dumps(data, ensure_ascii=False, default=_to_json).encode("utf-8")
+
+
+def _to_json(obj):
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"{type(obj).__name__} не сериализуется в JSON")
+    return to_dict()
+
+
+def _fsync_dir(directory):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def load_json_with_backups(path, backups=BACKUP_COUNT):
+    # Если основной файл повреждён или пропал, берётся самая свежая целая резервная копия
+    for candidate in [path] + backup_paths(path, backups):
+        try:
+            with open(candidate, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+            continue
+    return None
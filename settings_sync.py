@@ -0,0 +1,216 @@
+import json
+
+from catalog import Program
+from settings_store import file_stat
+from tracing import count, traced
+
+# Ключи settings.json, которые не сливаются с внешними правками: каталог разбирается
+# отдельно, а статистика запусков у каждого рабочего места своя
+_OWN_KEYS = ("sections", "usage")
+
+
+def program_value(program, section_name):
+    # Всё, что есть у записи в файле, одним кортежем: сравнение версий - одно ==
+    extra = json.dumps(program.extra, ensure_ascii=False, sort_keys=True) if program.extra else None
+    return (section_name, program.name, program.path, bool(program.run_as_admin),
+            program.icon_path or "", extra)
+
+
+def option_value(data, key):
+    if key not in data:
+        return None
+    return json.dumps(data[key], ensure_ascii=False, sort_keys=True)
+
+
+# Содержимое settings.json в виде, удобном для сравнения:
+#   programs   - {id: program_value}
+#   sections   - {раздел: (icon_path, (id, ...))} в порядке файла
+#   unnumbered - [(раздел, Program)] записи без id или с повторяющимся id, их дописали руками
+#   options    - {ключ: JSON} для остальных ключей верхнего уровня (groups, telemetry, ...)
+#   stat       - отпечаток файла, из которого прочитан снимок
+class SettingsSnapshot:
+    def __init__(self, data, stat=None):
+        self.stat = stat
+        self.programs = {}
+        self.sections = {}
+        self.unnumbered = []
+        self.options = {key: option_value(data, key) for key in data if key not in _OWN_KEYS}
+        for section_name, section_data in data.get("sections", {}).items():
+            ids = []
+            for program_data in section_data.get("programs", []):
+                program = Program.from_dict(program_data)
+                if type(program.id) is not int or program.id in self.programs:
+                    self.unnumbered.append((section_name, program))
+                    continue
+                self.programs[program.id] = program_value(program, section_name)
+                ids.append(program.id)
+            self.sections[section_name] = (section_data.get("icon_path", ""), tuple(ids))
+
+
+@traced("settings.read", "io")
+def read_snapshot(path):
+    # Снимок файла или None, если файла нет или он дописан не до конца:
+    # следующее изменение файла вызовет новое чтение
+    stat = file_stat(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return SettingsSnapshot(data, stat)
+
+
+def _changed(base, remote):
+    return [key for key in base.keys() | remote.keys() if base.get(key) != remote.get(key)]
+
+
+# Итог слияния внешней правки: сколько изменений применено и какие конфликтуют
+# с несохранёнными локальными правками (в них остаётся локальная версия)
+class MergeReport:
+    def __init__(self):
+        self.applied = 0
+        self.conflicts = []
+        self.sections_changed = []
+        self.needs_save = False
+
+    def conflict(self, text):
+        self.conflicts.append(text)
+        self.needs_save = True
+
+    def summary(self):
+        text = f"settings.json изменён извне: применено изменений - {self.applied}"
+        if self.conflicts:
+            text += f", конфликтов - {len(self.conflicts)}"
+        return text
+
+
+@traced("settings.merge")
+def merge(core, base, remote):
+    # Трёхстороннее слияние: base - последняя известная версия файла, remote - новая,
+    # local - каталог в памяти. Меняется только то, что отличается между base и remote.
+    # Если запись в памяти тоже изменилась с base и не совпадает с remote - это конфликт,
+    # остаётся локальная версия, и она же будет записана в файл
+    catalog = core.catalog
+    catalog.ensure_index()
+    report = MergeReport()
+
+    changed_sections = _changed(base.sections, remote.sections)
+    # Разделы в памяти до слияния: порядок и удаление сравниваются с ними,
+    # а не с уже изменённым слиянием каталогом
+    local_sections = {}
+    for section_name in changed_sections:
+        if section_name in catalog.sections:
+            section_data = catalog.sections[section_name]
+            local_sections[section_name] = (section_data.get("icon_path", ""),
+                                            tuple(program.id for program in section_data["programs"]))
+
+    for section_name in changed_sections:
+        if section_name not in base.sections and section_name in remote.sections:
+            if catalog.add_section(section_name, remote.sections[section_name][0]):
+                report.applied += 1
+
+    for program_id in _changed(base.programs, remote.programs):
+        base_value = base.programs.get(program_id)
+        remote_value = remote.programs.get(program_id)
+        program = catalog.get(program_id)
+        local_value = program_value(program, program.section) if program is not None else None
+        if local_value == remote_value:
+            continue
+        if local_value != base_value:
+            name = (remote_value or local_value)[1]
+            report.conflict(f"программа '{name}' изменена и здесь, и в файле")
+            continue
+        if remote_value is None:
+            catalog.remove_program(program_id)
+        elif program is None:
+            if remote_value[0] not in catalog.sections:
+                report.conflict(f"раздел '{remote_value[0]}' для программы '{remote_value[1]}' удалён здесь")
+                continue
+            catalog.add_program(remote_value[0], _program(program_id, remote_value))
+        else:
+            _update(catalog, program, remote_value)
+        report.applied += 1
+
+    for section_name, program in remote.unnumbered:
+        # Запись без id добавляется один раз: до сохранения она остаётся без id и в файле
+        if section_name not in catalog.sections or any(
+                other.section == section_name and other.path == program.path
+                for other in catalog.by_name(program.name)):
+            continue
+        program.id = None
+        catalog.add_program(section_name, program)
+        report.applied += 1
+        report.needs_save = True
+
+    for section_name in changed_sections:
+        base_section = base.sections.get(section_name)
+        remote_section = remote.sections.get(section_name)
+        local_section = local_sections.get(section_name)
+        if base_section is None or local_section is None:
+            continue
+        if remote_section is None:
+            if local_section != base_section:
+                report.conflict(f"раздел '{section_name}' удалён в файле, но изменён здесь")
+            elif catalog.remove_section(section_name):
+                report.applied += 1
+            continue
+        if remote_section[0] != base_section[0]:
+            if local_section[0] != base_section[0]:
+                report.conflict(f"значок раздела '{section_name}' изменён и здесь, и в файле")
+            else:
+                catalog.sections[section_name]["icon_path"] = remote_section[0]
+                report.sections_changed.append(section_name)
+                report.applied += 1
+        if remote_section[1] != base_section[1] and _order_changed(catalog, section_name, remote_section[1]):
+            if local_section[1] != base_section[1] and _reordered(local_section[1], base_section[1]):
+                report.conflict(f"порядок раздела '{section_name}' изменён и здесь, и в файле")
+            else:
+                position = {program_id: i for i, program_id in enumerate(remote_section[1])}
+                last = len(position)
+                catalog.sort_section(section_name, lambda p: position.get(p.id, last))
+                report.applied += 1
+
+    for key in _changed(base.options, remote.options):
+        local_value = option_value(core.data, key)
+        if local_value == remote.options.get(key):
+            continue
+        if local_value != base.options.get(key):
+            report.conflict(f"настройка '{key}' изменена и здесь, и в файле")
+            continue
+        if remote.options.get(key) is None:
+            del core.data[key]
+        else:
+            core.data[key] = json.loads(remote.options[key])
+        report.applied += 1
+
+    count("settings_merged", report.applied)
+    return report
+
+
+def _program(program_id, value):
+    section_name, name, path, run_as_admin, icon_path, extra = value
+    return Program(name, path, run_as_admin, icon_path, program_id, json.loads(extra) if extra else None)
+
+
+def _update(catalog, program, value):
+    section_name, name, path, run_as_admin, icon_path, extra = value
+    if program.section != section_name:
+        catalog.move_program(program.id, section_name)
+    catalog.update_program(program.id, name=name, path=path, run_as_admin=run_as_admin,
+                           icon_path=icon_path, extra=json.loads(extra) if extra else None)
+
+
+def _order_changed(catalog, section_name, remote_ids):
+    # Порядок общих для файла и памяти записей расходится
+    present = set(remote_ids)
+    local_ids = [program.id for program in catalog.programs(section_name) if program.id in present]
+    local_set = set(local_ids)
+    return local_ids != [program_id for program_id in remote_ids if program_id in local_set]
+
+
+def _reordered(local_ids, base_ids):
+    # Локальная правка порядка, а не только добавление или удаление записей
+    common = set(local_ids) & set(base_ids)
+    return [i for i in local_ids if i in common] != [i for i in base_ids if i in common]
@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from settings_store import file_stat
+from settings_sync import read_snapshot
+
+# Пауза после последнего события файловой системы перед чтением, мс:
+# запись через временный файл и ротация копий дают серию событий
+RELOAD_DELAY_MS = 200
+
+
+# Наблюдение за settings.json.
+# Следит за каталогом файла (атомарная замена через rename снимает наблюдение
+# с самого файла) и за файлом (правка на месте). После затишья файл читается
+# и разбирается в фоновом потоке; если отпечаток файла не изменился, чтение
+# пропускается. Готовый снимок приходит в snapshotRead в потоке интерфейса
+class SettingsWatcher(QObject):
+    snapshotRead = pyqtSignal(object)
+    _read = pyqtSignal(object)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = os.path.abspath(path)
+        self._last_stat = None
+        self._reading = False
+        self._again = False
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="settings-reload")
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._schedule)
+        self._watcher.fileChanged.connect(self._schedule)
+        self._read.connect(self._on_read)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(RELOAD_DELAY_MS)
+        self._timer.timeout.connect(self._start_read)
+
+    def start(self):
+        # Первое чтение даёт версию файла, с которой сравниваются следующие
+        self._watcher.addPath(os.path.dirname(self.path))
+        self._watch_file()
+        self._start_read()
+
+    def shutdown(self):
+        self._timer.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _watch_file(self):
+        if os.path.exists(self.path) and self.path not in self._watcher.files():
+            self._watcher.addPath(self.path)
+
+    def _schedule(self, *args):
+        self._timer.start()
+
+    def _start_read(self):
+        self._watch_file()
+        if self._reading:
+            self._again = True
+            return
+        self._reading = True
+        self._executor.submit(self._read_file, self._last_stat)
+
+    def _read_file(self, last_stat):
+        snapshot = None
+        try:
+            if file_stat(self.path) != last_stat:
+                snapshot = read_snapshot(self.path)
+        finally:
+            self._read.emit(snapshot)
+
+    def _on_read(self, snapshot):
+        self._reading = False
+        if snapshot is not None and snapshot.stat != self._last_stat:
+            self._last_stat = snapshot.stat
+            self.snapshotRead.emit(snapshot)
+        if self._again:
+            self._again = False
+            self._timer.start()
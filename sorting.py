@@ -0,0 +1,145 @@
+import re
+import time
+
+from catalog import ProgramRemoved, SectionRemoved, CatalogReset
+
+# Поля сортировки списка: (название в меню, по убыванию по умолчанию).
+# Даты и счётчики по умолчанию идут от больших к меньшим: сначала недавние и частые
+SORT_FIELDS = {
+    "name": ("Имя", False),
+    "path": ("Путь", False),
+    "last_launched": ("Последний запуск", True),
+    "launches": ("Число запусков", True),
+    "frecency": ("Частота", True),
+}
+# Сколько полей участвует в сортировке: последнее выбранное - главное, предыдущие
+# разрешают равенство
+MAX_SORT_FIELDS = 3
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _number(match):
+    # Число без ведущих нулей с длиной впереди: более короткое число меньше,
+    # равные по длине сравниваются по цифрам. \x01 меньше любого печатного символа,
+    # поэтому "tool2" встаёт раньше "tool-a", как короткая строка раньше длинной
+    digits = match.group().lstrip("0") or "0"
+    return "\x01" + chr(len(digits)) + digits
+
+
+def natural_key(text):
+    # "tool2" раньше "tool10": числа внутри строки сравниваются как числа.
+    # Ключ - одна строка, а не кортеж частей: строки сортируются сравнением в C
+    return _DIGITS.sub(_number, text.casefold())
+
+
+# Обёртка, обращающая сравнение: строковое поле по убыванию в общем ключе-кортеже
+class _Reversed:
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+# Кэш ключей сортировки названий и путей по id записи.
+# natural_key считается один раз на запись и пересчитывается, только если
+# строка поменялась (переименование, правка пути). Удалённые записи выбрасываются
+# по дельтам каталога
+class SortKeys:
+    def __init__(self):
+        self._keys = {}
+
+    def clear(self):
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def name(self, program):
+        entry = self._keys.get(program.id)
+        if entry is not None and entry[0] == program.name:
+            return entry[1]
+        return self._update(program, 0, program.name)
+
+    def path(self, program):
+        entry = self._keys.get(program.id)
+        if entry is not None and entry[2] == program.path:
+            return entry[3]
+        return self._update(program, 2, program.path)
+
+    def _update(self, program, slot, text):
+        # Запись кэша: [название, ключ названия, путь, ключ пути]
+        entry = self._keys.get(program.id)
+        if entry is None:
+            entry = self._keys[program.id] = [None, None, None, None]
+        entry[slot] = text
+        entry[slot + 1] = natural_key(text)
+        return entry[slot + 1]
+
+    def apply(self, delta):
+        if isinstance(delta, (CatalogReset, SectionRemoved)):
+            self.clear()
+        elif isinstance(delta, ProgramRemoved):
+            self._keys.pop(delta.program.id, None)
+
+
+# Порядок строк списка программ: поля (поле, по убыванию) от главного к второстепенным.
+# Статистика запусков берётся из UsageStats на момент создания порядка
+class SortOrder:
+    def __init__(self, fields, keys, usage, now=None):
+        self.fields = tuple(fields)
+        self.keys = keys
+        self.usage = usage
+        self.now = time.time() if now is None else now
+        getters = [self._getter(field, descending) for field, descending in self.fields]
+        # id в конце: равные по всем полям записи стоят в постоянном порядке,
+        # и место новой записи находится двоичным поиском.
+        # Для одного и двух полей - без генератора: ключ строится для каждой записи
+        if len(getters) == 1:
+            first, = getters
+            self.key = lambda program: (first(program), program.id)
+        elif len(getters) == 2:
+            first, second = getters
+            self.key = lambda program: (first(program), second(program), program.id)
+        else:
+            self.key = lambda program: tuple(getter(program) for getter in getters) + (program.id,)
+
+    def _getter(self, field, descending):
+        usage = self.usage
+        if field == "name":
+            key = self.keys.name
+        elif field == "path":
+            key = self.keys.path
+        elif field == "last_launched":
+            key = lambda program: usage.last_launched(program.path) or 0
+        elif field == "launches":
+            key = lambda program: usage.launches(program.path)
+        elif field == "frecency":
+            now = self.now
+            key = lambda program: usage.score(program.path, now)
+        else:
+            raise ValueError(f"Неизвестное поле сортировки: {field}")
+        if not descending:
+            return key
+        if field in ("name", "path"):
+            return lambda program: _Reversed(key(program))
+        return lambda program: -key(program)
+
+    def label(self):
+        return ", ".join(SORT_FIELDS[field][0] + (" ↓" if descending else " ↑")
+                         for field, descending in self.fields)
+
+
+def push_field(fields, field):
+    # Новый список полей после выбора field: выбранное поле становится главным,
+    # повторный выбор главного поля меняет направление
+    if fields and fields[0][0] == field:
+        return [(field, not fields[0][1])] + list(fields[1:])
+    rest = [item for item in fields if item[0] != field]
+    return ([(field, SORT_FIELDS[field][1])] + rest)[:MAX_SORT_FIELDS]
@@ -0,0 +1,35 @@
+import sys
+import time
+
+# Модуль импортируется первым, поэтому отсчёт идёт от начала импортов лаунчера
+IMPORT_STARTED = time.perf_counter()
+# Бюджет времени до готовности окна к работе, мс
+STARTUP_BUDGET_MS = 300
+
+
+# Замер фаз запуска для --profile-startup. mark() закрывает текущую фазу:
+# её длительность считается от предыдущей отметки
+class StartupProfile:
+    def __init__(self, started=IMPORT_STARTED):
+        self.started = started
+        self.last = started
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    @property
+    def total_ms(self):
+        return (self.last - self.started) * 1000
+
+    def as_dict(self):
+        return {"phases": dict(self.phases), "total_ms": self.total_ms}
+
+    def report(self, budget_ms=STARTUP_BUDGET_MS, file=sys.stderr):
+        for phase, elapsed_ms in self.phases:
+            print(f"{phase:<28} {elapsed_ms:8.1f} мс", file=file)
+        verdict = "в пределах бюджета" if self.total_ms <= budget_ms else "БЮДЖЕТ ПРЕВЫШЕН"
+        print(f"{'до готовности':<28} {self.total_ms:8.1f} мс  ({verdict}: {budget_ms} мс)", file=file)
+        return self.total_ms <= budget_ms
@@ -0,0 +1,389 @@
+import json
+import os
+from contextlib import contextmanager
+
+from catalog import (Program, ProgramAdded, ProgramRemoved, ProgramMoved, ProgramRenamed,
+                     ProgramChanged, SectionAdded, SectionRemoved, SectionReordered,
+                     CatalogReset)
+from settings_store import SettingsWriter, file_stat, load_json_with_backups
+
+CATALOG_DB_NAME = "catalog.db"
+PAGE_SIZE = 500
+
+# Поля программы, у которых есть свои столбцы (id записи каталога - столбец uid);
+# остальные ключи хранятся в extra как JSON
+_PROGRAM_COLUMNS = ("id", "name", "path", "run_as_admin")
+
+
+# Хранилище по умолчанию: весь каталог в settings.json, запись через SettingsWriter
+class JsonStorage:
+    kind = "json"
+
+    def __init__(self, settings_path, dispatch=None):
+        self.settings_path = settings_path
+        self.writer = SettingsWriter(settings_path, dispatch=dispatch)
+        self._transaction_depth = 0
+        self._dirty_data = None
+
+    def load(self):
+        # Отпечаток берётся до чтения: правка между ними будет слита, а не затёрта
+        self.writer.rebase(file_stat(self.settings_path))
+        return load_json_with_backups(self.settings_path)
+
+    def catalog_changed(self, delta, catalog):
+        pass
+
+    def save(self, data):
+        if self._transaction_depth:
+            self._dirty_data = data
+            return
+        self.writer.schedule(data)
+
+    @contextmanager
+    def transaction(self):
+        self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            self._transaction_depth -= 1
+            if not self._transaction_depth and self._dirty_data is not None:
+                data, self._dirty_data = self._dirty_data, None
+                self.writer.schedule(data)
+
+    def close(self):
+        self.writer.close()
+
+
+# Список программ раздела, который читается из SQLite страницами по мере обращения.
+# Представление запрашивает только видимые строки, поэтому раздел из десятков тысяч
+# записей не загружается целиком. Любое изменение сначала дочитывает раздел в обычный list
+class PagedProgramList:
+    def __init__(self, storage, section_id, count):
+        self._storage = storage
+        self._section_id = section_id
+        self._count = count
+        self._pages = {}
+        self._items = None
+
+    def __len__(self):
+        return len(self._items) if self._items is not None else self._count
+
+    def __getitem__(self, i):
+        if self._items is not None or isinstance(i, slice):
+            return self._materialize()[i]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("program index out of range")
+        return self._page(i // PAGE_SIZE)[i % PAGE_SIZE]
+
+    def __iter__(self):
+        if self._items is not None:
+            return iter(self._items)
+        return (program for page in range((self._count + PAGE_SIZE - 1) // PAGE_SIZE)
+                for program in self._page(page))
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return f"PagedProgramList(section_id={self._section_id}, len={len(self)})"
+
+    def is_loaded(self):
+        return self._items is not None
+
+    def find_name(self, name):
+        if self._items is not None:
+            for row, program in enumerate(self._items):
+                if program["name"] == name:
+                    return row
+            return -1
+        return self._storage.find_position(self._section_id, name)
+
+    def _page(self, page):
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._pages[page] = self._storage.fetch_programs(
+                self._section_id, page * PAGE_SIZE, PAGE_SIZE)
+        return rows
+
+    def _materialize(self):
+        if self._items is None:
+            # Уже прочитанные записи переиспользуются: на них ссылаются модели и индексы
+            items = []
+            for page in range((self._count + PAGE_SIZE - 1) // PAGE_SIZE):
+                items.extend(self._page(page))
+            self._items = items
+            self._pages = None
+        return self._items
+
+    def __setitem__(self, i, value):
+        self._materialize()[i] = value
+
+    def __delitem__(self, i):
+        del self._materialize()[i]
+
+    def append(self, program):
+        self._materialize().append(program)
+
+    def insert(self, i, program):
+        self._materialize().insert(i, program)
+
+    def remove(self, program):
+        self._materialize().remove(program)
+
+    def pop(self, i=-1):
+        return self._materialize().pop(i)
+
+    def extend(self, programs):
+        self._materialize().extend(programs)
+
+    def sort(self, **kwargs):
+        self._materialize().sort(**kwargs)
+
+    def index(self, program, *args):
+        return self._materialize().index(program, *args)
+
+
+# Хранилище каталога в SQLite.
+# Изменения каталога переводятся в SQL по дельтам и фиксируются транзакцией в save(),
+# разделы загружаются постранично. При первом запуске импортируется settings.json
+class SqliteStorage:
+    kind = "sqlite"
+
+    def __init__(self, db_path, settings_path=None):
+        self.db_path = db_path
+        self.settings_path = settings_path
+        # sqlite3 нужен только этому хранилищу и не замедляет запуск с JSON
+        import sqlite3
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self._section_ids = {}
+        self._saved_settings = None
+        self._loaded_data = None
+        self._transaction_depth = 0
+        self._create_schema()
+        self._migrate_from_json()
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS sections (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                icon_path TEXT NOT NULL DEFAULT '',
+                position INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS programs (
+                id INTEGER PRIMARY KEY,
+                section_id INTEGER NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                path TEXT NOT NULL,
+                run_as_admin INTEGER NOT NULL DEFAULT 0,
+                extra TEXT,
+                uid INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS programs_section ON programs(section_id, position);
+            CREATE INDEX IF NOT EXISTS programs_name ON programs(name);
+            CREATE INDEX IF NOT EXISTS programs_path ON programs(path);
+        """)
+        # Базы, созданные до появления постоянных id записей
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(programs)")]
+        if "uid" not in columns:
+            self.conn.execute("ALTER TABLE programs ADD COLUMN uid INTEGER")
+        self.conn.commit()
+
+    def _assign_uids(self):
+        # Записи без id (старая база, перенос settings.json без id) получают номера
+        # после наибольшего существующего; rowid уникален, значит и сумма тоже
+        self.conn.execute("""
+            UPDATE programs SET uid = (SELECT COALESCE(MAX(uid), 0) FROM programs) + id
+            WHERE uid IS NULL
+        """)
+
+    def _migrate_from_json(self):
+        if self.conn.execute("SELECT value FROM meta WHERE key = 'initialized'").fetchone():
+            return
+        data = None
+        if self.settings_path and os.path.exists(self.settings_path):
+            data = load_json_with_backups(self.settings_path)
+        with self.conn:
+            if data is not None:
+                self._import(data)
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from', ?)",
+                                  (self.settings_path,))
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('initialized', '1')")
+
+    def _import(self, data):
+        self.conn.execute("DELETE FROM programs")
+        self.conn.execute("DELETE FROM sections")
+        self._section_ids = {}
+        self._save_settings(data)
+        for position, (section_name, section_data) in enumerate(data.get("sections", {}).items()):
+            section_id = self.conn.execute(
+                "INSERT INTO sections (name, icon_path, position) VALUES (?, ?, ?)",
+                (section_name, section_data.get("icon_path", ""), position)).lastrowid
+            self._section_ids[section_name] = section_id
+            self._insert_programs(section_id, 0, section_data.get("programs", []))
+
+    def load(self):
+        self._assign_uids()
+        rows = self.conn.execute("""
+            SELECT s.id, s.name, s.icon_path,
+                   (SELECT COUNT(*) FROM programs p WHERE p.section_id = s.id)
+            FROM sections s ORDER BY s.position
+        """).fetchall()
+        if not rows and not self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone():
+            return None
+
+        sections = {}
+        self._section_ids = {}
+        for section_id, section_name, icon_path, count in rows:
+            self._section_ids[section_name] = section_id
+            sections[section_name] = {
+                "icon_path": icon_path,
+                "programs": PagedProgramList(self, section_id, count)
+            }
+        self._loaded_data = self._load_settings()
+        self._loaded_data["sections"] = sections
+        return self._loaded_data
+
+    def _load_settings(self):
+        # Ключи верхнего уровня кроме sections (настройки телеметрии и т.п.) лежат в meta
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        self._saved_settings = row[0] if row else None
+        return json.loads(row[0]) if row else {}
+
+    def _save_settings(self, data):
+        settings = json.dumps({k: v for k, v in data.items() if k != "sections"}, ensure_ascii=False)
+        if settings != self._saved_settings:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('settings', ?)", (settings,))
+            self._saved_settings = settings
+
+    def fetch_programs(self, section_id, offset, limit):
+        rows = self.conn.execute("""
+            SELECT uid, name, path, run_as_admin, extra FROM programs
+            WHERE section_id = ? AND position >= ? AND position < ?
+            ORDER BY position
+        """, (section_id, offset, offset + limit)).fetchall()
+        return [_program_from_row(row) for row in rows]
+
+    def find_position(self, section_id, name):
+        row = self.conn.execute(
+            "SELECT MIN(position) FROM programs WHERE section_id = ? AND name = ?",
+            (section_id, name)).fetchone()
+        return -1 if row[0] is None else row[0]
+
+    def catalog_changed(self, delta, catalog):
+        ids = self._section_ids
+        execute = self.conn.execute
+        if isinstance(delta, CatalogReset):
+            if catalog.data is not self._loaded_data:
+                self._import(catalog.data)
+                self._assign_uids()
+        elif isinstance(delta, ProgramAdded):
+            section_id = ids[delta.section]
+            self._shift(section_id, delta.row, 1)
+            self._insert_programs(section_id, delta.row, [delta.program])
+        elif isinstance(delta, ProgramRemoved):
+            section_id = ids[delta.section]
+            execute("DELETE FROM programs WHERE section_id = ? AND position = ?", (section_id, delta.row))
+            self._shift(section_id, delta.row + 1, -1)
+        elif isinstance(delta, ProgramMoved):
+            old_id, new_id = ids[delta.old_section], ids[delta.new_section]
+            execute("UPDATE programs SET section_id = ?, position = -1 WHERE section_id = ? AND position = ?",
+                    (new_id, old_id, delta.old_row))
+            self._shift(old_id, delta.old_row + 1, -1)
+            self._shift(new_id, delta.new_row, 1)
+            execute("UPDATE programs SET position = ? WHERE section_id = ? AND position = -1",
+                    (delta.new_row, new_id))
+        elif isinstance(delta, (ProgramRenamed, ProgramChanged)):
+            _, name, path, run_as_admin, extra = _program_to_row(delta.program)
+            execute("""UPDATE programs SET name = ?, path = ?, run_as_admin = ?, extra = ?
+                       WHERE section_id = ? AND position = ?""",
+                    (name, path, run_as_admin, extra, ids[delta.section], delta.row))
+        elif isinstance(delta, SectionAdded):
+            section_data = catalog.sections[delta.section]
+            position = execute("SELECT COALESCE(MAX(position) + 1, 0) FROM sections").fetchone()[0]
+            ids[delta.section] = execute(
+                "INSERT INTO sections (name, icon_path, position) VALUES (?, ?, ?)",
+                (delta.section, section_data.get("icon_path", ""), position)).lastrowid
+        elif isinstance(delta, SectionRemoved):
+            execute("DELETE FROM sections WHERE id = ?", (ids.pop(delta.section),))
+        elif isinstance(delta, SectionReordered):
+            section_id = ids[delta.section]
+            execute("DELETE FROM programs WHERE section_id = ?", (section_id,))
+            self._insert_programs(section_id, 0, catalog.programs(delta.section))
+
+    def _shift(self, section_id, from_position, offset):
+        self.conn.execute(
+            "UPDATE programs SET position = position + ? WHERE section_id = ? AND position >= ?",
+            (offset, section_id, from_position))
+
+    def _insert_programs(self, section_id, position, programs):
+        self.conn.executemany(
+            "INSERT INTO programs (section_id, position, uid, name, path, run_as_admin, extra) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((section_id, position + i) + _program_to_row(program) for i, program in enumerate(programs)))
+
+    def save(self, data):
+        self._save_settings(data)
+        if not self._transaction_depth:
+            self.conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        # Пакет изменений фиксируется одной транзакцией или откатывается целиком
+        self._transaction_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self.conn.rollback()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def _program_to_row(program):
+    # program - запись каталога или словарь из settings.json при переносе
+    if not isinstance(program, Program):
+        program = Program.from_dict(program)
+    extra = dict(program.extra) if program.extra else {}
+    if program.icon_path:
+        extra["icon_path"] = program.icon_path
+    uid = program.id if isinstance(program.id, int) else None
+    return (uid, program.name, program.path, int(bool(program.run_as_admin)),
+            json.dumps(extra, ensure_ascii=False) if extra else None)
+
+
+def _program_from_row(row):
+    uid, name, path, run_as_admin, extra = row
+    extra = json.loads(extra) if extra else None
+    icon_path = extra.pop("icon_path", "") if extra else ""
+    return Program(name, path, bool(run_as_admin), icon_path, uid, extra or None)
+
+
+def open_storage(settings_path, kind=None, dispatch=None):
+    # Без явного выбора используется SQLite, если база уже создана, иначе settings.json.
+    # dispatch(fn) - вызов fn в потоке владельца каталога, см. SettingsWriter
+    db_path = os.path.join(os.path.dirname(settings_path), CATALOG_DB_NAME)
+    if kind is None:
+        kind = "sqlite" if os.path.exists(db_path) else "json"
+    if kind == "sqlite":
+        return SqliteStorage(db_path, settings_path)
+    if kind == "json":
+        return JsonStorage(settings_path, dispatch)
+    raise ValueError(f"Неизвестное хранилище: {kind}")
@@ -0,0 +1,201 @@
+import threading
+import time
+from array import array
+
+import psutil
+
+from tracing import count, traced
+
+SAMPLE_INTERVAL = 1.0
+HISTORY_LENGTH = 120
+
+
+# Кольцевой буфер фиксированного размера поверх array: память не растёт,
+# сколько бы ни работал лаунчер
+class RingBuffer:
+    __slots__ = ("_data", "_size", "_next", "_count")
+
+    def __init__(self, size, typecode="d"):
+        self._data = array(typecode, [0]) * size
+        self._size = size
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size(self):
+        return self._size
+
+    def append(self, value):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def last(self, default=0):
+        if not self._count:
+            return default
+        return self._data[self._next - 1]
+
+    def values(self):
+        # От старых значений к новым
+        if self._count < self._size:
+            return self._data[:self._count].tolist()
+        return (self._data[self._next:] + self._data[:self._next]).tolist()
+
+    def resized(self, size):
+        ring = RingBuffer(size, self._data.typecode)
+        for value in self.values()[-size:]:
+            ring.append(value)
+        return ring
+
+
+# История показателей одного процесса
+class ProcessHistory:
+    FIELDS = ("cpu", "rss", "threads", "read_bps", "write_bps")
+
+    def __init__(self, process, size):
+        self.process = process
+        self.cpu = RingBuffer(size)
+        self.rss = RingBuffer(size)
+        self.threads = RingBuffer(size, "l")
+        self.read_bps = RingBuffer(size)
+        self.write_bps = RingBuffer(size)
+        self.last_io = None
+        self.last_time = None
+
+    def resize(self, size):
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field).resized(size))
+
+    def append(self, cpu, rss, threads, read_bps, write_bps):
+        self.cpu.append(cpu)
+        self.rss.append(rss)
+        self.threads.append(threads)
+        self.read_bps.append(read_bps)
+        self.write_bps.append(write_bps)
+
+
+# Счётчики самого сэмплера, чтобы видеть его собственную цену
+class SamplerStats:
+    def __init__(self):
+        self.rounds = 0
+        self.samples = 0
+        self.last_round_ms = 0.0
+        self.max_round_ms = 0.0
+        self.total_ms = 0.0
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+# Периодический сбор CPU, RSS, числа потоков и ввода-вывода по всем процессам
+# из ProcessMonitor. Показатели одного процесса читаются внутри Process.oneshot(),
+# то есть одной пачкой системных вызовов, без блокировки; в историю они дописываются
+# под self._lock, под которым configure меняет длину буферов.
+# on_sampled вызывается из потока сэмплера
+class ProcessSampler:
+    def __init__(self, monitor, interval=SAMPLE_INTERVAL, history=HISTORY_LENGTH, on_sampled=None):
+        self.monitor = monitor
+        self.interval = interval
+        self.history_length = history
+        self.on_sampled = on_sampled
+        self.stats = SamplerStats()
+
+        self._lock = threading.Lock()
+        self._histories = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(2)
+
+    def configure(self, interval=None, history=None):
+        if interval is not None:
+            self.interval = max(0.1, float(interval))
+        if history is not None and int(history) != self.history_length:
+            with self._lock:
+                self.history_length = max(2, int(history))
+                for process_history in self._histories.values():
+                    process_history.resize(self.history_length)
+
+    def history(self, key):
+        with self._lock:
+            return self._histories.get(key)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+            if self.on_sampled:
+                self.on_sampled()
+
+    @traced("psutil.sample", "process")
+    def sample_once(self):
+        started = time.perf_counter()
+        processes = self.monitor.processes()
+
+        with self._lock:
+            live = {info.key for info in processes}
+            for key in [key for key in self._histories if key not in live]:
+                del self._histories[key]
+
+        now = time.monotonic()
+        for info in processes:
+            process_history = self._histories.get(info.key)
+            if process_history is None:
+                try:
+                    process = psutil.Process(info.pid)
+                except psutil.Error:
+                    continue
+                with self._lock:
+                    process_history = ProcessHistory(process, self.history_length)
+                    self._histories[info.key] = process_history
+            sample = self._read(process_history.process)
+            if sample is None:
+                continue
+            cpu, rss, threads, io = sample
+            with self._lock:
+                self._append(process_history, now, cpu, rss, threads, io)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats.rounds += 1
+        self.stats.samples += len(processes)
+        count("processes_sampled", len(processes))
+        self.stats.last_round_ms = elapsed_ms
+        self.stats.max_round_ms = max(self.stats.max_round_ms, elapsed_ms)
+        self.stats.total_ms += elapsed_ms
+
+    @staticmethod
+    def _read(process):
+        # (cpu, rss, threads, io) или None, если процесс недоступен
+        try:
+            with process.oneshot():
+                cpu = process.cpu_percent()
+                rss = process.memory_info().rss
+                threads = process.num_threads()
+                try:
+                    io = process.io_counters()
+                except (psutil.AccessDenied, AttributeError):
+                    io = None
+        except psutil.Error:
+            return None
+        return cpu, rss, threads, io
+
+    @staticmethod
+    def _append(process_history, now, cpu, rss, threads, io):
+        read_bps = write_bps = 0.0
+        if io is not None and process_history.last_io is not None:
+            elapsed = now - process_history.last_time
+            if elapsed > 0:
+                read_bps = max(0, io.read_bytes - process_history.last_io.read_bytes) / elapsed
+                write_bps = max(0, io.write_bytes - process_history.last_io.write_bytes) / elapsed
+        process_history.last_io = io
+        process_history.last_time = now
+        process_history.append(cpu, rss, threads, read_bps, write_bps)
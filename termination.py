@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from tracing import count, span
+
+# Сколько ждать после terminate, прежде чем добивать kill, и сколько ждать после kill, секунды
+TERMINATE_TIMEOUT = 3.0
+KILL_TIMEOUT = 2.0
+# Сколько деревьев процессов завершается одновременно
+TERMINATE_THREADS = 8
+
+# Итог по одному дереву: terminated - завершились после terminate, killed - после kill,
+# survivors - пережили и kill (нет прав, зависли в ядре). error - текст ошибки или None
+TreeResult = namedtuple("TreeResult", "name pid terminated killed survivors error")
+
+
+def terminate_tree(pid, create_time=None, timeout=TERMINATE_TIMEOUT, kill_timeout=KILL_TIMEOUT):
+    # Завершает процесс и всех его потомков. Потомки собираются до terminate родителя:
+    # после его смерти они переходят к init и по дереву уже не находятся.
+    # create_time защищает от чужого процесса, получившего тот же PID.
+    # ProcessLookupError, если процесса уже нет
+    try:
+        parent = psutil.Process(pid)
+        if create_time is not None and abs(parent.create_time() - create_time) > 1:
+            raise ProcessLookupError(pid)
+        name = parent.name()
+        procs = parent.children(recursive=True) + [parent]
+    except psutil.NoSuchProcess:
+        raise ProcessLookupError(pid)
+
+    for proc in procs:
+        try:
+            proc.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    gone, alive = psutil.wait_procs(procs, timeout=timeout)
+    terminated = len(gone)
+    killed = 0
+    if alive:
+        for proc in alive:
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+        gone, alive = psutil.wait_procs(alive, timeout=kill_timeout)
+        killed = len(gone)
+    error = None
+    if alive:
+        error = "не завершились: " + ", ".join(str(proc.pid) for proc in alive)
+    return TreeResult(name, pid, terminated, killed, len(alive), error)
+
+
+# Итог завершения пачки деревьев
+class TerminationReport:
+    def __init__(self, results, total_ms):
+        self.results = results
+        self.total_ms = total_ms
+
+    @property
+    def failed(self):
+        return [result for result in self.results if result.error is not None]
+
+    def summary(self):
+        processes = sum(result.terminated + result.killed for result in self.results)
+        killed = sum(result.killed for result in self.results)
+        text = f"Закрыто программ: {len(self.results) - len(self.failed)} из {len(self.results)}, " \
+               f"процессов: {processes} за {self.total_ms:.0f} мс"
+        if killed:
+            text += f", принудительно: {killed}"
+        return text
+
+
+# Фоновое завершение нескольких деревьев процессов.
+# Каждое дерево - отдельная задача пула: ожидание зависшей программы
+# не задерживает остальные, а поток интерфейса не ждёт ни одной.
+# targets - TrackedProcess (нужны pid, create_time и name).
+# Колбэки вызываются из потоков пула
+class Termination:
+    def __init__(self, targets, on_progress=None, on_finished=None,
+                 timeout=TERMINATE_TIMEOUT, kill_timeout=KILL_TIMEOUT, threads=TERMINATE_THREADS):
+        self.targets = list(targets)
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.timeout = timeout
+        self.kill_timeout = kill_timeout
+        self.threads = threads
+        self.report = None
+
+        self._lock = threading.Lock()
+        self._results = [None] * len(self.targets)
+        self._remaining = len(self.targets)
+        self._done = threading.Event()
+        self._executor = None
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        if not self.targets:
+            self._finish()
+            return
+        self._executor = ThreadPoolExecutor(min(self.threads, len(self.targets)),
+                                            thread_name_prefix="terminate")
+        for i, target in enumerate(self.targets):
+            self._executor.submit(self._terminate, i, target)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _terminate(self, i, target):
+        try:
+            with span("terminate_tree", "process"):
+                result = terminate_tree(target.pid, target.create_time, self.timeout, self.kill_timeout)
+        except ProcessLookupError:
+            # Уже завершилась сама - цель достигнута
+            result = TreeResult(target.name, target.pid, 0, 0, 0, None)
+        except Exception as e:
+            result = TreeResult(target.name, target.pid, 0, 0, 0, str(e) or type(e).__name__)
+        count("processes_terminated", result.terminated)
+        count("processes_killed", result.killed)
+        with self._lock:
+            self._results[i] = result
+            self._remaining -= 1
+            finished = not self._remaining
+        if self.on_progress:
+            self.on_progress(result)
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        self.report = TerminationReport(self._results, (time.perf_counter() - self._started) * 1000)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        try:
+            if self.on_finished:
+                self.on_finished(self.report)
+        finally:
+            self._done.set()
@@ -0,0 +1,94 @@
+# Цена сэмплера телеметрии и ограниченность его истории.
+# Замеры подробнее - benchmarks/bench_sampler.py
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from process_monitor import ProcessMonitor
+from telemetry import ProcessSampler, RingBuffer
+
+PROCESSES = 20
+ROUNDS = 10
+HISTORY = 8
+# Бюджет одного прохода сэмплера на процесс, мс: с большим запасом для нагруженных машин
+SAMPLE_BUDGET_MS = 5.0
+
+
+@pytest.fixture
+def tracked():
+    monitor = ProcessMonitor()
+    monitor.start()
+    children = [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+                for _ in range(PROCESSES)]
+    for child in children:
+        monitor.track(child, sys.executable)
+    yield monitor
+    for child in children:
+        child.kill()
+        child.wait()
+    monitor.stop()
+
+
+def test_ring_buffer_keeps_last_values():
+    ring = RingBuffer(4)
+    for value in range(10):
+        ring.append(value)
+    assert len(ring) == 4
+    assert ring.values() == [6, 7, 8, 9]
+    assert ring.last() == 9
+    assert ring.resized(2).values() == [8, 9]
+    assert ring.resized(8).values() == [6, 7, 8, 9]
+
+
+def test_history_is_bounded(tracked):
+    sampler = ProcessSampler(tracked, history=HISTORY)
+    for _ in range(HISTORY * 3):
+        sampler.sample_once()
+    for info in tracked.processes():
+        history = sampler.history(info.key)
+        assert history is not None
+        for field in history.FIELDS:
+            assert len(getattr(history, field)) == HISTORY
+
+
+def test_sample_within_budget(tracked):
+    sampler = ProcessSampler(tracked, history=HISTORY)
+    sampler.sample_once()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        sampler.sample_once()
+    round_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+    assert round_ms < SAMPLE_BUDGET_MS * PROCESSES
+
+
+def test_configure_while_sampling(tracked):
+    # Длина истории меняется, пока поток сэмплера дописывает значения
+    sampler = ProcessSampler(tracked, history=HISTORY)
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            sampler.sample_once()
+
+    thread = threading.Thread(target=sample)
+    thread.start()
+    try:
+        for i in range(50):
+            sampler.configure(history=HISTORY + i % 5)
+    finally:
+        stop.set()
+        thread.join()
+    sampler.configure(history=HISTORY)
+    sampler.sample_once()
+    for info in tracked.processes():
+        history = sampler.history(info.key)
+        for field in history.FIELDS:
+            ring = getattr(history, field)
+            assert ring.size == HISTORY
+            assert len(ring) <= HISTORY
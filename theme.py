@@ -0,0 +1,212 @@
+from collections import namedtuple
+
+from PyQt5.QtWidgets import QAbstractItemView, QFrame, QProxyStyle, QStyle, QStyleOptionButton
+from PyQt5.QtCore import Qt, QRect, QRectF, QSize
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPalette, QPainter, QPen
+
+# Цвета темы. Стандартные роли (фон окна, текст, выделение) идут в QPalette,
+# остальные (плашки строк, кнопка удаления, спарклайны) читаются из темы при отрисовке
+Theme = namedtuple("Theme", "name title surface border frame hover row row_hover placeholder "
+                            "placeholder_hover accent text muted_text missing danger danger_hover memory")
+
+THEMES = {
+    "dark": Theme("dark", "Тёмная", surface="#2e2e2e", border="#3e3e3e", frame="#3a3a3a",
+                  hover="#3a3a3a", row="#3e3e3e", row_hover="#4e4e4e", placeholder="#4e4e4e",
+                  placeholder_hover="#5a5a5a", accent="#4a90e2", text="#ffffff", muted_text="#e0e0e0",
+                  missing="#e57373", danger="#e74c3c", danger_hover="#c0392b", memory="#8e6fd8"),
+    "light": Theme("light", "Светлая", surface="#e9ecf1", border="#cfd4dc", frame="#d3d8e0",
+                   hover="#dde1e8", row="#dde1e8", row_hover="#cfd5de", placeholder="#c8ced8",
+                   placeholder_hover="#bcc3ce", accent="#3d7fd0", text="#1f1f1f", muted_text="#2e2e2e",
+                   missing="#c0392b", danger="#e74c3c", danger_hover="#c0392b", memory="#7a58c8"),
+}
+DEFAULT_THEME = "dark"
+FONT_FAMILY = "Segoe UI"
+
+# Кнопки: скругление, отступы текста и толщина рамки, px
+BUTTON_RADIUS = 12
+BUTTON_PADDING = (24, 12)
+BUTTON_BORDER = 2
+MENU_INDICATOR = 20
+NAV_RADIUS = 8
+NAV_PADDING = (15, 10)
+NAV_FONT_PX = 14
+FIELD_RADIUS = 10
+FIELD_PADDING = 8
+ITEM_PADDING = 5
+
+_current = THEMES[DEFAULT_THEME]
+_style = None
+
+
+def current():
+    return _current
+
+
+def palette(theme):
+    result = QPalette()
+    surface = QColor(theme.surface)
+    for role in (QPalette.Window, QPalette.Base, QPalette.AlternateBase, QPalette.Button):
+        result.setColor(role, surface)
+    for role in (QPalette.WindowText, QPalette.ButtonText, QPalette.BrightText):
+        result.setColor(role, QColor(theme.text))
+    result.setColor(QPalette.Text, QColor(theme.muted_text))
+    result.setColor(QPalette.Highlight, QColor(theme.accent))
+    result.setColor(QPalette.HighlightedText, Qt.white)
+    result.setColor(QPalette.Light, QColor(theme.border))
+    result.setColor(QPalette.Midlight, QColor(theme.hover))
+    result.setColor(QPalette.Mid, QColor(theme.frame))
+    result.setColor(QPalette.ToolTipBase, QColor(theme.row))
+    result.setColor(QPalette.ToolTipText, QColor(theme.text))
+    return result
+
+
+def apply_theme(app, theme_name):
+    # Стиль ставится один раз при первом вызове; смена темы - только новая палитра
+    # приложения: виджеты перерисовываются, но стиль заново к ним не применяется
+    global _current, _style
+    _current = THEMES.get(theme_name, THEMES[DEFAULT_THEME])
+    if _style is None:
+        _style = NeumorphicStyle()
+        app.setStyle(_style)
+        font = QFont(app.font())
+        font.setFamily(FONT_FAMILY)
+        app.setFont(font)
+    app.setPalette(palette(_current))
+    return _current
+
+
+# Неоморфная тёмная тема окна поверх Fusion.
+# Раньше её задавала таблица стилей на всё окно, и каждый новый виджет проходил
+# через разбор селекторов. Здесь кнопки, поля ввода и списки рисуются кодом по
+# цветам палитры и текущей темы. Плоские кнопки (setFlat) - пункты навигации:
+# текст слева, отмеченная подсвечивается цветом выделения
+class NeumorphicStyle(QProxyStyle):
+    def __init__(self):
+        super().__init__("Fusion")
+
+    def drawPrimitive(self, element, option, painter, widget=None):
+        if element == QStyle.PE_PanelButtonCommand:
+            self._draw_button_panel(option, painter)
+        elif element == QStyle.PE_FrameFocusRect and isinstance(option, QStyleOptionButton):
+            return
+        elif element == QStyle.PE_PanelLineEdit:
+            self._draw_field(option.rect, option.palette, painter)
+        elif element == QStyle.PE_PanelItemViewItem:
+            if option.state & QStyle.State_Selected:
+                painter.fillRect(option.rect, option.palette.color(QPalette.Highlight))
+            elif option.state & QStyle.State_MouseOver:
+                painter.fillRect(option.rect, option.palette.color(QPalette.Midlight))
+        else:
+            super().drawPrimitive(element, option, painter, widget)
+
+    def drawControl(self, element, option, painter, widget=None):
+        if element == QStyle.CE_PushButtonLabel:
+            self._draw_button_label(option, painter)
+        elif element == QStyle.CE_ShapedFrame and isinstance(widget, QAbstractItemView):
+            if widget.frameShape() != QFrame.NoFrame:
+                self._draw_field(option.rect, option.palette, painter, fill=False)
+        else:
+            super().drawControl(element, option, painter, widget)
+
+    def sizeFromContents(self, contents, option, size, widget=None):
+        if contents == QStyle.CT_PushButton:
+            flat = bool(option.features & QStyleOptionButton.Flat)
+            padding_x, padding_y = NAV_PADDING if flat else BUTTON_PADDING
+            font = widget.font() if widget is not None else QFont(FONT_FAMILY)
+            metrics = QFontMetrics(self._button_font(font, flat, bold=not flat))
+            width = metrics.horizontalAdvance(option.text.replace("&", ""))
+            if not option.icon.isNull():
+                width += option.iconSize.width() + 8
+            if option.features & QStyleOptionButton.HasMenu:
+                width += MENU_INDICATOR
+            border = 0 if flat else BUTTON_BORDER
+            return QSize(width + 2 * (padding_x + border),
+                         max(metrics.height(), option.iconSize.height()) + 2 * (padding_y + border))
+        if contents == QStyle.CT_LineEdit:
+            return QSize(size.width() + 2 * FIELD_PADDING, size.height() + FIELD_PADDING)
+        if contents == QStyle.CT_ItemViewItem:
+            size = super().sizeFromContents(contents, option, size, widget)
+            return QSize(size.width(), size.height() + 2 * ITEM_PADDING)
+        return super().sizeFromContents(contents, option, size, widget)
+
+    def subElementRect(self, element, option, widget=None):
+        rect = super().subElementRect(element, option, widget)
+        if element == QStyle.SE_LineEditContents:
+            return rect.adjusted(FIELD_PADDING - 2, 0, -(FIELD_PADDING - 2), 0)
+        return rect
+
+    def pixelMetric(self, metric, option=None, widget=None):
+        if metric == QStyle.PM_DefaultFrameWidth:
+            return BUTTON_BORDER
+        return super().pixelMetric(metric, option, widget)
+
+    @staticmethod
+    def _button_font(base, flat, bold):
+        font = QFont(base)
+        if flat:
+            font.setPixelSize(NAV_FONT_PX)
+        font.setBold(bold)
+        return font
+
+    def _draw_button_panel(self, option, painter):
+        flat = bool(option.features & QStyleOptionButton.Flat)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if flat:
+            if option.state & QStyle.State_On:
+                painter.setBrush(option.palette.color(QPalette.Highlight))
+            elif hovered:
+                painter.setBrush(option.palette.color(QPalette.Midlight))
+            else:
+                painter.restore()
+                return
+            painter.setPen(Qt.NoPen)
+            painter.drawRoundedRect(QRectF(option.rect), NAV_RADIUS, NAV_RADIUS)
+        else:
+            half = BUTTON_BORDER / 2
+            painter.setBrush(option.palette.color(QPalette.Midlight) if hovered
+                             else option.palette.color(QPalette.Button))
+            painter.setPen(QPen(option.palette.color(QPalette.Light), BUTTON_BORDER))
+            painter.drawRoundedRect(QRectF(option.rect).adjusted(half, half, -half, -half),
+                                    BUTTON_RADIUS, BUTTON_RADIUS)
+        painter.restore()
+
+    def _draw_button_label(self, option, painter):
+        flat = bool(option.features & QStyleOptionButton.Flat)
+        checked = bool(option.state & QStyle.State_On)
+        painter.save()
+        painter.setFont(self._button_font(painter.font(), flat, bold=not flat or checked))
+        if flat:
+            rect = option.rect.adjusted(NAV_PADDING[0], 0, -NAV_PADDING[0], 0)
+            painter.setPen(option.palette.color(QPalette.HighlightedText) if checked
+                           else option.palette.color(QPalette.Text))
+            alignment = Qt.AlignLeft | Qt.AlignVCenter
+        else:
+            rect = QRect(option.rect)
+            if option.features & QStyleOptionButton.HasMenu:
+                rect.setRight(rect.right() - MENU_INDICATOR)
+            painter.setPen(option.palette.color(QPalette.ButtonText))
+            alignment = Qt.AlignCenter
+        if not option.icon.isNull():
+            icon_size = option.iconSize
+            if not flat:
+                text_width = painter.fontMetrics().horizontalAdvance(option.text)
+                left = rect.center().x() - (icon_size.width() + 8 + text_width) // 2
+                rect.setLeft(left)
+                alignment = Qt.AlignLeft | Qt.AlignVCenter
+            pixmap = option.icon.pixmap(icon_size)
+            painter.drawPixmap(rect.left(), rect.center().y() - icon_size.height() // 2, pixmap)
+            rect.setLeft(rect.left() + icon_size.width() + 8)
+        painter.drawText(rect, alignment | Qt.TextShowMnemonic, option.text)
+        painter.restore()
+
+    def _draw_field(self, rect, palette, painter, fill=True):
+        # Скруглённая рамка поля ввода или списка
+        half = BUTTON_BORDER / 2
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(palette.color(QPalette.Mid), BUTTON_BORDER))
+        painter.setBrush(palette.color(QPalette.Base) if fill else Qt.NoBrush)
+        painter.drawRoundedRect(QRectF(rect).adjusted(half, half, -half, -half), FIELD_RADIUS, FIELD_RADIUS)
+        painter.restore()
@@ -0,0 +1,158 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Сколько событий держать для выгрузки и сколько последних замеров на имя для оверлея
+MAX_EVENTS = 200000
+RECENT_SAMPLES = 64
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "start")
+
+    def __init__(self, tracer, name, cat):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._finish(self.name, self.cat, self.start, time.perf_counter_ns())
+        return False
+
+
+# Лёгкая трассировка: именованные интервалы и счётчики.
+# Пока трассировка выключена, span() отдаёт общий пустой контекст, а count()
+# сразу возвращается, так что замеры в горячих путях почти ничего не стоят.
+# Включённая пишет события в ограниченную очередь (её можно выгрузить
+# в формате Chrome trace для chrome://tracing или Perfetto) и хранит последние
+# длительности по каждому имени для оверлея в окне
+class Tracer:
+    def __init__(self, max_events=MAX_EVENTS, recent=RECENT_SAMPLES):
+        self.enabled = False
+        self.counters = {}
+        self._events = deque(maxlen=max_events)
+        self._recent_size = recent
+        self._recent = {}
+        self._thread_names = {}
+        self._origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, cat="launcher"):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            total = self.counters[name] = self.counters.get(name, 0) + value
+        self._events.append(("C", name, "counter", time.perf_counter_ns(), total, threading.get_ident()))
+
+    def gauge(self, name, value):
+        if not self.enabled:
+            return
+        self.counters[name] = value
+        self._events.append(("C", name, "counter", time.perf_counter_ns(), value, threading.get_ident()))
+
+    def sample(self, name, duration_ms):
+        # Замер только для оверлея, без события в трассе (например, задержка кадра)
+        if not self.enabled:
+            return
+        self._recent_for(name).append(duration_ms)
+
+    def _recent_for(self, name):
+        recent = self._recent.get(name)
+        if recent is None:
+            recent = self._recent.setdefault(name, deque(maxlen=self._recent_size))
+        return recent
+
+    def _finish(self, name, cat, start, end):
+        ident = threading.get_ident()
+        if ident not in self._thread_names:
+            self._thread_names[ident] = threading.current_thread().name
+        self._events.append(("X", name, cat, start, end - start, ident))
+        self._recent_for(name).append((end - start) / 1e6)
+
+    def recent(self):
+        # {имя: (последний, средний, максимальный) в мс} по последним замерам
+        summary = {}
+        for name, samples in list(self._recent.items()):
+            values = list(samples)
+            if values:
+                summary[name] = (values[-1], sum(values) / len(values), max(values))
+        return summary
+
+    def clear(self):
+        self._events.clear()
+        self._recent.clear()
+        with self._lock:
+            self.counters.clear()
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        events = [{"ph": "M", "name": "thread_name", "pid": pid, "tid": ident, "args": {"name": name}}
+                  for ident, name in list(self._thread_names.items())]
+        for phase, name, cat, start, value, ident in list(self._events):
+            event = {"ph": phase, "name": name, "cat": cat, "pid": pid, "tid": ident,
+                     "ts": (start - self._origin) / 1000}
+            if phase == "X":
+                event["dur"] = value / 1000
+            else:
+                event["args"] = {name: value}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+tracer = Tracer()
+
+
+def span(name, cat="launcher"):
+    return tracer.span(name, cat)
+
+
+def count(name, value=1):
+    tracer.count(name, value)
+
+
+def traced(name, cat="launcher"):
+    # Декоратор для методов целиком: выключенная трассировка стоит одной проверки
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with _Span(tracer, name, cat):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate